@@ -18,6 +18,10 @@ MODEL_JUDGE = os.getenv("MODEL_JUDGE", "mistralai/mistral-7b-instruct")
 
 # Timeouts (seconds)
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))  # pooled upstream connections per worker process
+
+# Route handlers for the LLM endpoints: "sync" (run in the threadpool) or "async" (awaited on the event loop)
+API_HANDLERS = os.getenv("API_HANDLERS", "sync").lower()
 
 # RL policy / template choices
 TEMPLATES = [
@@ -29,5 +33,16 @@ TEMPLATES = [
     "Prioritize clarity and brevity with a strong summary."
 ]
 
+# Judge batching: max (coached, opponent) pairs packed into one judge call
+JUDGE_BATCH_SIZE = int(os.getenv("JUDGE_BATCH_SIZE", "4"))
+
+# Extracted text is read through mmap in chunks of about this many bytes (cut at line ends)
+CONTEXT_CHUNK_BYTES = int(os.getenv("CONTEXT_CHUNK_BYTES", "65536"))
+
+# PDF ingestion: lines repeated at page edges on this share of pages are dropped as headers/footers
+INGEST_EDGE_LINES = int(os.getenv("INGEST_EDGE_LINES", "3"))  # lines at the top and bottom of a page checked
+INGEST_REPEAT_SHARE = float(os.getenv("INGEST_REPEAT_SHARE", "0.2"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+
 # Round limit
 MAX_ROUNDS = int(os.getenv("MAX_ROUNDS", "5"))
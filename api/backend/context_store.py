@@ -0,0 +1,178 @@
+# backend/context_store.py
+"""
+Memory-mapped access to extracted reference text.
+
+The text stays on disk as UTF-8 and is opened with mmap, so every process
+serving the same file shares the OS page cache instead of holding its own
+Python copy. A small JSON side index (<text>.idx.json) records the byte
+range of each "--- Page N ---" section and of fixed-size chunks cut at line
+ends, so callers slice only what they need:
+
+    store = get_store("data/extracted_text.txt")
+    store.preview(1000)      # first 1000 characters
+    store.page(3)            # one page
+    for text in store.iter_chunks(): ...
+
+The index is written by the app's ingestion step when pages are saved; text
+files without one are indexed on first use with a single streaming scan.
+"""
+import json
+import mmap
+import os
+import re
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from .config import CONTEXT_CHUNK_BYTES
+
+INDEX_SUFFIX = ".idx.json"
+_PAGE_MARKER_RE = re.compile(rb"^\s*--- Page (\d+) ---\s*$")
+
+
+def get_index_path(text_path: str) -> str:
+    return text_path + INDEX_SUFFIX
+
+
+class IndexBuilder:
+    """Accumulates page and chunk byte offsets, one line at a time, while a text file is written or scanned."""
+
+    def __init__(self, chunk_bytes: int = CONTEXT_CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self.pages = []   # [page_no, start, end]
+        self.chunks = []  # [start, end]
+        self.offset = 0
+        self._chunk_start = 0
+
+    def add_line(self, line: bytes):
+        m = _PAGE_MARKER_RE.match(line)
+        if m:
+            if self.pages:
+                self.pages[-1][2] = self.offset
+            self.pages.append([int(m.group(1)), self.offset, None])
+        self.offset += len(line)
+        # chunks always end on a line end
+        if self.offset - self._chunk_start >= self.chunk_bytes:
+            self.chunks.append([self._chunk_start, self.offset])
+            self._chunk_start = self.offset
+
+    def finish(self) -> dict:
+        if self.pages:
+            self.pages[-1][2] = self.offset
+        if self.offset > self._chunk_start:
+            self.chunks.append([self._chunk_start, self.offset])
+        return {"size": self.offset, "pages": self.pages, "chunks": self.chunks}
+
+
+def save_index(text_path: str, index: dict):
+    try:
+        st = os.stat(text_path)
+        index = dict(index, mtime=st.st_mtime, size=st.st_size)
+        with open(get_index_path(text_path), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+    except Exception as e:
+        print(f"Error saving context index: {e}")
+
+
+def build_index(text_path: str, chunk_bytes: int = CONTEXT_CHUNK_BYTES) -> dict:
+    """Indexes an existing text file with one streaming pass and saves the index."""
+    builder = IndexBuilder(chunk_bytes)
+    with open(text_path, "rb") as f:
+        for line in f:
+            builder.add_line(line)
+    index = builder.finish()
+    save_index(text_path, index)
+    return index
+
+
+def load_index(text_path: str) -> dict:
+    """Returns the saved index if it matches the file, rebuilding it otherwise."""
+    st = os.stat(text_path)
+    try:
+        with open(get_index_path(text_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("size") == st.st_size and index.get("mtime") == st.st_mtime:
+            return index
+    except (OSError, json.JSONDecodeError):
+        pass
+    return build_index(text_path)
+
+
+class ContextStore:
+    """Read-only, memory-mapped view of one extracted text file."""
+
+    def __init__(self, text_path: str):
+        self.path = text_path
+        self.index = load_index(text_path)
+        self.size = self.index["size"]
+        self._file = open(text_path, "rb")
+        # mmap can't map an empty file
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self._page_ranges: Dict[int, List[int]] = {p: [s, e] for p, s, e in self.index["pages"]}
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
+
+    def read_range(self, start: int, end: int) -> str:
+        if self._mm is None:
+            return ""
+        return self._mm[max(start, 0):min(end, self.size)].decode("utf-8", errors="ignore")
+
+    @property
+    def n_pages(self) -> int:
+        return len(self.index["pages"])
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.index["chunks"])
+
+    def page_numbers(self) -> List[int]:
+        return [p for p, _, _ in self.index["pages"]]
+
+    def page(self, page_no: int) -> str:
+        """Text of one page, without its marker line."""
+        rng = self._page_ranges.get(page_no)
+        if not rng:
+            return ""
+        text = self.read_range(*rng)
+        return text.split("\n", 1)[1].strip() if "\n" in text else ""
+
+    def chunk(self, i: int) -> str:
+        return self.read_range(*self.index["chunks"][i])
+
+    def iter_pages(self) -> Iterator[tuple]:
+        for page_no in self.page_numbers():
+            yield page_no, self.page(page_no)
+
+    def iter_chunks(self) -> Iterator[str]:
+        for i in range(self.n_chunks):
+            yield self.chunk(i)
+
+    def preview(self, n_chars: int) -> str:
+        """First n_chars characters (leading blank lines skipped); reads at most 4 bytes per character."""
+        return self.read_range(0, n_chars * 4).lstrip()[:n_chars]
+
+
+_stores: Dict[str, tuple] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(text_path: str) -> Optional[ContextStore]:
+    """
+    Shared store for text_path (None if the file doesn't exist). The store is
+    reopened when the file is replaced.
+    """
+    try:
+        st = os.stat(text_path)
+    except OSError:
+        return None
+    key = (st.st_mtime, st.st_size)
+    with _stores_lock:
+        cached = _stores.get(text_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        store = ContextStore(text_path)
+        _stores[text_path] = (key, store)
+    # the replaced store may still be in use by another thread; let GC close it
+    return store
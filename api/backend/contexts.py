@@ -0,0 +1,60 @@
+# backend/contexts.py
+"""
+Background ingestion of uploaded PDFs for the API.
+
+Uploads are streamed to a temporary file in fixed-size blocks and queued;
+a worker extracts, normalizes and indexes the text and then atomically
+replaces data/extracted_text.txt (and its byte index), so requests keep
+reading the previous context until the new one is complete.
+"""
+import os
+import shutil
+import tempfile
+from typing import Callable, Optional
+
+from .config import INGEST_WORKERS
+from .context_store import get_index_path
+from .ingest import ingest_pdf
+from .jobs import JobQueue
+
+CONTEXT_PATH = "data/extracted_text.txt"
+UPLOADS_DIR = "data/uploads"
+UPLOAD_BLOCK_BYTES = 1024 * 1024
+
+ingest_queue = JobQueue(INGEST_WORKERS, name="ingest")
+
+
+def save_upload(fileobj, name: str = "upload.pdf") -> str:
+    """Streams an uploaded file to disk in fixed-size blocks; returns the temporary path."""
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=os.path.splitext(name or "")[1] or ".pdf", dir=UPLOADS_DIR)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(fileobj, out, UPLOAD_BLOCK_BYTES)
+    return path
+
+
+def _ingest_upload(path: str, name: str, progress: Callable[[str, float], None] = None) -> dict:
+    tmp_output = os.path.join(UPLOADS_DIR, os.path.basename(path) + ".txt")
+    try:
+        stats = ingest_pdf(path, tmp_output, progress=progress)
+        os.makedirs(os.path.dirname(CONTEXT_PATH), exist_ok=True)
+        os.replace(get_index_path(tmp_output), get_index_path(CONTEXT_PATH))
+        os.replace(tmp_output, CONTEXT_PATH)
+        return dict(stats, name=name)
+    finally:
+        for leftover in (path, tmp_output, get_index_path(tmp_output)):
+            try:
+                os.remove(leftover)
+            except OSError:
+                pass
+
+
+def submit_upload(fileobj, name: str) -> str:
+    """Saves an upload to disk and queues its ingestion; returns the job ID to poll."""
+    path = save_upload(fileobj, name)
+    return ingest_queue.submit("ingest", _ingest_upload, path, name)
+
+
+def get_ingest_job(job_id: str) -> Optional[dict]:
+    """Job status: status (queued/running/done/error), stage, progress, result (ingest stats), error."""
+    return ingest_queue.get(job_id)
@@ -1,5 +1,5 @@
 # backend/debater.py
-from .utils import call_openrouter, sanitize_topic, load_pdf_context
+from .utils import call_openrouter, acall_openrouter, sanitize_topic, load_pdf_context
 from .config import MODEL_COACHED
 from typing import List, Dict
 
@@ -7,7 +7,7 @@ SYSTEM_MESSAGE = "You are an expert debater. Produce a concise, structured argum
 
 def build_coached_prompt(template_instruction: str, topic: str, previous: List[str]=None) -> List[Dict]:
     topic = sanitize_topic(topic)
-    pdf_context = load_pdf_context()
+    pdf_context = load_pdf_context(max_chars=3000)
     messages = [
         {"role": "system", "content": SYSTEM_MESSAGE},
         {
@@ -15,7 +15,7 @@ def build_coached_prompt(template_instruction: str, topic: str, previous: List[s
             "content": (
                 f"Instruction: {template_instruction}\n"
                 f"Topic: {topic}\n\n"
-                f"Reference Material (from uploaded PDF):\n{pdf_context[:3000]}"
+                f"Reference Material (from uploaded PDF):\n{pdf_context}"
             ),
         }
     ]
@@ -30,3 +30,8 @@ def generate_coached_argument(template_instruction: str, topic: str, previous: L
     messages = build_coached_prompt(template_instruction, topic, previous)
     raw = call_openrouter(messages, MODEL_COACHED)
     return raw.strip()
+
+async def agenerate_coached_argument(template_instruction: str, topic: str, previous: List[str]=None) -> str:
+    messages = build_coached_prompt(template_instruction, topic, previous)
+    raw = await acall_openrouter(messages, MODEL_COACHED)
+    return raw.strip()
@@ -0,0 +1,82 @@
+# backend/jobs.py
+"""
+Minimal background job queue with status polling.
+
+Work runs on a small thread pool; each job is tracked as a plain dict
+(status, stage, progress, result, error, timestamps) that callers poll with
+get()/wait() instead of blocking the Streamlit script thread or an API
+request. Job functions receive a `progress(stage, fraction=None, **details)`
+callback; extra keyword details (e.g. partial results) are stored on the job.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from typing import Callable, Dict, List, Optional
+
+MAX_FINISHED_JOBS = 200  # finished job records kept for polling
+
+
+class JobQueue:
+    def __init__(self, workers: int = 1, name: str = "jobs"):
+        self._executor = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix=name)
+        self._jobs: Dict[str, dict] = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+
+    def _run(self, job_id: str, fn: Callable, args: tuple, kwargs: dict):
+        self._update(job_id, status="running", stage="started", started=time.time())
+
+        def progress(stage: str, fraction: float = None, **details):
+            fields = dict(details, stage=stage)
+            if fraction is not None:
+                fields["progress"] = round(min(max(fraction, 0.0), 1.0), 3)
+            self._update(job_id, **fields)
+
+        try:
+            result = fn(*args, progress=progress, **kwargs)
+            self._update(job_id, status="done", stage="done", progress=1.0, result=result, finished=time.time())
+            return result
+        except Exception as e:
+            print(f"Background job {job_id} failed: {e}")
+            self._update(job_id, status="error", error=str(e), finished=time.time())
+            raise
+
+    def submit(self, kind: str, fn: Callable, *args, **kwargs) -> str:
+        """Queues fn(*args, progress=..., **kwargs) and returns the job ID."""
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = {
+                "id": job_id, "kind": kind, "status": "queued", "stage": "queued", "progress": 0.0,
+                "result": None, "error": None, "created": time.time(), "started": None, "finished": None,
+            }
+        self._futures[job_id] = self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self, kind: str = None) -> List[dict]:
+        with self._lock:
+            return [dict(j) for j in self._jobs.values() if kind is None or j["kind"] == kind]
+
+    def wait(self, job_ids: List[str], timeout: float = None) -> List[Optional[dict]]:
+        """Blocks until the given jobs finish (or the timeout passes) and returns their records."""
+        futures = [self._futures[j] for j in job_ids if j in self._futures]
+        wait_futures(futures, timeout=timeout)
+        return [self.get(j) for j in job_ids]
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j["status"] in ("done", "error")]
+        for job in sorted(finished, key=lambda j: j["finished"] or 0)[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            self._jobs.pop(job["id"], None)
+            self._futures.pop(job["id"], None)
@@ -1,10 +1,17 @@
 # backend/judge.py
-from .utils import call_openrouter, sanitize_topic, parse_judge_json, load_pdf_context
-from .config import MODEL_JUDGE
+from .utils import call_openrouter, acall_openrouter, sanitize_topic, parse_judge_json, load_pdf_context
+from .config import MODEL_JUDGE, JUDGE_BATCH_SIZE
+from typing import List, Tuple
 
 # Judge system prompt: must return JSON only
 JUDGE_SYSTEM = "You are an objective debate judge. Evaluate two short arguments."
 
+SCORE_INSTRUCTIONS = """Score each argument on integers 1-10 for:
+- logic
+- relevance
+- clarity
+- persuasiveness"""
+
 JUDGE_PROMPT_TEMPLATE = """
 Topic: {topic}
 
@@ -17,11 +24,7 @@ OPPONENT ARGUMENT:
 Reference Material (from uploaded PDF):
 {pdf_context}
 
-Score each argument on integers 1-10 for:
-- logic
-- relevance
-- clarity
-- persuasiveness
+{score_instructions}
 
 Return ONLY valid JSON with keys:
 {{ "logic_coached", "relevance_coached", "clarity_coached", "persuasiveness_coached",
@@ -31,14 +34,70 @@ Return ONLY valid JSON with keys:
 Be terse in notes.
 """
 
-def evaluate(coached: str, opponent: str, topic: str) -> dict:
+def build_judge_prompt(coached: str, opponent: str, topic: str) -> list:
     topic = sanitize_topic(topic)
-    pdf_context = load_pdf_context()
-    content = JUDGE_PROMPT_TEMPLATE.format(topic=topic, coached=coached, opponent=opponent, pdf_context=pdf_context[:3000])
+    pdf_context = load_pdf_context(max_chars=3000)
+    content = JUDGE_PROMPT_TEMPLATE.format(topic=topic, coached=coached, opponent=opponent, pdf_context=pdf_context,
+                                           score_instructions=SCORE_INSTRUCTIONS)
     messages = [
         {"role": "system", "content": JUDGE_SYSTEM},
         {"role": "user", "content": content}
     ]
-    raw = call_openrouter(messages, MODEL_JUDGE)
+    return messages
+
+def evaluate(coached: str, opponent: str, topic: str) -> dict:
+    raw = call_openrouter(build_judge_prompt(coached, opponent, topic), MODEL_JUDGE)
     parsed = parse_judge_json(raw)
     return parsed
+
+async def aevaluate(coached: str, opponent: str, topic: str) -> dict:
+    raw = await acall_openrouter(build_judge_prompt(coached, opponent, topic), MODEL_JUDGE)
+    return parse_judge_json(raw)
+
+JUDGE_BATCH_PROMPT_TEMPLATE = """
+Topic: {topic}
+
+Reference Material (from uploaded PDF):
+{pdf_context}
+
+{pairs}
+
+Judge each of the {n_pairs} pairs above independently.
+{score_instructions}
+
+Return ONLY a valid JSON array of {n_pairs} objects, in pair order, each with keys:
+{{ "logic_coached", "relevance_coached", "clarity_coached", "persuasiveness_coached",
+   "total_coached", "notes_coached",
+   "logic_opponent", "relevance_opponent", "clarity_opponent", "persuasiveness_opponent",
+   "total_opponent", "notes_opponent" }}
+Be terse in notes.
+"""
+
+def evaluate_batch(pairs: List[Tuple[str, str]], topic: str, batch_size: int = None) -> List[dict]:
+    """
+    Judges several (coached, opponent) pairs per call, sharing the rubric and context.
+    Chunks whose output can't be parsed are re-judged pair by pair.
+    """
+    topic = sanitize_topic(topic)
+    pdf_context = load_pdf_context(max_chars=3000)
+    batch_size = batch_size or JUDGE_BATCH_SIZE
+    results = []
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs[start:start + batch_size]
+        verdicts = None
+        if len(chunk) > 1:
+            blocks = [f"PAIR {i}:\nCOACHED ARGUMENT:\n{c}\n\nOPPONENT ARGUMENT:\n{o}" for i, (c, o) in enumerate(chunk, start=1)]
+            content = JUDGE_BATCH_PROMPT_TEMPLATE.format(topic=topic, pdf_context=pdf_context, pairs="\n\n".join(blocks),
+                                                         n_pairs=len(chunk), score_instructions=SCORE_INSTRUCTIONS)
+            messages = [
+                {"role": "system", "content": JUDGE_SYSTEM},
+                {"role": "user", "content": content}
+            ]
+            try:
+                verdicts = parse_judge_json(call_openrouter(messages, MODEL_JUDGE), expected=len(chunk))
+            except Exception:
+                verdicts = None
+        if verdicts is None:
+            verdicts = [evaluate(c, o, topic) for c, o in chunk]
+        results.extend(verdicts)
+    return results
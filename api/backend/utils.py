@@ -1,10 +1,11 @@
 # backend/utils.py
 import json
 import re
-from typing import Dict, Any
-from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL, HTTP_TIMEOUT
+from typing import Dict, Any, List, Optional
+from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL, HTTP_TIMEOUT, HTTP_POOL_SIZE
+from .context_store import get_store
 import httpx
-import os
+import threading
 
 def sanitize_topic(topic: str) -> str:
     # basic sanitization to avoid huge payloads or control char injection
@@ -14,14 +15,29 @@ def sanitize_topic(topic: str) -> str:
         s = s[:400]
     return s
 
-def call_openrouter(messages, model):
-    """
-    messages: list of {"role": "user"/"system", "content": "..."}
-    model: model name via OpenRouter
-    """
+_http_limits = httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+_http_client = None
+_async_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    """Pooled client shared by the sync handlers (threadpool), instead of a new connection per call."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(timeout=HTTP_TIMEOUT, limits=_http_limits)
+        return _http_client
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Pooled client for the async handlers (one event loop per worker process)."""
+    global _async_http_client
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=_http_limits)
+    return _async_http_client
+
+def _openrouter_request(messages, model):
     if not OPENROUTER_API_KEY:
         raise RuntimeError("OPENROUTER_API_KEY is not set in environment")
-
     payload = {
         "model": model,
         "messages": messages,
@@ -31,25 +47,80 @@ def call_openrouter(messages, model):
         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
         "Content-Type": "application/json",
     }
+    return payload, headers
 
+def call_openrouter(messages, model):
+    """
+    messages: list of {"role": "user"/"system", "content": "..."}
+    model: model name via OpenRouter
+    """
+    payload, headers = _openrouter_request(messages, model)
     try:
-        with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-            resp = client.post(OPENROUTER_API_URL, json=payload, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            # compatibility: OpenRouter uses choices[0].message.content
-            return data["choices"][0]["message"]["content"]
+        resp = get_http_client().post(OPENROUTER_API_URL, json=payload, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
+        # compatibility: OpenRouter uses choices[0].message.content
+        return data["choices"][0]["message"]["content"]
     except httpx.HTTPStatusError as e:
         # bubble up error without leaking secrets
         raise RuntimeError(f"LLM API error: {e.response.status_code} {e.response.text[:200]}")
     except Exception as e:
-        raise RuntimeError(f"LLM call failed: {str(e)}")
+        raise RuntimeError(f"LLM call failed: {str(e) or type(e).__name__}")
+
+async def acall_openrouter(messages, model):
+    """Async counterpart of call_openrouter, for the async route handlers."""
+    payload, headers = _openrouter_request(messages, model)
+    try:
+        resp = await get_async_http_client().post(OPENROUTER_API_URL, json=payload, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
+        return data["choices"][0]["message"]["content"]
+    except httpx.HTTPStatusError as e:
+        raise RuntimeError(f"LLM API error: {e.response.status_code} {e.response.text[:200]}")
+    except Exception as e:
+        raise RuntimeError(f"LLM call failed: {str(e) or type(e).__name__}")
 
-def parse_judge_json(raw: str) -> Dict[str, Any]:
+def _fill_totals(data: Dict[str, Any]) -> Dict[str, Any]:
+    # minimal validation: ensure numeric totals exist
+    for k in ["total_coached", "total_opponent"]:
+        if k not in data:
+            # attempt compute from component scores
+            coach_vals = [data.get(x, 0) for x in ("logic_coached","relevance_coached","clarity_coached","persuasiveness_coached")]
+            opp_vals = [data.get(x, 0) for x in ("logic_opponent","relevance_opponent","clarity_opponent","persuasiveness_opponent")]
+            if k=="total_coached" and any(coach_vals):
+                data["total_coached"] = sum(coach_vals)/len(coach_vals)
+            if k=="total_opponent" and any(opp_vals):
+                data["total_opponent"] = sum(opp_vals)/len(opp_vals)
+    return data
+
+def _parse_judge_batch(raw: str, expected: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Extracts a JSON array of `expected` flat verdicts.
+    Returns None on any mismatch so the caller can judge pairs one by one.
+    """
+    try:
+        start = raw.find("[")
+        end = raw.rfind("]")
+        if start == -1 or end == -1 or end <= start:
+            raise ValueError("No JSON array found")
+        data = json.loads(raw[start:end+1])
+        if not isinstance(data, list) or len(data) != expected:
+            raise ValueError(f"Expected {expected} verdicts")
+        if not all(isinstance(v, dict) and ("logic_coached" in v or "total_coached" in v) for v in data):
+            raise ValueError("Unexpected verdict structure")
+        return [_fill_totals(v) for v in data]
+    except Exception:
+        return None
+
+def parse_judge_json(raw: str, expected: Optional[int] = None):
     """
     Robustly extract JSON object from the judge's text output.
     Expect keys like logic_coached, clarity_coached, etc.
+    With `expected`, parses a JSON array of that many verdicts instead
+    (returns None if it can't).
     """
+    if expected is not None:
+        return _parse_judge_batch(raw, expected)
     try:
         # find first { ... } block
         start = raw.find("{")
@@ -58,17 +129,7 @@ def parse_judge_json(raw: str) -> Dict[str, Any]:
             raise ValueError("No JSON object found")
         blob = raw[start:end+1]
         data = json.loads(blob)
-        # minimal validation: ensure numeric totals exist
-        for k in ["total_coached", "total_opponent"]:
-            if k not in data:
-                # attempt compute from component scores
-                coach_vals = [data.get(x, 0) for x in ("logic_coached","relevance_coached","clarity_coached","persuasiveness_coached")]
-                opp_vals = [data.get(x, 0) for x in ("logic_opponent","relevance_opponent","clarity_opponent","persuasiveness_opponent")]
-                if k=="total_coached" and any(coach_vals):
-                    data["total_coached"] = sum(coach_vals)/len(coach_vals)
-                if k=="total_opponent" and any(opp_vals):
-                    data["total_opponent"] = sum(opp_vals)/len(opp_vals)
-        return data
+        return _fill_totals(data)
     except Exception as e:
         # fallback: neutral scores
         return {
@@ -78,32 +139,20 @@ def parse_judge_json(raw: str) -> Dict[str, Any]:
             "total_opponent":5.0, "notes_opponent":"fallback"
         }
 
-def load_pdf_context(file_path="data/extracted_text.txt"):
+def load_pdf_context(file_path="data/extracted_text.txt", max_chars=None):
     """
-    Loads and caches the extracted PDF text.
-    Only loads from disk the first time, or when file changes.
+    Returns the extracted PDF text, or only its first max_chars characters.
+    The file is memory-mapped and shared by all requests (and, through the OS
+    page cache, by all workers), so a prefix never reads the whole document.
     """
-    global _cached_pdf_context, _cached_file_path
-
-    # If already cached and file hasn't changed, return it
-    if _cached_pdf_context is not None and _cached_file_path == file_path:
-        return _cached_pdf_context
-
-    # Check if file exists
-    if not os.path.exists(file_path):
-        print(f"⚠️ No extracted text found at {file_path}")
-        _cached_pdf_context = ""
-        _cached_file_path = file_path
-        return _cached_pdf_context
-
     try:
-        print(f"📄 Loading PDF context from: {file_path}")
-        with open(file_path, "r", encoding="utf-8") as f:
-            _cached_pdf_context = f.read()
-        _cached_file_path = file_path
-        print(f"✅ Loaded {len(_cached_pdf_context)} characters of context.")
-        return _cached_pdf_context
+        store = get_store(file_path)
     except Exception as e:
         print(f"❌ Failed to load PDF context: {e}")
-        _cached_pdf_context = ""
-        return _cached_pdf_context
+        return ""
+    if store is None:
+        print(f"⚠️ No extracted text found at {file_path}")
+        return ""
+    if max_chars is not None:
+        return store.preview(max_chars)
+    return store.read_range(0, store.size)
@@ -1,11 +1,13 @@
 # main_api.py
-from fastapi import FastAPI
+from fastapi import FastAPI, File, HTTPException, UploadFile
 from pydantic import BaseModel
 from typing import List, Optional
-from backend.debater import generate_coached_argument
-from backend.opponent import generate_opponent_argument
-from backend.judge import evaluate
-from backend.utils import load_pdf_context
+from backend.debater import generate_coached_argument, agenerate_coached_argument
+from backend.opponent import generate_opponent_argument, agenerate_opponent_argument
+from backend.judge import evaluate, aevaluate, evaluate_batch
+from backend.config import API_HANDLERS
+from backend.context_store import get_store
+from backend.contexts import submit_upload, get_ingest_job
 
 app = FastAPI(title="DebateMind API", description="API for the DebateMind RL debate system", version="1.0.0")
 
@@ -25,6 +27,14 @@ class JudgeInput(BaseModel):
     coached: str
     opponent: str
 
+class JudgePair(BaseModel):
+    coached: str
+    opponent: str
+
+class JudgeBatchInput(BaseModel):
+    topic: str
+    pairs: List[JudgePair]
+
 
 # --- Routes ---
 
@@ -33,7 +43,8 @@ def home():
     """Root endpoint"""
     return {
         "message": "Welcome to DebateMind API 👋",
-        "available_endpoints": ["/generate-coached", "/generate-opponent", "/judge", "/pdf-context"]
+        "available_endpoints": ["/generate-coached", "/generate-opponent", "/judge", "/judge/batch", "/pdf-context", "/contexts"],
+        "handlers": API_HANDLERS
     }
 
 
@@ -41,13 +52,35 @@ def home():
 def get_pdf_context():
     """
     Returns the first 1000 characters of the current PDF context
-    to verify successful ingestion.
+    to verify successful ingestion. Only that prefix is read from disk;
+    "length" is the size of the extracted text in bytes (UTF-8).
+    """
+    store = get_store("data/extracted_text.txt")
+    if store is None:
+        return {"preview": "", "length": 0, "pages": 0}
+    return {"preview": store.preview(1000), "length": store.size, "pages": store.n_pages}
+
+
+@app.post("/contexts", status_code=202)
+def upload_context(file: UploadFile = File(...)):
+    """
+    Uploads a PDF to become the new debate context. The file is streamed to
+    disk and ingested in the background; poll /contexts/jobs/{job_id} until
+    its status is "done" (the previous context stays in use until then).
     """
-    pdf_text = load_pdf_context()
-    return {"preview": pdf_text[:1000], "length": len(pdf_text)}
+    job_id = submit_upload(file.file, file.filename)
+    return get_ingest_job(job_id)
+
+
+@app.get("/contexts/jobs/{job_id}")
+def context_job(job_id: str):
+    """Returns the status, stage and progress of an ingestion job."""
+    job = get_ingest_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown ingestion job")
+    return job
 
 
-@app.post("/generate-coached")
 def generate_coached(data: CoachedInput):
     """
     Generates a coached debater argument using the current PDF context.
@@ -60,7 +93,6 @@ def generate_coached(data: CoachedInput):
     return {"coached_argument": response}
 
 
-@app.post("/generate-opponent")
 def generate_opponent(data: OpponentInput):
     """
     Generates an opponent debater argument in response to the last argument.
@@ -72,7 +104,6 @@ def generate_opponent(data: OpponentInput):
     return {"opponent_argument": response}
 
 
-@app.post("/judge")
 def judge(data: JudgeInput):
     """
     Evaluates two arguments (coached and opponent) and returns a JSON score.
@@ -83,3 +114,60 @@ def judge(data: JudgeInput):
         topic=data.topic
     )
     return response
+
+
+# Async variants: the upstream call is awaited on the event loop instead of holding a threadpool thread
+async def generate_coached_async(data: CoachedInput):
+    """
+    Generates a coached debater argument using the current PDF context.
+    """
+    response = await agenerate_coached_argument(
+        template_instruction=data.instruction,
+        topic=data.topic,
+        previous=data.previous
+    )
+    return {"coached_argument": response}
+
+
+async def generate_opponent_async(data: OpponentInput):
+    """
+    Generates an opponent debater argument in response to the last argument.
+    """
+    response = await agenerate_opponent_argument(
+        last_argument=data.last_argument,
+        topic=data.topic
+    )
+    return {"opponent_argument": response}
+
+
+async def judge_async(data: JudgeInput):
+    """
+    Evaluates two arguments (coached and opponent) and returns a JSON score.
+    """
+    return await aevaluate(
+        coached=data.coached,
+        opponent=data.opponent,
+        topic=data.topic
+    )
+
+
+# API_HANDLERS picks which set serves the LLM endpoints (see benchmarks/bench_api_load.py)
+for path, sync_handler, async_handler in (
+    ("/generate-coached", generate_coached, generate_coached_async),
+    ("/generate-opponent", generate_opponent, generate_opponent_async),
+    ("/judge", judge, judge_async),
+):
+    app.add_api_route(path, async_handler if API_HANDLERS == "async" else sync_handler, methods=["POST"])
+
+
+@app.post("/judge/batch")
+def judge_batch(data: JudgeBatchInput):
+    """
+    Evaluates several (coached, opponent) pairs on the same topic,
+    packing them into as few judge calls as possible.
+    """
+    verdicts = evaluate_batch(
+        pairs=[(p.coached, p.opponent) for p in data.pairs],
+        topic=data.topic
+    )
+    return {"verdicts": verdicts}
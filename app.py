@@ -3,21 +3,32 @@ import pandas as pd
 import numpy as np
 import time
 import io
-import json
-import os
-from PyPDF2 import PdfReader
+import html
 
 # --- Preserve Backend Imports ---
 from backend.memory_manager import (
     init_storage, create_new_debate, list_debates, # NEW
-    read_debate, read_judge, append_round, append_judge # MODIFIED
+    read_debate, read_judge, # MODIFIED
+    read_rounds, read_last_rounds,
+    read_judge_stats, read_usage
 )
 from backend.rl_agent import RLAgent
-from backend.debater import generate_coached_argument
-from backend.opponent import generate_opponent_argument
-from backend.judge import evaluate
-from backend.utils import sanitize_topic, load_pdf_context, clear_pdf_context
-from backend.config import MAX_ROUNDS 
+from backend.judge import judge_parse_stats
+from backend.prescorer import prescore_report
+from backend.round_runner import (
+    submit_round, submit_autoplay, stop_autoplay, get_round_job, finished_rounds, Prefetcher, prefetch_report
+)
+from backend.utils import sanitize_topic
+from backend.usage import sum_usage, usage_by_round, usage_by_template
+from backend.chat_render import bubble_html, escape_text, stream_frames
+from backend.exports import debate_version, judge_version, export_debate_csv, export_debate_json, write_all_debates_archive
+from backend.context_library import (
+    list_contexts, preview_context, bind_debate_contexts,
+    submit_upload, get_ingest_job
+)
+from backend.config import (
+    MAX_ROUNDS, SPECULATIVE_PREFETCH, CHAT_WINDOW_ROUNDS, DEBATE_TOKEN_BUDGET, DEBATE_COST_BUDGET
+)
 
 def format_score_as_points(score_val):
     """Formats a score (expected 0-10) to points, assuming it's already clamped."""
@@ -298,6 +309,9 @@ if "winner_info" not in st.session_state:
     st.session_state.winner_info = None
 if "latest_judge_data" not in st.session_state:
     st.session_state.latest_judge_data = None
+# Rounds generating in the background: {debate_id: job_id}
+if "round_jobs" not in st.session_state:
+    st.session_state.round_jobs = {}
 
 # --- PDF Auto-Extraction Section ---
 st.markdown("## Add custom context to the Debate")
@@ -329,36 +343,74 @@ st.markdown("""
 
 uploaded_pdf = st.file_uploader("Upload a PDF file", type=["pdf"])
 
+if "context_jobs" not in st.session_state:
+    st.session_state.context_jobs = {}      # upload key -> ingestion job ID
+    st.session_state.harvested_jobs = set()  # jobs whose result was already added to the selection
+
 if uploaded_pdf:
-    try:
-        # Define your output path (ensure /data exists)
-        output_dir = "data"
-        os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, "extracted_text.txt")
-
-        # Extract text
-        pdf_reader = PdfReader(uploaded_pdf)
-        extracted_text = ""
-
-        for page_num, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                extracted_text += f"\n\n--- Page {page_num + 1} ---\n{page_text}"
-
-        # Save text automatically
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(extracted_text)
-        
+    # Reruns keep the same upload; only queue it once. The file is streamed to disk and
+    # extraction/normalization/indexing run in the background, so the UI stays responsive.
+    upload_key = getattr(uploaded_pdf, "file_id", None) or f"{uploaded_pdf.name}:{uploaded_pdf.size}"
+    if upload_key not in st.session_state.context_jobs:
+        try:
+            st.session_state.context_jobs[upload_key] = submit_upload(uploaded_pdf, uploaded_pdf.name)
+        except Exception as e:
+            st.error(f"❌ Error processing PDF: {e}")
+
+def pending_context_jobs() -> list:
+    return [j for j in st.session_state.context_jobs.values() if j not in st.session_state.harvested_jobs]
+
+# Move finished uploads into the document selection (must happen before the multiselect is drawn)
+for job_id in pending_context_jobs():
+    job = get_ingest_job(job_id)
+    if job is None or job["status"] == "error":
+        st.session_state.harvested_jobs.add(job_id)
+        st.error(f"❌ Error processing PDF: {job['error'] if job else 'ingestion job was lost'}")
+    elif job["status"] == "done":
+        st.session_state.harvested_jobs.add(job_id)
+        context_meta = job["result"]
+        ingest_stats = context_meta["ingest"]
+        selected = st.session_state.get("context_select", [])
+        if context_meta["id"] not in selected:
+            st.session_state.context_select = selected + [context_meta["id"]]
+
         # --- START: Pop-up Confirmation Feature ---
         st.success("✅ **PDF context saved!** The judge can now use this material to evaluate arguments.")
         with st.expander("Preview Extracted Text"):
             # Show the first 1000 characters for confirmation
-            preview = extracted_text[:1000] if extracted_text else "No extractable text found on the PDF pages."
+            preview = preview_context(context_meta["id"], 1000) or "No extractable text found on the PDF pages."
             st.code(preview)
+        st.caption(
+            f"Normalized {ingest_stats['pages']} pages: {ingest_stats['raw_chars']:,} -> "
+            f"{ingest_stats['clean_chars']:,} characters ({ingest_stats['reduction']:.1%} smaller). "
+            f"Digest: {context_meta['key_points']} key points."
+        )
         # --- END: Pop-up Confirmation Feature ---
 
-    except Exception as e:
-        st.error(f"❌ Error processing PDF: {e}")
+@st.fragment(run_every=1.0)
+def ingest_progress():
+    """Polls running ingestion jobs; reruns the whole app once they have all finished."""
+    running = [get_ingest_job(j) for j in pending_context_jobs()]
+    running = [j for j in running if j and j["status"] in ("queued", "running")]
+    if not running:
+        st.rerun()
+    for job in running:
+        st.progress(job["progress"], text=f"Ingesting PDF: {job['stage']}…")
+    st.caption("You can start the debate now; it will wait for the document to be ready.")
+
+if pending_context_jobs():
+    ingest_progress()
+
+# Documents from the library that the next debate will use (each debate keeps its own selection)
+library = {m["id"]: m["name"] for m in list_contexts()}
+if library:
+    st.session_state.context_select = [c for c in st.session_state.get("context_select", []) if c in library]
+    st.multiselect(
+        "Context documents for new debates",
+        options=list(library),
+        format_func=lambda c: library.get(c, c),
+        key="context_select",
+    )
 
 
 # --- 4. Session State Setup for chat + animation ---
@@ -390,11 +442,12 @@ if "stream_round_idx" not in st.session_state:
 if "stream_speaker" not in st.session_state:
     st.session_state.stream_speaker = None # 'coach' or 'opponent'
 
-# Helper: rebuild chat history from stored CSV (read_debate)
+# Helper: rebuild chat history from stored CSV (only the latest CHAT_WINDOW_ROUNDS rounds;
+# earlier ones are rendered from storage on demand, see earlier_chat_html)
 def rebuild_chat_from_storage(debate_id: str):
     if not debate_id: # <-- ADD THIS CHECK
         return []
-    df = read_debate(debate_id)
+    df = read_last_rounds(debate_id, CHAT_WINDOW_ROUNDS)
     # Ensure chronological order by round ascending
     if df is None or df.empty:
         return []
@@ -416,6 +469,153 @@ def append_chat_for_round(coached: str, opponent: str, round_internal: int):
     # Append to session chat history (two messages)
     st.session_state.chat_history.append({"speaker":"coach", "text": coached, "round": round_internal})
     st.session_state.chat_history.append({"speaker":"opponent", "text": opponent, "round": round_internal})
+    # Only the live window is kept in the session; older rounds are read back from storage
+    st.session_state.chat_history = [
+        m for m in st.session_state.chat_history if m["round"] > round_internal - CHAT_WINDOW_ROUNDS
+    ]
+
+# Helper: earlier rounds (outside the live window) as one HTML block, built once per page of rounds.
+# Saved rounds never change, so the cache stays valid until a debate is reset.
+@st.cache_data(max_entries=64, show_spinner=False)
+def earlier_chat_html(debate_id: str, first_round: int, last_round: int) -> str:
+    df = read_rounds(debate_id, first_round, last_round)
+    if df.empty:
+        return ""
+    bubbles = []
+    for _, r in df.sort_values("round").iterrows():
+        rnd = int(r["round"]) + 1
+        bubbles.append(bubble_html("coach", rnd, escape_text(str(r.get("coached_argument", "")))))
+        bubbles.append(bubble_html("opponent", rnd, escape_text(str(r.get("opponent_argument", "")))))
+    return "".join(bubbles)
+
+if "chat_earlier_pages" not in st.session_state:
+    st.session_state.chat_earlier_pages = 0  # pages of CHAT_WINDOW_ROUNDS earlier rounds the user has loaded
+
+# Helper: judge panel HTML, shared by the live (streaming) box and the final panel
+SCORE_FIELDS = ["logic", "relevance", "clarity", "persuasiveness", "evidence_use"]
+
+def partial_judge_html(fields: dict, round_display: int) -> str:
+    """Renders the judge box from whatever score fields have streamed in so far."""
+    def side_html(label, side):
+        got = fields.get(side, {})
+        scores = [got[k] for k in SCORE_FIELDS if isinstance(got.get(k), (int, float))]
+        avg = f"{sum(scores)/len(scores):.1f}/10" if scores else "…"
+        parts = " · ".join(f"{k.replace('_', ' ')} {got[k]}" for k in SCORE_FIELDS if k in got)
+        return f"<div><b>{label}:</b> {avg} <span class='small-muted'>{parts}</span></div>"
+
+    # Notes are model output rendered with unsafe_allow_html, so they are escaped
+    notes_c = html.escape(str(fields.get("coached", {}).get("notes", "…")))
+    notes_o = html.escape(str(fields.get("opponent", {}).get("notes", "…")))
+    return f"""
+        <div class='judge-wrapper'>
+            <div class='judge-box'>
+                <div style='font-weight:700; margin-bottom:6px;'>Judge Evaluation — Round {round_display} (scoring…)</div>
+                {side_html("Coach", "coached")}
+                {side_html("Opponent", "opponent")}
+                <div class='chat-sep'></div>
+                <div><b>Notes (Coach):</b> {notes_c}</div>
+                <div style='margin-top:6px;'><b>Notes (Opponent):</b> {notes_o}</div>
+            </div>
+        </div>
+    """
+
+# Helper: speculative mode drafts the next round in the background as soon as this one is committed.
+if "prefetcher" not in st.session_state:
+    st.session_state.prefetcher = Prefetcher()
+
+def maybe_prefetch_next_round():
+    if st.session_state.speculative_prefetch and st.session_state.round < max_rounds_input:
+        st.session_state.prefetcher.start(
+            st.session_state.current_debate_id, st.session_state.topic, st.session_state.round, rl
+        )
+
+# Helper: rounds run as background jobs (generate + save); finished ones are picked up on the next rerun.
+# Jobs of debates that are no longer shown have already saved their round, so they are just dropped.
+ROUND_STAGE_LABELS = {
+    "queued": "Waiting for a worker",
+    "started": "Starting",
+    "context": "Waiting for the uploaded context to finish ingesting",
+    "coach": "Coach is drafting",
+    "opponent": "Opponent is responding",
+    "judge": "Judge is scoring",
+    "drafting": "Auto-play is drafting",
+    "saving": "Saving the round",
+}
+
+def harvest_round_jobs():
+    for debate_id, job_id in list(st.session_state.round_jobs.items()):
+        job = get_round_job(job_id)
+        running = job is not None and job["status"] in ("queued", "running")
+        if not running:
+            del st.session_state.round_jobs[debate_id]
+        if job is None or debate_id != st.session_state.current_debate_id:
+            continue
+        if job["status"] == "error":
+            st.error(f"Round generation failed: {job['error']}")
+
+        for result in finished_rounds(job):
+            round_internal = result["round"]
+            st.session_state.round = max(st.session_state.round, round_internal + 1)
+            st.session_state.latest_judge_data = result["judge_scores"]
+            # The chat may already show the saved round (rebuilt from storage on a rerun); don't add it twice
+            if any(m["round"] == round_internal for m in st.session_state.chat_history):
+                continue
+            for warning in result["warnings"]:
+                st.warning(warning)
+            append_chat_for_round(result["coached"], result["opponent"], round_internal)
+            # Auto-played rounds are shown in full; the typing animation would only slow the run down
+            if job["kind"] == "round":
+                st.session_state.stream_round_idx = round_internal
+                st.session_state.stream_speaker = 'coach'
+                st.toast(f"Round {round_internal + 1} completed.", icon="✅")
+
+        if job["kind"] == "autoplay" and job["status"] == "done":
+            summary = job["result"]
+            st.toast(
+                f"Auto-play finished {len(summary['rounds'])} rounds in {summary['wall_sec']:.0f}s "
+                f"({summary['llm_sec']:.0f}s of LLM time, {summary['usage']['total_tokens']:,} tokens).", icon="✅"
+            )
+            if summary["stopped"]:
+                st.warning(f"Auto-play stopped early: {summary['stopped']}")
+        if not running:
+            maybe_prefetch_next_round()
+
+@st.fragment(run_every=1.0)
+def round_progress(debate_id: str):
+    """Polls the debate's running round; reruns the whole app once it has finished."""
+    job = get_round_job(st.session_state.round_jobs.get(debate_id))
+    if not job or job["status"] not in ("queued", "running"):
+        st.rerun()
+    # Auto-play: show each round as soon as it has been saved
+    landed = finished_rounds(job)
+    if landed and landed[-1]["round"] >= st.session_state.round:
+        st.rerun()
+    label = ROUND_STAGE_LABELS.get(job["stage"], job["stage"])
+    st.progress(job["progress"], text=f"Round {job.get('current', st.session_state.round) + 1}: {label}…")
+    if job.get("judge_fields"):
+        st.markdown(partial_judge_html(job["judge_fields"], st.session_state.round + 1), unsafe_allow_html=True)
+
+
+# Helper: exports are cached by (debate_id, debate.csv mtime/size), so a download after new rounds is rebuilt
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_debate_export(debate_id: str, version: tuple, fmt: str) -> bytes:
+    return export_debate_csv(debate_id) if fmt == "csv" else export_debate_json(debate_id)
+
+# Helper: the Dashboard's full tables, cached by both CSVs' (mtime, size); reruns without new rounds only stat the files
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_debate_tables(debate_id: str, version: tuple):
+    return read_debate(debate_id), read_judge(debate_id)
+
+def debate_tables(debate_id: str):
+    return cached_debate_tables(debate_id, (debate_version(debate_id), judge_version(debate_id)))
+
+def debate_export_callable(debate_id: str, fmt: str):
+    """Deferred download data: runs only when the button is clicked."""
+    return lambda: cached_debate_export(debate_id, debate_version(debate_id), fmt)
+
+def all_debates_archive() -> bytes:
+    with open(write_all_debates_archive(), "rb") as f:
+        return f.read()
 
 
 # --- 5. Sidebar (unchanged functionality, trimmed UI controls removed) ---
@@ -440,12 +640,23 @@ with st.sidebar:
         key="max_rounds_input_key"
     )
 
+    st.toggle(
+        "Speculative prefetch",
+        value=SPECULATIVE_PREFETCH,
+        key="speculative_prefetch",
+        help="Draft the next round in the background while you read the current one.",
+    )
+    if not st.session_state.speculative_prefetch:
+        st.session_state.prefetcher.discard()
+
     if st.button("Start / Reset Simulation", use_container_width=True, key="start_debate_btn", type="primary"):
         if topic_input:
             st.cache_data.clear()
-            clear_pdf_context()
+            st.session_state.prefetcher.discard()
             topic = sanitize_topic(topic_input)
             new_debate_id = create_new_debate(topic)
+            # The new debate keeps the documents selected now, whatever is uploaded later
+            bind_debate_contexts(new_debate_id, st.session_state.get("context_select", []))
             st.session_state.current_debate_id = new_debate_id
             # reset everything (storage kept as is; we reset UI & session)
             st.session_state.debate_active = True
@@ -456,82 +667,25 @@ with st.sidebar:
             st.session_state.history_search = ""
             st.session_state.show_winner_popup = False # Reset popup
             st.session_state.winner_info = None
+            st.session_state.latest_judge_data = None
             # reset chat UI
             st.session_state.chat_history = []
+            st.session_state.chat_earlier_pages = 0
             
             # [MODIFIED] Reset streaming state
             st.session_state.stream_round_idx = -1
             st.session_state.stream_speaker = None
 
-            with st.spinner("Starting new simulation and drafting Round 1 arguments..."):
-                if 1 <= max_rounds_input:
-                    round_no = st.session_state.round
-                    st.session_state.round += 1
-
-                    template_idx, template_text = rl.select()
-                    df = read_debate(st.session_state.current_debate_id) 
-                    prev_args = df["coached_argument"].dropna().astype(str).tolist() if not df.empty else []
-
-                    try:
-                        coached = generate_coached_argument(template_text, st.session_state.topic, previous=prev_args)
-                    except Exception as e:
-                        # show the real error to the UI so you can debug (also saved in data/llm_last_response.json by call_openrouter)
-                        coached = f"Error generating coached argument: {e}"
-                        # optional: log to file
-                        try:
-                            os.makedirs("data", exist_ok=True)
-                            with open("data/llm_coach_error.txt", "a", encoding="utf-8") as fh:
-                                fh.write(f"{time.ctime()}: {str(e)}\n")
-                        except Exception:
-                            pass
-
-
-                    try:
-                        opponent = generate_opponent_argument(coached, st.session_state.topic)
-                    except Exception as e:
-                        opponent = f"Opponent generation failed: {e}"
-
-                    try:
-                        judge_scores = evaluate(coached, opponent, st.session_state.topic)
-                    except Exception as e:
-                        judge_scores = {
-                            "total_coached": 5.0,
-                            "total_opponent": 5.0,
-                            "notes_coached": f"Judge error: {e}",
-                            "notes_opponent": "Fallback evaluation."
-                        }
-
-                    reward = float(judge_scores.get("total_coached", 0)) - float(judge_scores.get("total_opponent", 0))
-
-                    append_round(st.session_state.current_debate_id,{
-                        "round": round_no,
-                        "speaker": "coached",
-                        "coached_argument": coached,
-                        "opponent_argument": opponent,
-                        "action": str(template_idx),
-                        "reward": reward
-                    })
-                    judge_scores['round'] = round_no # Add the round number to the dictionary
-                    append_judge(st.session_state.current_debate_id, judge_scores) # Pass only two arguments
-                    st.session_state.latest_judge_data = judge_scores
-
-                    try:
-                        rl.update(template_idx, reward)
-                    except Exception as e:
-                        st.warning(f"RL update failed: {e}")
-
-                    # Append chat messages UI-only
-                    append_chat_for_round(coached, opponent, round_no)
-                    
-                    # [MODIFIED] Set streaming state to start animation
-                    st.session_state.stream_round_idx = round_no
-                    st.session_state.stream_speaker = 'coach'
-
-                    st.toast("Simulation started and Round 1 generated.", icon="✅")
-                    time.sleep(0.3)
-                    st.rerun()
-                else:
-                    st.error("Total Rounds must be at least 1.")
+            if 1 <= max_rounds_input:
+                # Round 1 is drafted in the background, once any uploads still ingesting are ready
+                st.session_state.round_jobs[new_debate_id] = submit_round(
+                    new_debate_id, topic, st.session_state.round, rl, upload_jobs=pending_context_jobs()
+                )
+                st.toast("Simulation started; drafting Round 1 arguments...", icon="✅")
+                time.sleep(0.3)
+                st.rerun()
+            else:
+                st.error("Total Rounds must be at least 1.")
         else:
             st.error("Please enter a debate topic to start.")
 
@@ -558,6 +712,7 @@ with st.sidebar:
 
     # Reset storage (recreate CSVs & clear history)
     if st.button("Delete Chat History", use_container_width=True, key="reset_storage_btn"):
+        st.session_state.prefetcher.discard()
         init_storage()
         st.cache_data.clear()
         st.session_state.debate_active = False
@@ -567,9 +722,12 @@ with st.sidebar:
         st.session_state.view_round_idx = None
         st.session_state.history_search = ""
         st.session_state.chat_history = []
+        st.session_state.chat_earlier_pages = 0
         st.session_state.show_winner_popup = False # Reset popup
         st.session_state.winner_info = None
+        st.session_state.latest_judge_data = None
         st.session_state.current_debate_id = None
+        st.session_state.round_jobs = {}
         
         # [MODIFIED] Reset streaming state
         st.session_state.stream_round_idx = -1
@@ -615,6 +773,7 @@ with st.sidebar:
             selected_debate_id = debate_options[selected_display_name]
             
             st.cache_data.clear() # Clear cache
+            st.session_state.prefetcher.discard()
             
             # Load this debate into session state
             st.session_state.current_debate_id = selected_debate_id
@@ -626,12 +785,18 @@ with st.sidebar:
             
             # Rebuild chat
             st.session_state.chat_history = rebuild_chat_from_storage(selected_debate_id)
+            st.session_state.chat_earlier_pages = 0
             
             # Set topic
             st.session_state.topic = debate_options[selected_display_name].split(' (')[0]
             
             # Set round number
             st.session_state.round = int(df["round"].max() + 1) if not df.empty else 0
+            # Latest verdict for the Arena's judge panel (kept in the session from here on)
+            st.session_state.latest_judge_data = None
+            if not jd.empty:
+                latest_row = jd[jd["round"].astype(int) == st.session_state.round - 1]
+                st.session_state.latest_judge_data = (latest_row if not latest_row.empty else jd).iloc[-1].to_dict()
             
             # Reset streaming state
             st.session_state.stream_round_idx = -1
@@ -641,99 +806,25 @@ with st.sidebar:
             st.toast(f"Loaded debate: {selected_display_name}", icon="📚")
             st.rerun()
 
-    # Data export
+    # Data export (built only when a download button is clicked)
     st.markdown("<h3>Data Export</h3>", unsafe_allow_html=True)
-    df_hist = read_debate(st.session_state.current_debate_id)
-    if not df_hist.empty:
-        csv_export = df_hist.to_csv(index=False)
-        st.download_button("Download History (CSV)", csv_export, file_name="debate_history.csv", mime="text/csv", use_container_width=True, type="primary")
-        json_export = json.dumps(json.loads(df_hist.to_json(orient="records")), indent=2)
-        st.download_button("Download History (JSON)", json_export, file_name="debate_history.json", mime="application/json", use_container_width=True, type="primary")
+    export_version = debate_version(st.session_state.current_debate_id)
+    if export_version and st.session_state.round > 0:
+        st.download_button("Download History (CSV)", debate_export_callable(st.session_state.current_debate_id, "csv"), file_name="debate_history.csv", mime="text/csv", use_container_width=True, type="primary")
+        st.download_button("Download History (JSON)", debate_export_callable(st.session_state.current_debate_id, "json"), file_name="debate_history.json", mime="application/json", use_container_width=True, type="primary")
+    if list_debates():
+        st.download_button("Download All Debates (JSONL.gz)", all_debates_archive, file_name="debates.jsonl.gz", mime="application/gzip", use_container_width=True)
 
 # --- 6. Main content (Debate Arena with centered chat + judge box) ---
 
 # [NEW] Helper to render a full, non-streaming message
 def render_full_message_bubble(m: dict):
     """Renders a complete message bubble (not streaming)."""
-    speaker = m["speaker"]
-    text = m["text"]
     rnd = int(m.get("round", 0)) + 1
-    
-    # Sanitize text for HTML rendering
-    text = text.replace("<", "&lt;").replace(">", "&gt;").replace("\n", "<br>")
-
-    if speaker == "coach":
-        meta_html = f"<div class='msg-meta'>Coach • Round {rnd}</div>"
-        html = f"""
-        <div class='message-row message-row-left'>
-            <div class='avatar avatar-coach'>C</div>
-            <div class='message-content'>
-                {meta_html}
-                <div class='bubble-left'>
-                    <div>{text}</div>
-                </div>
-            </div>
-        </div>
-        """
-    else: # Opponent
-        meta_html = f"<div class='msg-meta'>Opponent • Round {rnd}</div>"
-        html = f"""
-        <div class='message-row message-row-right'>
-            <div class='message-content'>
-                {meta_html}
-                <div class='bubble-right'>
-                    <div>{text}</div>
-                </div>
-            </div>
-            <div class='avatar avatar-opponent'>O</div>
-        </div>
-        """
-    st.markdown(html, unsafe_allow_html=True)
+    st.markdown(bubble_html(m["speaker"], rnd, escape_text(m["text"])), unsafe_allow_html=True)
 
-# [NEW] Helper generator to stream text as HTML
-def stream_html_generator(full_text: str, speaker: str, round_num: int, word_delay=0.03):
-    """Yields complete HTML bubbles with progressively more text."""
-    
-    streamed_text = ""
-    # Sanitize and split
-    words = full_text.replace("<", "&lt;").replace(">", "&gt;").split(' ')
-    
-    if speaker == "coach":
-        meta_html = f"<div class='msg-meta'>Coach • Round {round_num}</div>"
-        for word in words:
-            streamed_text += word + " "
-            html = f"""
-            <div class='message-row message-row-left'>
-                <div class='avatar avatar-coach'>C</div>
-                <div class='message-content'>
-                    {meta_html}
-                    <div class='bubble-left'>
-                        <div>{streamed_text.replace("\n", "<br>")}</div>
-                    </div>
-                </div>
-            </div>
-            """
-            yield html
-            time.sleep(word_delay)
-            
-    else: # Opponent
-        meta_html = f"<div class='msg-meta'>Opponent • Round {round_num}</div>"
-        for word in words:
-            streamed_text += word + " "
-            html = f"""
-            <div class='message-row message-row-right'>
-                <div class='message-content'>
-                    {meta_html}
-                    <div class='bubble-right'>
-                        <div>{streamed_text.replace("\n", "<br>")}</div>
-                    </div>
-                </div>
-                <div class='avatar avatar-opponent'>O</div>
-            </div>
-            """
-            yield html
-            time.sleep(word_delay)
 
+harvest_round_jobs()
 
 if st.session_state.page == "Debate Arena":
     st.markdown("<h2>DEBATE ARENA: Real-Time Simulation</h2>", unsafe_allow_html=True)
@@ -795,75 +886,60 @@ if st.session_state.page == "Debate Arena":
                         else:
                             st.warning("No judge data available to determine a winner.")
                         st.rerun()
+                elif st.session_state.current_debate_id in st.session_state.round_jobs:
+                    job_id = st.session_state.round_jobs[st.session_state.current_debate_id]
+                    if (get_round_job(job_id) or {}).get("kind") == "autoplay":
+                        if st.button("Stop Auto-play", use_container_width=True, key="stop_autoplay_btn"):
+                            stop_autoplay(job_id)
+                            st.toast("Auto-play will stop after the rounds in progress.")
+                    else:
+                        st.button("Drafting…", use_container_width=True, key="next_round_btn_busy", disabled=True)
                 else:
                     if st.button("NEXT ROUND", use_container_width=True, key="next_round_btn_primary", type="primary", disabled=is_streaming):
-                        with st.spinner(f"Drafting Round {display_current_round + 1} arguments..."):
-                            round_to_generate_internal = st.session_state.round
-                            template_idx, template_text = rl.select()
-                            df = read_debate(st.session_state.current_debate_id)
-                            prev_args = df["coached_argument"].dropna().astype(str).tolist() if not df.empty else []
-
-                            try:
-                                coached = generate_coached_argument(template_text, st.session_state.topic, previous=prev_args)
-                                if not coached:
-                                    coached = "Coached model returned no valid response."
-                            except Exception as e:
-                                coached = f"Error generating coached argument: {e}"
-
-                            try:
-                                opponent = generate_opponent_argument(coached, st.session_state.topic)
-                            except Exception as e:
-                                opponent = f"Opponent generation failed: {e}"
-
-                            try:
-                                judge_scores = evaluate(coached, opponent, st.session_state.topic)
-                            except Exception as e:
-                                judge_scores = {
-                                    "total_coached": 5.0,
-                                    "total_opponent": 5.0,
-                                    "notes_coached": f"Judge error: {e}",
-                                    "notes_opponent": "Fallback evaluation."
-                                }
-
-                            reward = float(judge_scores.get("total_coached", 0)) - float(judge_scores.get("total_opponent", 0))
-
-                            append_round(st.session_state.current_debate_id,{
-                                "round": round_to_generate_internal,
-                                "speaker": "coached",
-                                "coached_argument": coached,
-                                "opponent_argument": opponent,
-                                "action": str(template_idx),
-                                "reward": reward
-                            })
-                            judge_scores['round'] = round_to_generate_internal # Add the round number to the dictionary
-                            append_judge(st.session_state.current_debate_id, judge_scores) # Pass only two arguments
-
-                            try:
-                                rl.update(template_idx, reward)
-                            except Exception as e:
-                                st.warning(f"RL update failed: {e}")
-
-                            # increment completed round counter
-                            st.session_state.round += 1
-
-                            # Append chat messages UI-only
-                            append_chat_for_round(coached, opponent, round_to_generate_internal)
-                            
-                            # [MODIFIED] Set streaming state
-                            st.session_state.stream_round_idx = round_to_generate_internal
-                            st.session_state.stream_speaker = 'coach'
+                        # Drafted (or taken from the speculative prefetch) in the background; the page stays usable
+                        st.session_state.round_jobs[st.session_state.current_debate_id] = submit_round(
+                            st.session_state.current_debate_id, st.session_state.topic, st.session_state.round, rl,
+                            prefetcher=st.session_state.prefetcher if st.session_state.speculative_prefetch else None,
+                        )
+                        st.session_state.view_round_idx = None
+                        st.session_state.show_winner_popup = False # Ensure popup is off
+                        st.session_state.winner_info = None # Clear winner info
+                        st.rerun()
+                    if st.button("Run Remaining Rounds", use_container_width=True, key="autoplay_btn", disabled=is_streaming):
+                        # One background pipeline for every remaining round; rounds appear in the chat as they land
+                        st.session_state.prefetcher.discard()
+                        st.session_state.round_jobs[st.session_state.current_debate_id] = submit_autoplay(
+                            st.session_state.current_debate_id, st.session_state.topic,
+                            st.session_state.round, int(max_r), rl,
+                        )
+                        st.session_state.view_round_idx = None
+                        st.rerun()
 
-                            st.toast(f"Round {display_current_round + 1} completed.", icon="✅")
-                            time.sleep(0.2)
-                            st.session_state.view_round_idx = None
-                            st.session_state.show_winner_popup = False # Ensure popup is off
-                            st.session_state.winner_info = None # Clear winner info
-                            st.rerun()
+        if st.session_state.current_debate_id in st.session_state.round_jobs:
+            round_progress(st.session_state.current_debate_id)
 
         # --- [MODIFIED] Chat Rendering with Streaming ---
         st.markdown("<div class='chat-wrapper'><div class='chat-box'>", unsafe_allow_html=True)
 
-        messages_to_render = st.session_state.chat_history
+        # Windowed chat: the latest CHAT_WINDOW_ROUNDS rounds are live bubbles (they may be streaming);
+        # earlier rounds are loaded a page at a time, each page one cached HTML block
+        live_start = max(st.session_state.round - CHAT_WINDOW_ROUNDS, 0)
+        earliest_loaded = live_start
+        if st.session_state.chat_earlier_pages:
+            # pages are aligned to multiples of CHAT_WINDOW_ROUNDS so only the page next to the live window changes
+            earliest_loaded = max(live_start - st.session_state.chat_earlier_pages * CHAT_WINDOW_ROUNDS, 0)
+            earliest_loaded -= earliest_loaded % CHAT_WINDOW_ROUNDS
+        if earliest_loaded > 0:
+            if st.button(f"Load earlier rounds ({earliest_loaded} more)", key="load_earlier_rounds_btn"):
+                st.session_state.chat_earlier_pages += 1
+                st.rerun()
+        page_start = earliest_loaded
+        while page_start < live_start:
+            page_end = min((page_start // CHAT_WINDOW_ROUNDS + 1) * CHAT_WINDOW_ROUNDS, live_start)
+            st.markdown(earlier_chat_html(st.session_state.current_debate_id, page_start, page_end), unsafe_allow_html=True)
+            page_start = page_end
+
+        messages_to_render = [m for m in st.session_state.chat_history if m["round"] >= live_start]
         streaming_round = st.session_state.stream_round_idx
         streaming_speaker = st.session_state.stream_speaker
         
@@ -879,15 +955,15 @@ if st.session_state.page == "Debate Arena":
             is_streaming_message = (msg_round == streaming_round) and (msg_speaker == streaming_speaker)
 
             if is_streaming_message:
-                # Render the message using the streaming generator
+                # Render the message using the frame-capped streaming renderer
                 placeholder = st.empty()
-                stream_generator = stream_html_generator(
+                stream_generator = stream_frames(
                     full_text=m["text"],
                     speaker=msg_speaker,
                     round_num=int(msg_round) + 1
                 )
                 
-                # This loop will run, replacing the content of `placeholder`
+                # This loop will run, replacing the content of `placeholder` once per frame
                 for html_chunk in stream_generator:
                     placeholder.markdown(html_chunk, unsafe_allow_html=True)
                 
@@ -908,36 +984,27 @@ if st.session_state.page == "Debate Arena":
         st.markdown("</div></div>", unsafe_allow_html=True)  # close chat-box & wrapper
         
         # --- [MODIFIED] Judge Panel Logic ---
-        jd = read_judge(st.session_state.current_debate_id)
-        df = read_debate(st.session_state.current_debate_id)
-        
+        # The latest verdict comes from the session (set when a round lands or a debate is loaded),
+        # so reruns and streaming steps don't re-read the debate's CSVs
         latest_judge = st.session_state.latest_judge_data
         # Show judge only if we are NOT currently streaming
         if st.session_state.stream_round_idx == -1 and st.session_state.stream_speaker is None:
-            if (not jd.empty) and (len(st.session_state.chat_history) > 0):
-                # determine latest stored round number
-                latest_round_internal = int(df["round"].max()) if not df.empty else None
-                if latest_round_internal is not None:
-                    # fetch latest judge entry (match by round)
-                    latest_judge_row = jd[jd["round"].astype(int) == latest_round_internal]
-                    if latest_judge_row.empty:
-                        latest_judge = jd.iloc[-1].to_dict()  # fallback
-                    else:
-                        latest_judge = latest_judge_row.iloc[-1].to_dict()
-
-                    # Render judge box centered and same width as chatbox
-                    judge_html = f"""
-                        <div class='judge-wrapper'>
-                            <div class='judge-box'>
-                                <div style='font-weight:700; margin-bottom:6px;'>Judge Evaluation — Round {int(latest_judge.get('round', 0)) + 1}</div>
-                                <div><b>Coach:</b> {format_score_as_points(latest_judge.get('total_coached', 'N/A'))}/10 &nbsp; | &nbsp; <b>Opponent:</b> {format_score_as_points(latest_judge.get('total_opponent', 'N/A'))}/10</div>
-                                <div class='chat-sep'></div>
-                                <div><b>Notes (Coach):</b> {latest_judge.get('notes_coached','No notes provided.')}</div>
-                                <div style='margin-top:6px;'><b>Notes (Opponent):</b> {latest_judge.get('notes_opponent','No notes provided.')}</div>
-                            </div>
+            if latest_judge and (len(st.session_state.chat_history) > 0):
+                # Render judge box centered and same width as chatbox
+                notes_c = html.escape(str(latest_judge.get('notes_coached', 'No notes provided.')))
+                notes_o = html.escape(str(latest_judge.get('notes_opponent', 'No notes provided.')))
+                judge_html = f"""
+                    <div class='judge-wrapper'>
+                        <div class='judge-box'>
+                            <div style='font-weight:700; margin-bottom:6px;'>Judge Evaluation — Round {int(latest_judge.get('round', st.session_state.round - 1)) + 1}</div>
+                            <div><b>Coach:</b> {format_score_as_points(latest_judge.get('total_coached', 'N/A'))}/10 &nbsp; | &nbsp; <b>Opponent:</b> {format_score_as_points(latest_judge.get('total_opponent', 'N/A'))}/10</div>
+                            <div class='chat-sep'></div>
+                            <div><b>Notes (Coach):</b> {notes_c}</div>
+                            <div style='margin-top:6px;'><b>Notes (Opponent):</b> {notes_o}</div>
                         </div>
-                    """
-                    st.markdown(judge_html, unsafe_allow_html=True)
+                    </div>
+                """
+                st.markdown(judge_html, unsafe_allow_html=True)
 
         # --- [NEW] Rerun Trigger ---
         # If a stream just finished, trigger a rerun to stream the next part or show the judge
@@ -946,11 +1013,10 @@ if st.session_state.page == "Debate Arena":
 
         # quick fallback history expander (keeps previous quick-history view)
         with st.expander("Quick history (latest rounds)", expanded=False):
-            df = read_debate(st.session_state.current_debate_id)
-            recent = df.tail(5).reset_index(drop=True)
+            recent = read_last_rounds(st.session_state.current_debate_id, 5)
             for _, r in recent.iterrows():
                 st.markdown(f"**Round {int(r['round'] + 1)}** --- <span class='small-muted'>{str(r.get('coached_argument',''))[:120].replace(chr(10),' ') + ('...' if len(str(r.get('coached_argument','')))>120 else '')}</span>", unsafe_allow_html=True)
-            st.download_button("Download full history (CSV)", df.to_csv(index=False), file_name="debate_history.csv", mime="text/csv", use_container_width=True, key="arena_download_full_hist", type="primary")
+            st.download_button("Download full history (CSV)", debate_export_callable(st.session_state.current_debate_id, "csv"), file_name="debate_history.csv", mime="text/csv", use_container_width=True, key="arena_download_full_hist", type="primary")
 
 
 # --- Dashboard (unchanged except style) ---
@@ -959,8 +1025,10 @@ elif st.session_state.page == "Dashboard":
     st.markdown("<p style='color:#a6b1bf;'>Monitor the Reinforcement Learning Agent's performance and strategy effectiveness.</p>", unsafe_allow_html=True)
     st.divider()
 
-    jd = read_judge(st.session_state.current_debate_id)
-    df = read_debate(st.session_state.current_debate_id)
+    if st.session_state.current_debate_id in st.session_state.round_jobs:
+        round_progress(st.session_state.current_debate_id)
+
+    df, jd = debate_tables(st.session_state.current_debate_id)
 
     if st.session_state.current_debate_id is None:
         st.info("Please start a new debate or load a past debate from the sidebar.")
@@ -1060,6 +1128,102 @@ elif st.session_state.page == "Dashboard":
 
         st.divider()
 
+        parse_stats = judge_parse_stats()
+        if parse_stats["calls"]:
+            st.caption(
+                f"Judge output validation (this session): {parse_stats['calls']} calls, "
+                f"{parse_stats['reasks']} re-asks, {parse_stats['failures']} failures "
+                f"({parse_stats['failure_rate']*100:.1f}% failure rate)."
+            )
+
+        prescore_stats = prescore_report()
+        if prescore_stats["rounds"]:
+            with st.expander("Tiered Judging (Local Pre-Scorer)", expanded=False):
+                p1, p2, p3 = st.columns(3)
+                with p1:
+                    st.metric("Rounds Settled Locally", f"{prescore_stats['skip_rate']*100:.0f}%",
+                              delta=f"{prescore_stats['rounds']} rounds scored", delta_color="off")
+                with p2:
+                    audit_agree = prescore_stats["audit_agreement"]
+                    st.metric("Agreement on Audited Rounds", "N/A" if audit_agree is None else f"{audit_agree*100:.0f}%",
+                              delta=f"{prescore_stats['audited']} audited", delta_color="off")
+                with p3:
+                    esc_agree = prescore_stats["escalated_agreement"]
+                    st.metric("Winner Match on Close Rounds", "N/A" if esc_agree is None else f"{esc_agree*100:.0f}%",
+                              delta=f"{prescore_stats['escalated']} escalated", delta_color="off")
+                if prescore_stats["by_judge"]:
+                    st.caption("Agreement per judge (rounds that judge scored)")
+                    st.dataframe(pd.DataFrame(prescore_stats["by_judge"]).T[
+                        ["audited", "audit_agreement", "escalated", "escalated_agreement"]
+                    ], use_container_width=True)
+
+        prefetch_stats = prefetch_report()
+        if prefetch_stats["started"]:
+            with st.expander("Speculative Prefetch", expanded=False):
+                f1, f2, f3 = st.columns(3)
+                with f1:
+                    hit_rate = prefetch_stats["hit_rate"]
+                    st.metric("Hit Rate", "N/A" if hit_rate is None else f"{hit_rate*100:.0f}%",
+                              delta=f"{prefetch_stats['hits']} hits / {prefetch_stats['misses']} misses", delta_color="off")
+                with f2:
+                    st.metric("Waiting Time Saved", f"{prefetch_stats['time_saved_sec']:.1f}s")
+                with f3:
+                    st.metric("Discarded", prefetch_stats["discarded"],
+                              delta=f"{prefetch_stats['started']} started", delta_color="off")
+
+        usage = read_usage(st.session_state.current_debate_id)
+        if not usage.empty:
+            with st.expander("Token Usage & Cost", expanded=False):
+                spent = sum_usage(usage)
+                u1, u2, u3 = st.columns(3)
+                with u1:
+                    st.metric("Tokens (This Debate)", f"{spent['total_tokens']:,.0f}",
+                              delta=f"of {DEBATE_TOKEN_BUDGET:,} budget" if DEBATE_TOKEN_BUDGET else f"{spent['calls']:.0f} LLM calls",
+                              delta_color="off")
+                with u2:
+                    st.metric("Cost (This Debate)", f"${spent['cost_usd']:.4f}",
+                              delta=f"of ${DEBATE_COST_BUDGET:.2f} budget" if DEBATE_COST_BUDGET else None,
+                              delta_color="off")
+                with u3:
+                    n_rounds = usage["round"].nunique()
+                    st.metric("Tokens per Round", f"{spent['total_tokens'] / n_rounds:,.0f}",
+                              delta=f"{n_rounds} rounds metered", delta_color="off")
+                if usage["estimated"].astype(str).str.lower().eq("true").any():
+                    st.caption("Some calls reported no usage; their tokens are estimated.")
+
+                col_u1, col_u2 = st.columns(2)
+                with col_u1:
+                    st.caption("Tokens by Role (By Round)")
+                    by_round = usage_by_round(usage).drop(columns="cost_usd")
+                    by_round.index = by_round.index + 1
+                    st.bar_chart(by_round, height=300)
+                with col_u2:
+                    st.caption("Cost per Point of Reward by Strategy (Action)")
+                    by_template = usage_by_template(usage, df)
+                    per_point = by_template["cost_per_point"] if spent["cost_usd"] else by_template["tokens_per_point"]
+                    if per_point.notna().any():
+                        st.bar_chart(per_point.dropna().rename("Cost per point" if spent["cost_usd"] else "Tokens per point"),
+                                     height=300)
+                    else:
+                        st.info("No strategy has a positive total reward yet.")
+                st.dataframe(by_template, use_container_width=True)
+
+        judge_stats = read_judge_stats(st.session_state.current_debate_id)
+        if not judge_stats.empty:
+            with st.expander("Judge Ensemble Statistics (Latency & Agreement)", expanded=False):
+                ok_stats = judge_stats[judge_stats["status"] == "ok"]
+                summary = judge_stats.groupby("model").agg(
+                    calls=("status", "size"),
+                    answered=("status", lambda x: int((x == "ok").sum())),
+                )
+                if not ok_stats.empty:
+                    summary = summary.join(ok_stats.groupby("model").agg(
+                        avg_latency_sec=("latency_sec", "mean"),
+                        agreement_rate=("agreed", lambda x: x.astype(str).str.lower().eq("true").mean()),
+                        avg_margin_deviation=("margin_deviation", "mean"),
+                    ))
+                st.dataframe(summary, use_container_width=True)
+
         st.subheader("Raw Simulation Data")
         with st.expander("View Full Round Details Table"):
             st.dataframe(df.assign(Round_Display=df["round"] + 1), use_container_width=True) 
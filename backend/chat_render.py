@@ -0,0 +1,74 @@
+# backend/chat_render.py
+"""
+HTML for the Arena chat bubbles and a frame-capped streaming renderer.
+
+The old typing animation rebuilt and re-sent the whole bubble for every word,
+so a message of n words cost O(n^2) bytes over the websocket and as much work
+re-escaping the text. stream_frames() instead coalesces the words that became
+due since the last frame into a single update, sends at most STREAM_FPS frames
+per second (none when nothing changed) and escapes each word only once.
+STREAM_MAX_SECONDS speeds long messages up so one animation never takes longer
+than that, which also bounds the total bytes sent per message.
+
+A Streamlit element can only be replaced, not patched, so each frame still
+carries the bubble; the savings come from sending far fewer of them.
+"""
+import time
+from typing import Callable, Iterator
+
+from .config import STREAM_FPS, STREAM_WORDS_PER_SEC, STREAM_MAX_SECONDS
+
+SPEAKER_LABELS = {"coach": "Coach", "opponent": "Opponent"}
+
+
+def escape_text(text: str) -> str:
+    """Makes message text safe to embed in the bubble HTML."""
+    return text.replace("<", "&lt;").replace(">", "&gt;").replace("\n", "<br>")
+
+
+def bubble_html(speaker: str, round_num: int, body_html: str) -> str:
+    """One chat row: avatar, speaker/round line and the bubble (coach on the left, opponent on the right)."""
+    meta_html = f"<div class='msg-meta'>{SPEAKER_LABELS.get(speaker, speaker)} • Round {round_num}</div>"
+    if speaker == "coach":
+        return (
+            "<div class='message-row message-row-left'>"
+            "<div class='avatar avatar-coach'>C</div>"
+            f"<div class='message-content'>{meta_html}<div class='bubble-left'><div>{body_html}</div></div></div>"
+            "</div>"
+        )
+    return (
+        "<div class='message-row message-row-right'>"
+        f"<div class='message-content'>{meta_html}<div class='bubble-right'><div>{body_html}</div></div></div>"
+        "<div class='avatar avatar-opponent'>O</div>"
+        "</div>"
+    )
+
+
+def stream_frames(full_text: str, speaker: str, round_num: int,
+                  words_per_sec: float = STREAM_WORDS_PER_SEC, fps: float = STREAM_FPS,
+                  max_seconds: float = STREAM_MAX_SECONDS,
+                  clock: Callable[[], float] = time.perf_counter,
+                  sleep: Callable[[float], None] = time.sleep) -> Iterator[str]:
+    """
+    Yields bubble HTML revealing full_text word by word at words_per_sec (faster
+    if needed to finish within max_seconds), at most `fps` frames per second.
+    The last frame always holds the complete text.
+    """
+    words = [escape_text(w) for w in full_text.split(" ")]
+    if max_seconds:
+        words_per_sec = max(words_per_sec, len(words) / max_seconds)
+    frame_interval = 1.0 / fps if fps else 0.0
+
+    body = ""
+    shown = 0
+    started = clock()
+    while shown < len(words):
+        # every word that became due since the previous frame goes out in this one
+        due = min(len(words), int((clock() - started) * words_per_sec) + 1)
+        if due > shown:
+            chunk = " ".join(words[shown:due])
+            body = f"{body} {chunk}" if body else chunk
+            shown = due
+            yield bubble_html(speaker, round_num, body)
+        if shown < len(words):
+            sleep(frame_interval)
@@ -1,4 +1,5 @@
 # backend/config.py
+import json
 import os
 from dotenv import load_dotenv
 
@@ -18,6 +19,7 @@ MODEL_JUDGE = os.getenv("MODEL_JUDGE", "mistralai/mistral-7b-instruct")
 
 # Timeouts (seconds)
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))  # pooled connections shared by all LLM calls
 
 # RL policy / template choices
 TEMPLATES = [
@@ -29,5 +31,107 @@ TEMPLATES = [
     "Prioritize clarity and brevity with a strong summary."
 ]
 
+# Judge structured output: "json_schema", "json_object" or "off" (plain prompting)
+JUDGE_STRUCTURED_OUTPUT = os.getenv("JUDGE_STRUCTURED_OUTPUT", "json_schema").lower()
+# Re-asks allowed when the judge returns output that fails validation
+JUDGE_MAX_REASKS = int(os.getenv("JUDGE_MAX_REASKS", "1"))
+
+# Stream the judge call so scores show up in the Arena as they are generated
+JUDGE_STREAMING = os.getenv("JUDGE_STREAMING", "1").lower() in ("1", "true", "yes")
+
+# Arena typing animation: frames per second, reveal speed, and the longest one message may take
+STREAM_FPS = float(os.getenv("STREAM_FPS", "20"))
+STREAM_WORDS_PER_SEC = float(os.getenv("STREAM_WORDS_PER_SEC", "33"))
+STREAM_MAX_SECONDS = float(os.getenv("STREAM_MAX_SECONDS", "8"))
+
+# Arena chat: rounds shown as live bubbles; earlier rounds load in pages of this size
+CHAT_WINDOW_ROUNDS = int(os.getenv("CHAT_WINDOW_ROUNDS", "5"))
+
+# Judge batching: max (coached, opponent) pairs packed into one judge call
+JUDGE_BATCH_SIZE = int(os.getenv("JUDGE_BATCH_SIZE", "4"))
+
+# Judge ensemble: comma-separated judge models queried in parallel (empty = single MODEL_JUDGE)
+JUDGE_ENSEMBLE_MODELS = [m.strip() for m in os.getenv("JUDGE_ENSEMBLE_MODELS", "").split(",") if m.strip()]
+JUDGE_ENSEMBLE_AGGREGATE = os.getenv("JUDGE_ENSEMBLE_AGGREGATE", "median")  # "median" or "trimmed_mean"
+JUDGE_ENSEMBLE_TRIM = float(os.getenv("JUDGE_ENSEMBLE_TRIM", "0.25"))  # fraction trimmed from each end
+JUDGE_ENSEMBLE_QUORUM = int(os.getenv("JUDGE_ENSEMBLE_QUORUM", "2"))  # judges that must agree to stop early
+JUDGE_ENSEMBLE_TOLERANCE = float(os.getenv("JUDGE_ENSEMBLE_TOLERANCE", "1.0"))  # points on the total score
+JUDGE_ENSEMBLE_TIMEOUT = float(os.getenv("JUDGE_ENSEMBLE_TIMEOUT", str(HTTP_TIMEOUT)))
+
+# Tiered judging: settle clear-cut rounds with the local pre-scorer, escalate close ones to the LLM judge
+PRESCORE_ENABLED = os.getenv("PRESCORE_ENABLED", "0").lower() in ("1", "true", "yes")
+PRESCORE_MARGIN = float(os.getenv("PRESCORE_MARGIN", "3.0"))  # estimated score gap that counts as clear-cut
+PRESCORE_AUDIT_RATE = float(os.getenv("PRESCORE_AUDIT_RATE", "0.1"))  # share of settled rounds still sent to the judge
+
+# Rolling debate memory: recent rounds kept verbatim, older ones compressed into an extractive summary
+MEMORY_RECENT_ROUNDS = int(os.getenv("MEMORY_RECENT_ROUNDS", "2"))
+MEMORY_SUMMARY_SENTENCES = int(os.getenv("MEMORY_SUMMARY_SENTENCES", "6"))
+MEMORY_POOL_SIZE = int(os.getenv("MEMORY_POOL_SIZE", "40"))  # candidate sentences kept between rounds
+
+# Prompt token budgets per role (instruction + history + reference material)
+TOKEN_BUDGETS = {
+    "coach": int(os.getenv("TOKEN_BUDGET_COACH", "1500")),
+    "opponent": int(os.getenv("TOKEN_BUDGET_OPPONENT", "1500")),
+    "judge": int(os.getenv("TOKEN_BUDGET_JUDGE", "2000")),
+    "default": int(os.getenv("TOKEN_BUDGET_DEFAULT", "1500")),
+}
+# Share of the non-instruction budget offered to debate history (the rest goes to reference passages)
+HISTORY_BUDGET_SHARE = float(os.getenv("HISTORY_BUDGET_SHARE", "0.4"))
+
+# PDF ingestion: lines repeated at page edges on this share of pages are dropped as headers/footers
+INGEST_EDGE_LINES = int(os.getenv("INGEST_EDGE_LINES", "3"))  # lines at the top and bottom of a page checked
+INGEST_REPEAT_SHARE = float(os.getenv("INGEST_REPEAT_SHARE", "0.2"))
+
+# Background ingestion workers, and how long a starting debate waits for its uploads
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+INGEST_WAIT_TIMEOUT = float(os.getenv("INGEST_WAIT_TIMEOUT", "300"))
+
+# Reference document digest: ranked key points extracted once at upload and reused by every prompt
+DIGEST_KEY_POINTS = int(os.getenv("DIGEST_KEY_POINTS", "12"))
+
+# Extracted text is read through mmap in chunks of about this many bytes (cut at line ends)
+CONTEXT_CHUNK_BYTES = int(os.getenv("CONTEXT_CHUNK_BYTES", "65536"))
+
+# Context library: digests of this many documents are kept in memory, shared by all sessions
+CONTEXT_CACHE_SIZE = int(os.getenv("CONTEXT_CACHE_SIZE", "32"))
+
+# Background round generation workers (shared by all sessions) and opt-in speculative prefetch of the next round
+ROUND_WORKERS = int(os.getenv("ROUND_WORKERS", "4"))
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "0").lower() in ("1", "true", "yes")
+
 # Round limit
 MAX_ROUNDS = int(os.getenv("MAX_ROUNDS", "5"))
+
+# Write-behind CSV appends (rounds and judge rows): queue bound, group commit size/window, fsync policy (off/batch/interval)
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "1").lower() in ("1", "true", "yes")
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "1000"))
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", "200"))
+WRITE_BEHIND_LINGER_MS = float(os.getenv("WRITE_BEHIND_LINGER_MS", "20"))
+WRITE_BEHIND_FSYNC = os.getenv("WRITE_BEHIND_FSYNC", "batch").lower()
+WRITE_BEHIND_FSYNC_INTERVAL = float(os.getenv("WRITE_BEHIND_FSYNC_INTERVAL", "1.0"))
+
+# Structured LLM call log (data/llm_calls.jsonl, see backend/llm_log.py)
+LLM_LOG_ENABLED = os.getenv("LLM_LOG_ENABLED", "1").lower() in ("1", "true", "yes")
+LLM_LOG_SAMPLE_RATE = float(os.getenv("LLM_LOG_SAMPLE_RATE", "1.0"))  # share of successful calls kept; failures always are
+LLM_LOG_BODY_CHARS = int(os.getenv("LLM_LOG_BODY_CHARS", "2000"))
+LLM_LOG_MAX_BYTES = int(os.getenv("LLM_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LLM_LOG_BACKUPS = int(os.getenv("LLM_LOG_BACKUPS", "3"))
+LLM_LOG_QUEUE_SIZE = int(os.getenv("LLM_LOG_QUEUE_SIZE", "1000"))
+
+# Token/cost accounting: ask OpenRouter to report each call's cost, and prices (USD per 1M prompt/completion
+# tokens) for responses without one, as JSON: {"meta-llama/llama-3.1-8b-instruct": [0.02, 0.03]}
+LLM_USAGE_ACCOUNTING = os.getenv("LLM_USAGE_ACCOUNTING", "1").lower() in ("1", "true", "yes")
+LLM_PRICES = {model: tuple(price) for model, price in json.loads(os.getenv("LLM_PRICES", "{}")).items()}
+# Budgets (0 = unlimited): generation stops once a debate, or one auto-play run, has spent this much
+DEBATE_TOKEN_BUDGET = int(os.getenv("DEBATE_TOKEN_BUDGET", "0"))
+DEBATE_COST_BUDGET = float(os.getenv("DEBATE_COST_BUDGET", "0"))
+BATCH_TOKEN_BUDGET = int(os.getenv("BATCH_TOKEN_BUDGET", "0"))
+BATCH_COST_BUDGET = float(os.getenv("BATCH_COST_BUDGET", "0"))
+
+# LLM record/replay (backend/llm_cassette.py): "off", "record" (call the API and save responses) or "replay" (offline);
+# replayed latencies are scaled by LLM_CASSETTE_LATENCY_SCALE (0 = no waiting); unrecorded requests take the next
+# recording for the same model ("sequence") or fail ("error")
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", os.path.join("data", "cassettes", "llm.jsonl"))
+LLM_CASSETTE_LATENCY_SCALE = float(os.getenv("LLM_CASSETTE_LATENCY_SCALE", "1.0"))
+LLM_CASSETTE_MISS = os.getenv("LLM_CASSETTE_MISS", "sequence").lower()
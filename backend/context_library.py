@@ -0,0 +1,255 @@
+# backend/context_library.py
+"""
+Library of ingested reference documents, shared by all debates.
+
+Each uploaded PDF is stored once under data/contexts/<id>/, where <id> is a
+hash of the PDF bytes: the normalized text (text.txt), its key-points digest
+(context_digest.json) and metadata (meta.json). Re-uploading the same file is
+a no-op. Each debate records the context IDs it uses in contexts.json inside
+its folder, so a new upload never changes the material of other debates.
+
+Digests are content-addressed and therefore immutable, so they are served from
+a process-wide LRU cache shared by every session; full texts are only read in
+slices through backend/context_store.py.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .config import CONTEXT_CACHE_SIZE, INGEST_WORKERS, INGEST_WAIT_TIMEOUT
+from .digest import write_context_digest, load_context_digest, render_digest, get_digest_path
+from .ingest import ingest_pdf
+from .jobs import JobQueue
+from .context_store import get_store
+from .memory_manager import DATA_DIR
+
+CONTEXTS_DIR = os.path.join(DATA_DIR, "contexts")
+LEGACY_CONTEXT_PATH = os.path.join(DATA_DIR, "extracted_text.txt")
+CONTEXT_TEXT_FILENAME = "text.txt"
+CONTEXT_META_FILENAME = "meta.json"
+CONTEXT_BINDINGS_FILENAME = "contexts.json"
+UPLOADS_DIR = os.path.join(CONTEXTS_DIR, ".uploads")
+UPLOAD_BLOCK_BYTES = 1024 * 1024
+
+# Extraction, normalization, indexing and digesting run here, off the UI / request thread
+ingest_queue = JobQueue(INGEST_WORKERS, name="ingest")
+
+
+def context_id_for(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def get_context_dir(context_id: str) -> str:
+    return os.path.join(CONTEXTS_DIR, context_id)
+
+
+def get_context_text_path(context_id: str) -> str:
+    return os.path.join(get_context_dir(context_id), CONTEXT_TEXT_FILENAME)
+
+
+def get_context_meta(context_id: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(get_context_dir(context_id), CONTEXT_META_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def list_contexts() -> List[dict]:
+    """Metadata of every document in the library, newest first."""
+    if not os.path.exists(CONTEXTS_DIR):
+        return []
+    metas = [get_context_meta(c) for c in os.listdir(CONTEXTS_DIR)]
+    return sorted([m for m in metas if m], key=lambda m: m.get("created", 0), reverse=True)
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(UPLOAD_BLOCK_BYTES), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def add_context(pdf_file, name: str = None, progress: Callable[[str, float], None] = None) -> dict:
+    """
+    Ingests a PDF (path, bytes or file-like object) into the library and returns
+    its metadata. A document that is already stored is not ingested again.
+    Paths are hashed and parsed straight from disk.
+    """
+    if isinstance(pdf_file, str):
+        context_id = _file_hash(pdf_file)
+        source = pdf_file
+    else:
+        if isinstance(pdf_file, (bytes, bytearray)):
+            data = bytes(pdf_file)
+        else:
+            pdf_file.seek(0)
+            data = pdf_file.read()
+        context_id = context_id_for(data)
+        source = io.BytesIO(data)
+
+    meta = get_context_meta(context_id)
+    if meta:
+        return meta
+
+    # Build in a scratch folder and move it into place, so readers never see a half-written context
+    os.makedirs(CONTEXTS_DIR, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=".ingest-", dir=CONTEXTS_DIR)
+    try:
+        text_path = os.path.join(scratch, CONTEXT_TEXT_FILENAME)
+        stats = ingest_pdf(source, text_path, progress=progress)
+        if progress:
+            progress("digest")
+        digest = write_context_digest(source_path=text_path)
+        meta = {
+            "id": context_id,
+            "name": name or context_id,
+            "created": time.time(),
+            "ingest": stats,
+            "key_points": len(digest["key_points"]),
+        }
+        with open(os.path.join(scratch, CONTEXT_META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        try:
+            os.rename(scratch, get_context_dir(context_id))
+        except OSError:
+            # Another session stored the same document first
+            shutil.rmtree(scratch, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    return get_context_meta(context_id) or meta
+
+
+def save_upload(fileobj, name: str = "upload.pdf") -> str:
+    """Streams an uploaded file to a temporary file on disk in fixed-size blocks; returns its path."""
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=".upload-", suffix=os.path.splitext(name)[1] or ".pdf", dir=UPLOADS_DIR)
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(fileobj, out, UPLOAD_BLOCK_BYTES)
+    return path
+
+
+def _ingest_upload(path: str, name: str, progress: Callable[[str, float], None] = None) -> dict:
+    try:
+        return add_context(path, name, progress=progress)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def submit_upload(fileobj, name: str) -> str:
+    """Saves an upload to disk and queues its ingestion; returns the job ID to poll."""
+    path = save_upload(fileobj, name)
+    return ingest_queue.submit("ingest", _ingest_upload, path, name)
+
+
+def get_ingest_job(job_id: str) -> Optional[dict]:
+    """Job status: status (queued/running/done/error), stage, progress, result (context meta), error."""
+    return ingest_queue.get(job_id)
+
+
+def wait_for_uploads(job_ids: List[str], timeout: float = INGEST_WAIT_TIMEOUT) -> Tuple[List[str], List[str]]:
+    """Waits for ingestion jobs; returns (context IDs that are ready, error messages)."""
+    ready, errors = [], []
+    for job in ingest_queue.wait(job_ids, timeout):
+        if job is None:
+            errors.append("unknown ingestion job")
+        elif job["status"] == "done":
+            ready.append(job["result"]["id"])
+        elif job["status"] == "error":
+            errors.append(f"ingestion failed: {job['error']}")
+        else:
+            errors.append(f"ingestion still {job['stage']} after {timeout:.0f}s")
+    return ready, errors
+
+
+def delete_context(context_id: str):
+    """Removes a document from the library (debates bound to it simply lose that reference)."""
+    _context_digest.cache_clear()
+    shutil.rmtree(get_context_dir(context_id), ignore_errors=True)
+
+
+@lru_cache(maxsize=CONTEXT_CACHE_SIZE)
+def _context_digest(context_id: str) -> str:
+    try:
+        with open(get_digest_path(get_context_text_path(context_id)), "r", encoding="utf-8") as f:
+            return render_digest(json.load(f))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error loading context {context_id}: {e}")
+        return ""
+
+
+def load_contexts(context_ids: Optional[List[str]] = None) -> str:
+    """
+    Reference material for a prompt: the digests of the given documents.
+    None means "no per-debate binding" and falls back to the legacy global
+    data/extracted_text.txt digest.
+    """
+    if context_ids is None:
+        return load_context_digest()
+    parts = []
+    for context_id in context_ids:
+        digest = _context_digest(context_id)
+        if digest:
+            meta = get_context_meta(context_id) or {}
+            parts.append(f"[{meta.get('name', context_id)}]\n{digest}" if len(context_ids) > 1 else digest)
+    return "\n\n".join(parts)
+
+
+def _text_paths(context_ids: Optional[List[str]]) -> List[str]:
+    return [LEGACY_CONTEXT_PATH] if context_ids is None else [get_context_text_path(c) for c in context_ids]
+
+
+def iter_context_chunks(context_ids: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Full normalized text of the given documents (None: the legacy global file),
+    yielded chunk by chunk from the memory-mapped stores.
+    """
+    for path in _text_paths(context_ids):
+        store = get_store(path)
+        if store:
+            yield from store.iter_chunks()
+
+
+def preview_context(context_id: str, n_chars: int = 1000) -> str:
+    """First n_chars characters of a document, without reading the rest."""
+    store = get_store(get_context_text_path(context_id))
+    return store.preview(n_chars) if store else ""
+
+
+def get_bindings_path(debate_id: str) -> str:
+    return os.path.join(DATA_DIR, debate_id, CONTEXT_BINDINGS_FILENAME)
+
+
+def bind_debate_contexts(debate_id: str, context_ids: List[str]):
+    """Records which library documents a debate uses."""
+    if not debate_id:
+        return
+    try:
+        with open(get_bindings_path(debate_id), "w", encoding="utf-8") as f:
+            json.dump(list(context_ids), f)
+    except Exception as e:
+        print(f"Error saving debate contexts: {e}")
+
+
+def get_debate_contexts(debate_id: str) -> Optional[List[str]]:
+    """The debate's context IDs, or None for debates created before bindings existed."""
+    if not debate_id:
+        return None
+    try:
+        with open(get_bindings_path(debate_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,135 @@
+# backend/debate_memory.py
+"""
+Per-debate rolling memory that keeps prompt size constant as rounds grow.
+
+The last MEMORY_RECENT_ROUNDS rounds are kept verbatim. Older rounds are
+folded into a bounded pool of candidate sentences, ranked with TF-IDF
+(backend/summarizer.py); the best MEMORY_SUMMARY_SENTENCES form the summary.
+Each round only processes the round that falls out of the verbatim window.
+State is saved as memory.json inside the debate folder.
+"""
+import json
+import os
+from collections import Counter
+
+from .config import MEMORY_RECENT_ROUNDS, MEMORY_SUMMARY_SENTENCES, MEMORY_POOL_SIZE
+from .memory_manager import DATA_DIR, read_debate
+from .summarizer import split_sentences, terms, rank_sentences
+
+MEMORY_FILENAME = "memory.json"
+
+
+class RollingMemory:
+    def __init__(self, recent_rounds: int = MEMORY_RECENT_ROUNDS):
+        self.recent_rounds = recent_rounds
+        self.recent = []      # [{"round", "coached", "opponent"}], oldest first
+        self.pool = []        # [{"round", "speaker", "text"}] candidate summary sentences
+        self.df = Counter()   # document frequency over every sentence ever summarized
+        self.n_docs = 0
+        self.summary = []     # chosen pool entries, chronological
+
+    def add_round(self, round_no: int, coached: str, opponent: str):
+        """Adds a finished round; the oldest verbatim round is summarized if the window is full."""
+        self.recent.append({"round": int(round_no), "coached": coached or "", "opponent": opponent or ""})
+        while len(self.recent) > self.recent_rounds:
+            self._absorb(self.recent.pop(0))
+
+    def _absorb(self, turn: dict):
+        for speaker in ("coached", "opponent"):
+            for sent in split_sentences(turn[speaker]):
+                self.df.update(set(terms(sent)))
+                self.n_docs += 1
+                self.pool.append({"round": turn["round"], "speaker": speaker, "text": sent})
+
+        # Re-rank against the running corpus statistics and keep the pool bounded
+        keep = rank_sentences([p["text"] for p in self.pool], MEMORY_POOL_SIZE, self.df, self.n_docs)
+        self.pool = [self.pool[i] for i in keep]
+        best = rank_sentences([p["text"] for p in self.pool], MEMORY_SUMMARY_SENTENCES, self.df, self.n_docs)
+        self.summary = [self.pool[i] for i in best]
+
+    def render(self) -> str:
+        """Prompt text: extractive summary of older rounds followed by the recent rounds verbatim."""
+        parts = []
+        if self.summary:
+            lines = [
+                f"- (Round {p['round'] + 1}, {'Coach' if p['speaker'] == 'coached' else 'Opponent'}) {p['text']}"
+                for p in self.summary
+            ]
+            parts.append("Summary of earlier rounds:\n" + "\n".join(lines))
+        if self.recent:
+            turns = []
+            for t in self.recent:
+                turns.append(f"Round {t['round'] + 1} - Coach:\n{t['coached']}")
+                turns.append(f"Round {t['round'] + 1} - Opponent:\n{t['opponent']}")
+            parts.append("Most recent rounds:\n" + "\n\n".join(turns))
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "recent_rounds": self.recent_rounds,
+            "recent": self.recent,
+            "pool": self.pool,
+            "df": dict(self.df),
+            "n_docs": self.n_docs,
+            "summary_rounds": [[p["round"], p["speaker"], p["text"]] for p in self.summary],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollingMemory":
+        mem = cls(recent_rounds=data.get("recent_rounds", MEMORY_RECENT_ROUNDS))
+        mem.recent = data.get("recent", [])
+        mem.pool = data.get("pool", [])
+        mem.df = Counter(data.get("df", {}))
+        mem.n_docs = data.get("n_docs", 0)
+        chosen = {tuple(x) for x in data.get("summary_rounds", [])}
+        mem.summary = [p for p in mem.pool if (p["round"], p["speaker"], p["text"]) in chosen]
+        return mem
+
+
+def get_memory_path(debate_id: str) -> str:
+    """Helper to get the full path to a debate's rolling memory file."""
+    return os.path.join(DATA_DIR, debate_id, MEMORY_FILENAME)
+
+
+def load_debate_memory(debate_id: str) -> RollingMemory:
+    """
+    Loads a debate's rolling memory. Debates recorded before memory.json existed
+    are rebuilt once from their debate.csv.
+    """
+    if not debate_id:
+        return RollingMemory()
+    path = get_memory_path(debate_id)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return RollingMemory.from_dict(json.load(f))
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Error reading debate memory, rebuilding: {e}")
+
+    mem = RollingMemory()
+    df = read_debate(debate_id)
+    if not df.empty:
+        for _, r in df.sort_values("round").iterrows():
+            mem.add_round(int(r["round"]), str(r.get("coached_argument", "")), str(r.get("opponent_argument", "")))
+    return mem
+
+
+def save_debate_memory(debate_id: str, mem: RollingMemory):
+    """Saves the rolling memory next to the debate's CSVs."""
+    if not debate_id:
+        return
+    try:
+        with open(get_memory_path(debate_id), "w", encoding="utf-8") as f:
+            json.dump(mem.to_dict(), f, ensure_ascii=False)
+    except Exception as e:
+        print(f"Error saving debate memory: {e}")
+
+
+def record_round(debate_id: str, round_no: int, coached: str, opponent: str) -> RollingMemory:
+    """Loads, updates and saves the rolling memory for one finished round."""
+    mem = load_debate_memory(debate_id)
+    # A memory rebuilt from debate.csv may already contain this round
+    if not any(t["round"] == int(round_no) for t in mem.recent):
+        mem.add_round(round_no, coached, opponent)
+    save_debate_memory(debate_id, mem)
+    return mem
@@ -1,30 +1,53 @@
 # backend/debater.py
 from .config import MODEL_COACHED
 from typing import List, Dict
-import json, os, time
+import json, time
 from .utils import call_openrouter, sanitize_topic, clean_model_output
+from .llm_log import log_llm_call
+from .tokens import allocate_budget
+from .context_library import load_contexts
 
 
 SYSTEM_MESSAGE = "You are an expert debater. Produce a concise, structured argument. Keep it 3-6 sentences."
 
-def build_coached_prompt(template_instruction: str, topic: str, previous: List[str]=None) -> List[Dict]:
+def build_coached_prompt(template_instruction: str, topic: str, previous: List[str]=None, memory: str=None,
+                         context_ids: List[str]=None) -> List[Dict]:
+    """
+    Builds the coached debater prompt. `memory` is the rendered rolling debate
+    memory (summary of older rounds + recent rounds verbatim); without it the
+    last two previous arguments are attached as before.
+    """
     topic = sanitize_topic(topic)
-    pdf_context = load_pdf_context()
+    pdf_context = load_contexts(context_ids)
+
+    instruction = (
+        f"Instruction: {template_instruction}\n"
+        f"Topic: {topic}\n\n"
+    )
+    history = ""
+    if memory:
+        history = memory
+    elif previous:
+        history = "\n\n".join(previous[-2:])
+
+    # Fit history and reference material into the coach's token budget
+    fit = allocate_budget("coach", SYSTEM_MESSAGE + instruction, history, pdf_context, model=MODEL_COACHED)
+
     messages = [
         {"role": "system", "content": SYSTEM_MESSAGE},
         {
             "role": "user",
             "content": (
-                f"Instruction: {template_instruction}\n"
-                f"Topic: {topic}\n\n"
-                f"Reference Material (from uploaded PDF):\n{pdf_context[:3000]}"
+                instruction +
+                f"Reference Material (from uploaded PDF):\n{fit['reference']}"
             ),
         }
     ]
     
-    if previous:
-        prev_text = "\n\n".join(previous[-2:])
-        messages.append({"role":"user", "content": f"Previous rounds (last two):\n{prev_text}"})
+    if memory:
+        messages.append({"role":"user", "content": f"Debate so far:\n{fit['history']}"})
+    elif previous:
+        messages.append({"role":"user", "content": f"Previous rounds (last two):\n{fit['history']}"})
     return messages
 
 def _robust_extract_text_from_llm(raw):
@@ -103,43 +126,34 @@ def _robust_extract_text_from_llm(raw):
     except Exception:
         return str(data) if str(data).strip() else ""
 
-def generate_coached_argument(template_instruction: str, topic: str, previous: List[str]=None, retries=2, retry_delay=1.0) -> str:
+def generate_coached_argument(template_instruction: str, topic: str, previous: List[str]=None, retries=2, retry_delay=1.0, memory: str=None,
+                              context_ids: List[str]=None) -> str:
     """
     Robust coached-argument generator.
     - Calls LLM and extracts text using multiple heuristics.
-    - Saves raw LLM response to data/llm_last_response.json for debugging.
+    - Calls are recorded in data/llm_calls.jsonl; empty results are logged there too.
     - Retries a couple times if the result is empty.
     """
-    messages = build_coached_prompt(template_instruction, topic, previous)
+    messages = build_coached_prompt(template_instruction, topic, previous, memory=memory, context_ids=context_ids)
 
     # quick config checks
     if not MODEL_COACHED:
         raise RuntimeError("MODEL_COACHED is not set in backend.config")
 
-    last_raw = None
     for attempt in range(1, retries + 1):
+        started = time.perf_counter()
         try:
-            raw = call_openrouter(messages, MODEL_COACHED)
+            # the failure itself is already in the LLM call log
+            raw = call_openrouter(messages, MODEL_COACHED, role="coach")
         except Exception as e:
-            # persist error to file for debugging and re-raise as descriptive runtime error
-            os.makedirs("data", exist_ok=True)
-            with open("data/llm_last_response.json", "w", encoding="utf-8") as fh:
-                json.dump({"error": str(e), "attempt": attempt}, fh, indent=2, ensure_ascii=False)
             raise RuntimeError(f"LLM call failed on attempt {attempt}: {e}")
 
-        last_raw = raw
-        # save raw response for inspection
-        try:
-            os.makedirs("data", exist_ok=True)
-            with open("data/llm_last_response.json", "w", encoding="utf-8") as fh:
-                json.dump({"raw": raw}, fh, indent=2, ensure_ascii=False)
-        except Exception:
-            pass
-
         extracted = _robust_extract_text_from_llm(raw)
         if extracted and extracted.strip():
             return extracted.strip()
 
+        log_llm_call("coach", MODEL_COACHED, "empty", started, body=raw,
+                     error=f"no text extracted (attempt {attempt}/{retries})")
         # if empty, wait and retry (except after last attempt)
         if attempt < retries:
             time.sleep(retry_delay)
@@ -147,16 +161,8 @@ def generate_coached_argument(template_instruction: str, topic: str, previous: L
         extracted = _robust_extract_text_from_llm(raw)   # OR however you get 'raw' -> 'extracted'
         cleaned = clean_model_output(extracted)
         if not cleaned:
-            raise RuntimeError("LLM returned empty/garbage for coached argument. Raw response saved.")
+            raise RuntimeError("LLM returned empty/garbage for coached argument. See data/llm_calls.jsonl.")
         return cleaned
 
-
-    # if we reach here, all attempts returned empty. Save a helpful file and raise.
-    try:
-        os.makedirs("data", exist_ok=True)
-        with open("data/llm_last_response.json", "w", encoding="utf-8") as fh:
-            json.dump({"raw": last_raw, "note": "Empty text extracted after retries."}, fh, indent=2, ensure_ascii=False)
-    except Exception:
-        pass
-
-    raise RuntimeError("LLM returned empty string for coached argument. Raw response saved to data/llm_last_response.json")
+    # if we reach here, all attempts returned empty
+    raise RuntimeError("LLM returned empty string for coached argument. See python -m backend.llm_log --failures")
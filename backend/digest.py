@@ -0,0 +1,146 @@
+# backend/digest.py
+"""
+Upload-time digest of the reference document.
+
+Instead of sending the first few thousand raw characters of the PDF (page
+markers and all) with every prompt, the whole document is reduced once to a
+ranked list of key points (TF-IDF sentence ranking from backend/summarizer.py).
+The digest is saved next to extracted_text.txt and kept in memory, keyed by the
+source file's mtime and size, so every round and every role reuses it.
+"""
+import json
+import os
+import re
+from typing import Iterable, Optional, Tuple
+
+from .config import DIGEST_KEY_POINTS
+from .context_store import get_store
+from .summarizer import split_sentences, rank_sentences
+
+DIGEST_FILENAME = "context_digest.json"
+DEFAULT_SOURCE = "data/extracted_text.txt"
+
+_PAGE_MARKER_RE = re.compile(r"^\s*--- Page (\d+) ---\s*$", re.MULTILINE)
+_LOWER_WORD_RE = re.compile(r"^[a-z][a-z'-]*[.,;:]?$")
+
+# source path -> (mtime, size, rendered digest)
+_digest_cache = {}
+
+
+def get_digest_path(source_path: str = DEFAULT_SOURCE) -> str:
+    return os.path.join(os.path.dirname(source_path), DIGEST_FILENAME)
+
+
+def _is_prose(sentence: str) -> bool:
+    """Rejects table rows and headings (mostly numbers / upper-case names) that TF-IDF would otherwise favour."""
+    words = sentence.split()
+    return sum(1 for w in words if _LOWER_WORD_RE.match(w)) >= 0.6 * len(words)
+
+
+def _split_pages(text: str) -> list:
+    """[(page_no, body)] from text with '--- Page N ---' markers."""
+    parts = _PAGE_MARKER_RE.split(text)
+    # split() yields [preamble, page, body, page, body, ...]
+    return [(None, parts[0])] + [(int(parts[i]), parts[i + 1]) for i in range(1, len(parts) - 1, 2)]
+
+
+def _prose_sentences(body: str) -> list:
+    # PDF extraction breaks lines mid-sentence; keep blank lines as paragraph breaks
+    body = re.sub(r"(?<!\n)\n(?!\n)", " ", body)
+    return [sent for sent in split_sentences(body) if _is_prose(sent)]
+
+
+def build_digest(pages: Iterable[Tuple[Optional[int], str]], top_k: int = DIGEST_KEY_POINTS) -> dict:
+    """
+    Ranks the sentences of (page_no, body) pages and keeps the top_k as key
+    points (in document order).
+    """
+    sentences = []
+    source_chars = 0
+    for page, body in pages:
+        source_chars += len(body)
+        sentences.extend((page, sent) for sent in _prose_sentences(body))
+
+    best = rank_sentences([s for _, s in sentences], top_k)
+    return {
+        "key_points": [{"page": sentences[i][0], "text": sentences[i][1]} for i in best],
+        "n_sentences": len(sentences),
+        "source_chars": source_chars,
+    }
+
+
+def render_digest(digest: dict) -> str:
+    lines = []
+    for p in digest.get("key_points", []):
+        prefix = f"(p.{p['page']}) " if p.get("page") else ""
+        lines.append(f"- {prefix}{p['text']}")
+    if not lines:
+        return ""
+    return "Key points from the document:\n" + "\n".join(lines)
+
+
+def write_context_digest(text: str = None, source_path: str = DEFAULT_SOURCE) -> dict:
+    """
+    Builds and saves the digest of source_path. `text` may pass freshly
+    extracted text; otherwise pages are read one at a time through the
+    file's memory-mapped store.
+    """
+    if text is not None:
+        digest = build_digest(_split_pages(text))
+    else:
+        store = get_store(source_path)
+        digest = build_digest(store.iter_pages() if store else [])
+    try:
+        st = os.stat(source_path)
+        digest["source_mtime"], digest["source_size"] = st.st_mtime, st.st_size
+    except OSError:
+        digest["source_mtime"], digest["source_size"] = None, None
+    try:
+        with open(get_digest_path(source_path), "w", encoding="utf-8") as f:
+            json.dump(digest, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"Error saving context digest: {e}")
+    _digest_cache[source_path] = (digest["source_mtime"], digest["source_size"], render_digest(digest))
+    return digest
+
+
+def load_context_digest(source_path: str = DEFAULT_SOURCE) -> str:
+    """
+    Returns the rendered key-points digest for the current reference document
+    ("" if none was uploaded). A missing or stale digest file is rebuilt once.
+    """
+    try:
+        st = os.stat(source_path)
+    except OSError:
+        return ""
+
+    cached = _digest_cache.get(source_path)
+    if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+        return cached[2]
+
+    digest = None
+    try:
+        with open(get_digest_path(source_path), "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("source_mtime") == st.st_mtime and saved.get("source_size") == st.st_size:
+            digest = saved
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    if digest is None:
+        digest = write_context_digest(source_path=source_path)
+
+    rendered = render_digest(digest)
+    _digest_cache[source_path] = (st.st_mtime, st.st_size, rendered)
+    return rendered
+
+
+def clear_context_digest(source_path: str = DEFAULT_SOURCE):
+    """Deletes the saved digest alongside the extracted text."""
+    _digest_cache.pop(source_path, None)
+    path = get_digest_path(source_path)
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except Exception as e:
+            print(f"Error deleting context digest: {e}")
@@ -0,0 +1,98 @@
+# backend/exports.py
+"""
+On-demand exports of debate history.
+
+Single-debate exports are built from debate.csv only when a download is
+requested; debate_version() gives callers a cheap (mtime, size) key to cache
+them by. The "everything" export streams every debate, one chunk of rounds at
+a time, into a gzip-compressed JSON Lines file (one round per line, with its
+judge verdict), so no more than one debate's judge scores and one chunk of
+rounds are held in memory at once.
+"""
+import gzip
+import json
+import os
+import tempfile
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from .memory_manager import DATA_DIR, ROUND_READ_CHUNK, list_debates, get_debate_path, get_judge_path, read_judge
+from .write_behind import writer
+
+EXPORTS_DIR = os.path.join(DATA_DIR, "exports")
+ALL_DEBATES_ARCHIVE = "all_debates.jsonl.gz"
+
+
+def debate_version(debate_id: str) -> Optional[tuple]:
+    """(mtime, size) of the debate's CSV (after queued rows are written), or None if it doesn't exist."""
+    try:
+        writer.flush(get_debate_path(debate_id))
+        st = os.stat(get_debate_path(debate_id))
+    except (OSError, TypeError):
+        return None
+    return st.st_mtime, st.st_size
+
+
+def judge_version(debate_id: str) -> Optional[tuple]:
+    """(mtime, size) of the debate's judge.csv, like debate_version()."""
+    try:
+        writer.flush(get_judge_path(debate_id))
+        st = os.stat(get_judge_path(debate_id))
+    except (OSError, TypeError):
+        return None
+    return st.st_mtime, st.st_size
+
+
+def export_debate_csv(debate_id: str) -> bytes:
+    """debate.csv as stored (no parse/re-serialize round trip)."""
+    writer.flush(get_debate_path(debate_id))
+    with open(get_debate_path(debate_id), "rb") as f:
+        return f.read()
+
+
+def export_debate_json(debate_id: str) -> bytes:
+    """The debate's rounds as an indented JSON array of records."""
+    writer.flush(get_debate_path(debate_id))
+    df = pd.read_csv(get_debate_path(debate_id))
+    return df.to_json(orient="records", indent=2).encode("utf-8")
+
+
+def iter_debate_records(debate_id: str) -> Iterator[dict]:
+    """Every round of a debate with its judge verdict under "judge", read in chunks."""
+    judge = {}
+    jd = read_judge(debate_id)
+    if not jd.empty and "round" in jd:
+        # to_json turns NaN into null
+        for rec in json.loads(jd.to_json(orient="records")):
+            judge[rec["round"]] = rec
+
+    writer.flush(get_debate_path(debate_id))
+    for chunk in pd.read_csv(get_debate_path(debate_id), chunksize=ROUND_READ_CHUNK):
+        for rec in json.loads(chunk.to_json(orient="records")):
+            rec["debate_id"] = debate_id
+            rec["judge"] = judge.get(rec["round"])
+            yield rec
+
+
+def write_all_debates_archive(path: str = None) -> str:
+    """
+    Streams every debate into a .jsonl.gz archive and returns its path. The file
+    is written under a temporary name and moved into place when complete.
+    """
+    path = path or os.path.join(EXPORTS_DIR, ALL_DEBATES_ARCHIVE)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".export-", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for debate_id in list_debates():
+                for rec in iter_debate_records(debate_id):
+                    gz.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
@@ -0,0 +1,165 @@
+# backend/ingest.py
+"""
+Normalization stage for PDF ingestion.
+
+Raw PyPDF2 output keeps running headers/footers, page-number lines, words
+hyphenated across line breaks and ragged whitespace; all of it costs prompt
+tokens. ingest_pages() cleans the text in two streaming passes:
+
+1. Each page is extracted once and spooled to a temporary file while the
+   first/last few lines of every page are counted (digits masked, so
+   "Page 3 of 20" and "Page 4 of 20" count as the same line).
+2. The spool is read back page by page; lines that repeat at the page edges on
+   enough pages, bare page numbers at the page edges, hyphenated breaks and
+   extra whitespace are removed before the page is appended to the output
+   file, while the byte offsets of pages and chunks are indexed for
+   backend/context_store.py.
+
+Only the edge-line counters are kept in memory, never the whole document.
+
+Usage (from the repo root):
+    python -m backend.ingest path/to/file.pdf [--output data/extracted_text.txt]
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+from .config import INGEST_EDGE_LINES, INGEST_REPEAT_SHARE
+from .context_store import IndexBuilder, save_index
+
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?$", re.IGNORECASE)
+_HYPHEN_BREAK_RE = re.compile(r"([a-z])-[ \t]*\n[ \t]*([a-z])")
+_SPACES_RE = re.compile(r"[ \t ]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")  # e.g. \x0f emitted for bullet glyphs
+
+
+def iter_pdf_pages(pdf_file, progress: Callable[[str, float], None] = None) -> Iterator[str]:
+    """Yields the extracted text of each page (PyPDF2), one page at a time."""
+    from PyPDF2 import PdfReader
+
+    pages = PdfReader(pdf_file).pages
+    for i, page in enumerate(pages, start=1):
+        yield page.extract_text() or ""
+        if progress:
+            progress("extracting", i / len(pages))
+
+
+def _signature(line: str) -> str:
+    """Line identity for header/footer detection: case, digits and spacing ignored."""
+    return re.sub(r"\d+", "#", _SPACES_RE.sub(" ", line.strip().lower()))
+
+
+def _edge_signatures(lines: list, edge: int) -> set:
+    lines = [l for l in lines if l.strip()]
+    return {_signature(l) for l in lines[:edge] + lines[-edge:]}
+
+
+def clean_page(text: str, boilerplate: set, edge: int = INGEST_EDGE_LINES) -> Tuple[str, int]:
+    """
+    Normalizes one page. Returns (clean text, number of lines removed).
+    `boilerplate` holds the signatures of repeated header/footer lines.
+    """
+    lines = [_SPACES_RE.sub(" ", _CONTROL_RE.sub("", l)).strip() for l in text.splitlines()]
+    content = [i for i, l in enumerate(lines) if l]
+    edges = set(content[:edge] + content[-edge:])
+
+    kept, removed = [], 0
+    for i, line in enumerate(lines):
+        if not line:
+            kept.append("")
+            continue
+        # only lines at the page edges can be page numbers or running headers/footers;
+        # a bare number in the body is content (table cells, years)
+        if i in edges and (_PAGE_NUMBER_RE.match(line) or _signature(line) in boilerplate):
+            removed += 1
+            continue
+        kept.append(line)
+
+    page = _HYPHEN_BREAK_RE.sub(r"\1\2", "\n".join(kept))
+    return _BLANK_LINES_RE.sub("\n\n", page).strip(), removed
+
+
+def ingest_pages(pages: Iterable[str], output_file: str,
+                 edge: int = INGEST_EDGE_LINES, repeat_share: float = INGEST_REPEAT_SHARE,
+                 progress: Callable[[str, float], None] = None) -> Dict[str, float]:
+    """
+    Normalizes page texts into output_file (with '--- Page N ---' markers) and
+    returns size statistics: pages, raw_chars, clean_chars, reduction,
+    boilerplate_lines, lines_removed. `progress(stage, fraction)` is called
+    after each normalized page.
+    """
+    edge_counts = Counter()
+    n_pages = raw_chars = 0
+
+    # Pass 1: spool pages to disk, count edge lines
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for text in pages:
+            n_pages += 1
+            raw_chars += len(f"\n\n--- Page {n_pages} ---\n") + len(text)
+            edge_counts.update(_edge_signatures(text.splitlines(), edge))
+            spool.write(json.dumps(text) + "\n")
+
+        # A line is boilerplate if it sits at a page edge on enough pages (and on at least three)
+        min_pages = max(3, int(repeat_share * n_pages + 0.5))
+        boilerplate = {sig for sig, n in edge_counts.items() if n >= min_pages and sig}
+
+        # Pass 2: clean each page and append it to the output
+        clean_chars = lines_removed = 0
+        spool.seek(0)
+        index = IndexBuilder()
+        with open(output_file, "wb") as out:
+            for page_no, line in enumerate(spool, start=1):
+                page, removed = clean_page(json.loads(line), boilerplate, edge)
+                lines_removed += removed
+                if progress:
+                    progress("normalizing", page_no / n_pages)
+                if page:
+                    chunk = f"\n\n--- Page {page_no} ---\n{page}"
+                    clean_chars += len(chunk)
+                    # written line by line so the page/chunk byte index is built on the way
+                    for text_line in chunk.encode("utf-8").splitlines(keepends=True):
+                        out.write(text_line)
+                        index.add_line(text_line)
+        save_index(output_file, index.finish())
+
+    return {
+        "pages": n_pages,
+        "raw_chars": raw_chars,
+        "clean_chars": clean_chars,
+        "reduction": 1 - clean_chars / raw_chars if raw_chars else 0.0,
+        "boilerplate_lines": len(boilerplate),
+        "lines_removed": lines_removed,
+    }
+
+
+def ingest_pdf(pdf_file, output_file: str = "data/extracted_text.txt",
+               progress: Callable[[str, float], None] = None) -> Dict[str, float]:
+    """
+    Extracts, normalizes and saves a PDF's text (pdf_file: path or binary file
+    object); see ingest_pages() for the returned stats.
+    """
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    return ingest_pages(iter_pdf_pages(pdf_file, progress), output_file, progress=progress)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and normalize PDF text for debate context.")
+    parser.add_argument("pdf")
+    parser.add_argument("--output", default="data/extracted_text.txt")
+    args = parser.parse_args()
+
+    stats = ingest_pdf(args.pdf, args.output)
+    print(
+        f"{stats['pages']} pages: {stats['raw_chars']:,} -> {stats['clean_chars']:,} characters "
+        f"({stats['reduction']:.1%} smaller), {stats['boilerplate_lines']} repeated header/footer lines, "
+        f"{stats['lines_removed']} lines removed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# backend/json_stream.py
+"""
+Incremental JSON scanner for streamed LLM output.
+
+Feed it text chunks as they arrive; it returns every scalar value (number,
+string, true/false/null) as soon as that value is complete, together with its
+key path, e.g. (("coached", "logic"), 7). Text before the first "{" (such as a
+```json fence) is skipped. It doesn't build the full document; the caller
+validates the complete text once the stream ends.
+"""
+import json
+from typing import Any, List, Tuple
+
+_WS = " \t\r\n"
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.started = False
+        self.done = False
+        # each frame: [container type "{" or "[", current key, list index, expecting key?]
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.buf = []
+        self.token = []  # number / literal being accumulated
+        self.string_is_key = False
+
+    def _path(self) -> tuple:
+        path = []
+        for kind, key, index, _ in self.stack:
+            path.append(key if kind == "{" else index)
+        return tuple(path)
+
+    def _emit_value(self, value: Any, out: List[Tuple[tuple, Any]]):
+        out.append((self._path(), value))
+
+    def _finish_token(self, out: List[Tuple[tuple, Any]]):
+        if not self.token:
+            return
+        text = "".join(self.token)
+        self.token = []
+        if text in _LITERALS:
+            self._emit_value(_LITERALS[text], out)
+            return
+        try:
+            self._emit_value(int(text), out)
+        except ValueError:
+            try:
+                self._emit_value(float(text), out)
+            except ValueError:
+                pass  # malformed token; final validation will reject the document
+
+    def feed(self, chunk: str) -> List[Tuple[tuple, Any]]:
+        """Consumes a chunk and returns the (path, value) pairs completed by it."""
+        out = []
+        for ch in chunk:
+            if self.done:
+                break
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.stack.append(["{", None, 0, True])
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.buf.append("\\" + ch)
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    try:
+                        text = json.loads('"' + "".join(self.buf) + '"')
+                    except ValueError:
+                        text = "".join(self.buf)
+                    self.buf = []
+                    if self.string_is_key:
+                        self.stack[-1][1] = text
+                        self.stack[-1][3] = False
+                    else:
+                        self._emit_value(text, out)
+                else:
+                    self.buf.append(ch)
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                frame = self.stack[-1]
+                self.string_is_key = frame[0] == "{" and frame[3]
+            elif ch in "{[":
+                self.stack.append([ch, None, 0, ch == "{"])
+            elif ch in "}]":
+                self._finish_token(out)
+                self.stack.pop()
+                if not self.stack:
+                    self.done = True
+            elif ch == ",":
+                self._finish_token(out)
+                frame = self.stack[-1]
+                if frame[0] == "{":
+                    frame[3] = True
+                else:
+                    frame[2] += 1
+            elif ch == ":" or ch in _WS:
+                self._finish_token(out)
+            else:
+                self.token.append(ch)
+        return out
@@ -1,6 +1,33 @@
 # backend/judge.py
-from .utils import call_openrouter, sanitize_topic, parse_judge_json, load_pdf_context
-from .config import MODEL_JUDGE
+from .utils import (
+    call_openrouter, sanitize_topic,
+    validate_judge_output, validate_judge_batch, JudgeOutputError, call_openrouter_stream, SCORE_KEYS
+)
+from .json_stream import IncrementalJSONParser
+from .tokens import allocate_budget
+from .context_library import load_contexts
+from .config import (
+    MODEL_JUDGE, JUDGE_BATCH_SIZE, JUDGE_ENSEMBLE_MODELS, JUDGE_ENSEMBLE_AGGREGATE,
+    JUDGE_ENSEMBLE_TRIM, JUDGE_ENSEMBLE_QUORUM, JUDGE_ENSEMBLE_TOLERANCE, JUDGE_ENSEMBLE_TIMEOUT,
+    JUDGE_STRUCTURED_OUTPUT, JUDGE_MAX_REASKS
+)
+from typing import List, Tuple
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import contextvars
+import statistics
+import threading
+import time
+
+# Shared rubric, sent once per judge call (single or batched)
+SCORING_RUBRIC = """SCORING RUBRIC:
+1.  **Logic (1-10):** Is the argument sound, well-reasoned, and free of fallacies?
+2.  **Relevance (1-10):** Does the argument directly address the topic?
+3.  **Clarity (1-10):** Is the argument easy to understand, concise, and well-structured?
+4.  **Persuasiveness (1-10):** Is the argument compelling? Does it use effective rhetoric?
+5.  **Evidence Use (1-10):** How well did the argument use facts or evidence? (Score 5 if no evidence was needed or used. Score higher if it used the Reference Material effectively. Score lower if it ignored or contradicted the Reference Material.)
+"""
 
 # Judge system prompt: must return JSON only
 JUDGE_SYSTEM = "You are a highly analytical and impartial debate judge. Your sole purpose is to evaluate two competing arguments based on a specific rubric and provide actionable feedback. You must follow all instructions and return ONLY the specified JSON format."
@@ -23,12 +50,7 @@ INSTRUCTIONS:
 Evaluate both arguments based on the following SCORING RUBRIC.
 All scores must be an integer from 1 (poor) to 10 (excellent).
 
-SCORING RUBRIC:
-1.  **Logic (1-10):** Is the argument sound, well-reasoned, and free of fallacies?
-2.  **Relevance (1-10):** Does the argument directly address the topic?
-3.  **Clarity (1-10):** Is the argument easy to understand, concise, and well-structured?
-4.  **Persuasiveness (1-10):** Is the argument compelling? Does it use effective rhetoric?
-5.  **Evidence Use (1-10):** How well did the argument use facts or evidence? (Score 5 if no evidence was needed or used. Score higher if it used the Reference Material effectively. Score lower if it ignored or contradicted the Reference Material.)
+{rubric}
 
 OUTPUT FORMAT:
 You must return ONLY a single, valid JSON object. Do not include any other text, preambles, or explanations.
@@ -62,21 +84,28 @@ JSON_KEYS_REQUIRED:
 
 # backend/judge.py
 
-def evaluate(coached: str, opponent: str, topic: str) -> dict:
+def build_judge_prompt(coached: str, opponent: str, topic: str, model: str = None, context_ids: List[str] = None) -> list:
     topic = sanitize_topic(topic)
     # Load context from a PDF
-    pdf_context = load_pdf_context()
+    pdf_context = load_contexts(context_ids)
+
+    # Everything except the reference material is fixed; the reference gets what's left of the judge budget
+    fixed = JUDGE_SYSTEM + JUDGE_PROMPT_TEMPLATE.format(
+        topic=topic, rubric=SCORING_RUBRIC, coached=coached, opponent=opponent, pdf_context=""
+    )
+    pdf_context = allocate_budget("judge", fixed, reference=pdf_context, model=model or MODEL_JUDGE)["reference"]
     
     # --- THIS IS THE FIX ---
     # Conditionally create the reference section
     reference_section = ""
     if pdf_context.strip():
-        reference_section = f"Reference Material (from uploaded PDF):\n{pdf_context[:3000]}\n---"
+        reference_section = f"Reference Material (from uploaded PDF):\n{pdf_context}\n---"
     
     # Format the prompt, using the new 'reference_section'
     # The key in .format() MUST match the placeholder in your template
     content = JUDGE_PROMPT_TEMPLATE.format(
         topic=topic,
+        rubric=SCORING_RUBRIC,
         coached=coached,
         opponent=opponent,
         pdf_context=reference_section # Pass the conditional section to the {pdf_context} placeholder
@@ -87,6 +116,404 @@ def evaluate(coached: str, opponent: str, topic: str) -> dict:
         {"role": "system", "content": JUDGE_SYSTEM},
         {"role": "user", "content": content}
     ]
-    raw = call_openrouter(messages, MODEL_JUDGE)
-    parsed = parse_judge_json(raw)
-    return parsed
\ No newline at end of file
+    return messages
+
+def evaluate(coached: str, opponent: str, topic: str, model: str = None, context_ids: List[str] = None) -> dict:
+    messages = build_judge_prompt(coached, opponent, topic, model=model, context_ids=context_ids)
+    return _call_judge_validated(messages, model or MODEL_JUDGE)
+
+
+# --- Structured output + strict validation ---
+
+SCORE_PROPERTY = {"type": "integer", "minimum": 1, "maximum": 10}
+SIDE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "logic": SCORE_PROPERTY,
+        "relevance": SCORE_PROPERTY,
+        "clarity": SCORE_PROPERTY,
+        "persuasiveness": SCORE_PROPERTY,
+        "evidence_use": SCORE_PROPERTY,
+        "notes": {"type": "string"},
+    },
+    "required": ["logic", "relevance", "clarity", "persuasiveness", "evidence_use", "notes"],
+    "additionalProperties": False,
+}
+JUDGE_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {"coached": SIDE_SCHEMA, "opponent": SIDE_SCHEMA},
+    "required": ["coached", "opponent"],
+    "additionalProperties": False,
+}
+
+REASK_MESSAGE = (
+    "Your previous reply was not valid: {error}. "
+    "Reply again with ONLY the JSON object in the required format, with integer scores from 1 to 10 "
+    "and a non-empty notes string for both \"coached\" and \"opponent\"."
+)
+
+# Models whose provider rejected response_format; they get plain prompting from then on
+_NO_STRUCTURED_OUTPUT = set()
+
+_parse_stats_lock = threading.Lock()
+_parse_stats = {"calls": 0, "valid_first_try": 0, "reasks": 0, "recovered": 0, "failures": 0}
+
+def judge_parse_stats() -> dict:
+    """Counters for judge output validation in this process, plus the failure rate."""
+    with _parse_stats_lock:
+        stats = dict(_parse_stats)
+    stats["failure_rate"] = stats["failures"] / stats["calls"] if stats["calls"] else 0.0
+    return stats
+
+_pending_counts = contextvars.ContextVar("judge_parse_pending", default=None)
+
+@contextmanager
+def deferred_parse_stats():
+    """Collects parse counters in the yielded Counter instead of the process totals (see apply_parse_stats)."""
+    counts = Counter()
+    token = _pending_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _pending_counts.reset(token)
+
+def apply_parse_stats(counts: Counter):
+    """Adds counters collected by deferred_parse_stats(), e.g. once the judged round is committed."""
+    with _parse_stats_lock:
+        for key, n in counts.items():
+            _parse_stats[key] += n
+
+def _count(key: str):
+    pending = _pending_counts.get()
+    with _parse_stats_lock:
+        if pending is not None:
+            pending[key] += 1
+        else:
+            _parse_stats[key] += 1
+
+def _response_format():
+    if JUDGE_STRUCTURED_OUTPUT == "json_schema":
+        return {"type": "json_schema",
+                "json_schema": {"name": "judge_verdict", "strict": True, "schema": JUDGE_RESPONSE_SCHEMA}}
+    if JUDGE_STRUCTURED_OUTPUT == "json_object":
+        return {"type": "json_object"}
+    return None
+
+def _call_judge(messages: list, model: str) -> str:
+    """Calls the judge with structured output when the model's provider accepts it."""
+    response_format = None if model in _NO_STRUCTURED_OUTPUT else _response_format()
+    if response_format is None:
+        return call_openrouter(messages, model, role="judge")
+    try:
+        return call_openrouter(messages, model, response_format=response_format, role="judge")
+    except RuntimeError as e:
+        if "HTTP error: 400" not in str(e):
+            raise
+        print(f"Judge model {model} rejected response_format; falling back to plain prompting.")
+        _NO_STRUCTURED_OUTPUT.add(model)
+        return call_openrouter(messages, model, role="judge")
+
+def _stream_judge(messages: list, model: str):
+    """Streaming counterpart of _call_judge (same structured-output fallback)."""
+    response_format = None if model in _NO_STRUCTURED_OUTPUT else _response_format()
+    received = False
+    try:
+        for delta in call_openrouter_stream(messages, model, response_format=response_format, role="judge"):
+            received = True
+            yield delta
+    except RuntimeError as e:
+        if received or response_format is None or "HTTP error: 400" not in str(e):
+            raise
+        print(f"Judge model {model} rejected response_format; falling back to plain prompting.")
+        _NO_STRUCTURED_OUTPUT.add(model)
+        yield from call_openrouter_stream(messages, model, role="judge")
+
+def _call_judge_validated(messages: list, model: str, raw: str = None) -> dict:
+    """
+    Calls the judge and validates the verdict in one pass. Only invalid output
+    triggers a re-ask (at most JUDGE_MAX_REASKS); if it is still invalid,
+    JudgeOutputError is raised instead of inventing neutral scores.
+    Pass `raw` to validate an output that was already received (e.g. streamed).
+    """
+    _count("calls")
+    if raw is None:
+        raw = _call_judge(messages, model)
+    for attempt in range(JUDGE_MAX_REASKS + 1):
+        try:
+            verdict = validate_judge_output(raw)
+        except JudgeOutputError as e:
+            if attempt == JUDGE_MAX_REASKS:
+                _count("failures")
+                raise
+            _count("reasks")
+            messages = messages + [
+                {"role": "assistant", "content": raw},
+                {"role": "user", "content": REASK_MESSAGE.format(error=e)},
+            ]
+            raw = _call_judge(messages, model)
+            continue
+        _count("valid_first_try" if attempt == 0 else "recovered")
+        return verdict
+
+
+JUDGE_STREAM_FIELDS = tuple(SCORE_KEYS) + ("notes",)
+
+def evaluate_stream(coached: str, opponent: str, topic: str, model: str = None, context_ids: List[str] = None):
+    """
+    Streams the judge call and yields each score as soon as its JSON field closes:
+        {"side": "coached"|"opponent", "field": "logic"|...|"notes", "value": ...}
+    The last item is {"verdict": <flat dict>}, validated exactly like evaluate()
+    (including the bounded re-ask if the streamed output turns out invalid).
+    """
+    model = model or MODEL_JUDGE
+    messages = build_judge_prompt(coached, opponent, topic, model=model, context_ids=context_ids)
+    parser = IncrementalJSONParser()
+    chunks = []
+    for delta in _stream_judge(messages, model):
+        chunks.append(delta)
+        for path, value in parser.feed(delta):
+            if len(path) == 2 and path[0] in ("coached", "opponent") and path[1] in JUDGE_STREAM_FIELDS:
+                yield {"side": path[0], "field": path[1], "value": value}
+    yield {"verdict": _call_judge_validated(messages, model, raw="".join(chunks))}
+
+
+JUDGE_BATCH_SYSTEM = "You are a highly analytical and impartial debate judge. You evaluate several independent pairs of competing arguments on the same topic using one rubric. You must follow all instructions and return ONLY the specified JSON format."
+
+JUDGE_BATCH_PROMPT_TEMPLATE = """
+Topic: {topic}
+
+{pdf_context}
+
+INSTRUCTIONS:
+Below are {n_pairs} independent PAIRS, each with a COACHED and an OPPONENT argument.
+Judge every pair on its own merits using the SCORING RUBRIC.
+All scores must be an integer from 1 (poor) to 10 (excellent).
+
+{rubric}
+
+{pairs}
+
+OUTPUT FORMAT:
+You must return ONLY a single, valid JSON array with exactly {n_pairs} objects, one per pair, in pair order.
+Do not include any other text, preambles, or explanations.
+The "notes" MUST be 1-2 sentences of specific, constructive feedback explaining the *reason* for the scores.
+
+JSON_ARRAY_ITEM_REQUIRED:
+{{
+    "pair": <int, the pair number>,
+    "coached": {{
+        "logic": <int>,
+        "relevance": <int>,
+        "clarity": <int>,
+        "persuasiveness": <int>,
+        "evidence_use": <int>,
+        "notes": "<string, 1-2 sentences of feedback>"
+    }},
+    "opponent": {{
+        "logic": <int>,
+        "relevance": <int>,
+        "clarity": <int>,
+        "persuasiveness": <int>,
+        "evidence_use": <int>,
+        "notes": "<string, 1-2 sentences of feedback>"
+    }}
+}}
+"""
+
+def build_batch_prompt(pairs: List[Tuple[str, str]], topic: str, context_ids: List[str] = None) -> list:
+    """Packs several (coached, opponent) pairs under one shared rubric and reference section."""
+    topic = sanitize_topic(topic)
+    pdf_context = load_contexts(context_ids)
+
+    # The reference gets the same budget a single-pair judge call would; the pairs come on top
+    shared = JUDGE_BATCH_SYSTEM + JUDGE_BATCH_PROMPT_TEMPLATE.format(
+        topic=topic, pdf_context="", n_pairs=len(pairs), rubric=SCORING_RUBRIC, pairs=""
+    )
+    pdf_context = allocate_budget("judge", shared, reference=pdf_context, model=MODEL_JUDGE)["reference"]
+
+    reference_section = ""
+    if pdf_context.strip():
+        reference_section = f"---\nReference Material (from uploaded PDF):\n{pdf_context}\n---"
+
+    pair_blocks = []
+    for i, (coached, opponent) in enumerate(pairs, start=1):
+        pair_blocks.append(
+            f"=== PAIR {i} ===\n"
+            f"COACHED ARGUMENT:\n{coached}\n"
+            f"---\n"
+            f"OPPONENT ARGUMENT:\n{opponent}"
+        )
+
+    content = JUDGE_BATCH_PROMPT_TEMPLATE.format(
+        topic=topic,
+        pdf_context=reference_section,
+        n_pairs=len(pairs),
+        rubric=SCORING_RUBRIC,
+        pairs="\n\n".join(pair_blocks)
+    )
+    return [
+        {"role": "system", "content": JUDGE_BATCH_SYSTEM},
+        {"role": "user", "content": content}
+    ]
+
+def evaluate_batch(pairs: List[Tuple[str, str]], topic: str, batch_size: int = None,
+                   context_ids: List[str] = None) -> List[dict]:
+    """
+    Judges many (coached, opponent) pairs with one LLM call per chunk of `batch_size`.
+    The rubric and PDF context are sent once per chunk instead of once per pair.
+    If a chunk's output can't be parsed into exactly one verdict per pair,
+    that chunk falls back to per-pair `evaluate` calls; verdicts that fail the
+    schema are re-judged alone the same way (strictly validated, with re-asks).
+    Returns verdicts in the same order as `pairs`.
+    """
+    batch_size = batch_size or JUDGE_BATCH_SIZE
+    results = []
+    for start in range(0, len(pairs), batch_size):
+        chunk = pairs[start:start + batch_size]
+        verdicts = None
+        if len(chunk) > 1:
+            try:
+                raw = call_openrouter(build_batch_prompt(chunk, topic, context_ids), MODEL_JUDGE, role="judge_batch")
+                verdicts = validate_judge_batch(raw, len(chunk))
+            except Exception as e:
+                print(f"evaluate_batch: batch call failed, judging pairs individually. Error: {e}")
+
+        if verdicts is None:
+            verdicts = [None] * len(chunk)
+        for i, (coached, opponent) in enumerate(chunk):
+            if verdicts[i] is None:
+                verdicts[i] = evaluate(coached, opponent, topic, context_ids=context_ids)
+        results.extend(verdicts)
+    return results
+
+
+# --- Ensemble judging ---
+
+ENSEMBLE_SCORE_KEYS = [
+    "logic_coached", "relevance_coached", "clarity_coached", "persuasiveness_coached", "evidence_use_coached",
+    "total_coached",
+    "logic_opponent", "relevance_opponent", "clarity_opponent", "persuasiveness_opponent", "evidence_use_opponent",
+    "total_opponent",
+]
+
+def _aggregate(values: List[float], method: str, trim: float) -> float:
+    """Median or symmetric trimmed mean of a list of scores."""
+    values = sorted(values)
+    if method == "trimmed_mean":
+        k = int(round(len(values) * trim))
+        k = min(k, (len(values) - 1) // 2)
+        kept = values[k:len(values) - k] if k else values
+        return sum(kept) / len(kept)
+    return float(statistics.median(values))
+
+def _agreeing_judges(verdicts: dict, tolerance: float) -> list:
+    """
+    Returns the largest group of judges whose coached totals and opponent totals
+    each lie within `tolerance` points of each other.
+    """
+    best = []
+    for low_c in verdicts.values():
+        for low_o in verdicts.values():
+            group = [
+                model for model, v in verdicts.items()
+                if 0 <= v["total_coached"] - low_c["total_coached"] <= tolerance
+                and 0 <= v["total_opponent"] - low_o["total_opponent"] <= tolerance
+            ]
+            if len(group) > len(best):
+                best = group
+    return best
+
+def evaluate_ensemble(coached: str, opponent: str, topic: str, models: List[str] = None,
+                      context_ids: List[str] = None) -> Tuple[dict, List[dict]]:
+    """
+    Runs `evaluate` concurrently on several judge models and aggregates the scores.
+
+    Stops waiting as soon as JUDGE_ENSEMBLE_QUORUM judges agree within
+    JUDGE_ENSEMBLE_TOLERANCE points (or the timeout hits); judges that haven't
+    answered by then are cancelled if still queued and ignored otherwise.
+
+    Returns (verdict, stats) where verdict has the usual flat judge keys and
+    stats holds one row per judge (latency, status, totals, agreement).
+    """
+    models = models or JUDGE_ENSEMBLE_MODELS or [MODEL_JUDGE]
+    quorum = min(max(JUDGE_ENSEMBLE_QUORUM, 1), len(models))
+
+    started = time.perf_counter()
+    latencies = {}
+    verdicts = {}
+    errors = {}
+
+    def timed_evaluate(model):
+        t0 = time.perf_counter()
+        try:
+            return evaluate(coached, opponent, topic, model=model, context_ids=context_ids)
+        finally:
+            latencies[model] = time.perf_counter() - t0
+
+    executor = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="judge")
+    # each judge runs in a copy of this context, so its tokens count on the round's usage meter
+    futures = {executor.submit(contextvars.copy_context().run, timed_evaluate, m): m for m in models}
+    pending = set(futures)
+    agreeing = []
+    try:
+        while pending:
+            remaining = JUDGE_ENSEMBLE_TIMEOUT - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                model = futures[fut]
+                try:
+                    verdict = fut.result()
+                    verdict["total_coached"] = float(verdict.get("total_coached", 5.0))
+                    verdict["total_opponent"] = float(verdict.get("total_opponent", 5.0))
+                    verdicts[model] = verdict
+                except Exception as e:
+                    errors[model] = str(e)
+            agreeing = _agreeing_judges(verdicts, JUDGE_ENSEMBLE_TOLERANCE)
+            if len(agreeing) >= quorum:
+                break
+    finally:
+        for fut in pending:
+            fut.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not verdicts:
+        raise RuntimeError(f"All ensemble judges failed: {errors or 'timed out'}")
+
+    aggregated = {}
+    for key in ENSEMBLE_SCORE_KEYS:
+        values = [float(v[key]) for v in verdicts.values() if key in v]
+        if values:
+            aggregated[key] = _aggregate(values, JUDGE_ENSEMBLE_AGGREGATE, JUDGE_ENSEMBLE_TRIM)
+
+    # Notes come from the judge closest to the aggregated totals
+    central = min(
+        verdicts,
+        key=lambda m: abs(verdicts[m]["total_coached"] - aggregated["total_coached"])
+        + abs(verdicts[m]["total_opponent"] - aggregated["total_opponent"])
+    )
+    aggregated["notes_coached"] = verdicts[central].get("notes_coached", "No notes provided.")
+    aggregated["notes_opponent"] = verdicts[central].get("notes_opponent", "No notes provided.")
+
+    agg_margin = aggregated["total_coached"] - aggregated["total_opponent"]
+    stats = []
+    for model in models:
+        row = {"model": model, "latency_sec": None, "status": "cancelled",
+               "total_coached": None, "total_opponent": None, "margin_deviation": None, "agreed": False}
+        if model in verdicts:
+            v = verdicts[model]
+            row.update({
+                "status": "ok",
+                "total_coached": v["total_coached"],
+                "total_opponent": v["total_opponent"],
+                "margin_deviation": abs((v["total_coached"] - v["total_opponent"]) - agg_margin),
+                "agreed": model in agreeing,
+            })
+        elif model in errors:
+            row["status"] = "error"
+        if model in latencies and row["status"] != "cancelled":
+            row["latency_sec"] = round(latencies[model], 3)
+        stats.append(row)
+
+    return aggregated, stats
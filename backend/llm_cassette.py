@@ -0,0 +1,210 @@
+# backend/llm_cassette.py
+"""
+Record/replay transport for the LLM HTTP client.
+
+With LLM_CASSETTE_MODE=record, every request call_openrouter() /
+call_openrouter_stream() sends still goes to the network, and the response
+is appended to a cassette (JSON Lines, LLM_CASSETTE_PATH):
+
+    {"key", "model", "stream", "status", "content_type", "latency_sec", "chunks": [[offset_sec, text], ...]}
+
+key is a hash of the request body (model, messages, temperature, ...);
+latency_sec is the time to the response headers and each chunk keeps the
+offset at which it arrived, so streamed judge output can be replayed with its
+original pacing.
+
+With LLM_CASSETTE_MODE=replay nothing leaves the machine: responses are served
+from the cassette, sleeping the recorded latencies multiplied by
+LLM_CASSETTE_LATENCY_SCALE (1 = as recorded, 0 = as fast as possible). A
+request whose hash was not recorded (e.g. the RL agent picked another
+template) gets the next unused recording for the same model when
+LLM_CASSETTE_MISS=sequence, or fails when it is "error" (strict regression
+runs). OPENROUTER_API_KEY only needs to be non-empty when replaying.
+"""
+import codecs
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from .config import LLM_CASSETTE_PATH, LLM_CASSETTE_LATENCY_SCALE, LLM_CASSETTE_MISS
+
+
+class CassetteMiss(httpx.TransportError):
+    """No recorded response for a request in replay mode."""
+
+
+def request_key(body: bytes) -> str:
+    """Hash of the request payload, independent of key order and whitespace."""
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False).encode("utf-8")
+    except ValueError:
+        canonical = body
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def _request_info(request: httpx.Request) -> dict:
+    try:
+        payload = json.loads(request.content)
+    except ValueError:
+        payload = {}
+    return {"model": payload.get("model"), "stream": bool(payload.get("stream"))}
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """Passes the upstream body through while noting each chunk and when it arrived."""
+
+    def __init__(self, inner: httpx.SyncByteStream, started: float, on_close):
+        self._inner = inner
+        self._started = started
+        self._on_close = on_close
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.chunks: List[list] = []
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._inner:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.chunks.append([round(time.perf_counter() - self._started, 4), text])
+            yield chunk
+
+    def close(self):
+        try:
+            self._inner.close()
+        finally:
+            tail = self._decoder.decode(b"", final=True)
+            if tail:
+                self.chunks.append([round(time.perf_counter() - self._started, 4), tail])
+            self._on_close(self.chunks)
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    """Yields recorded chunks, sleeping until each one's (scaled) recorded offset."""
+
+    def __init__(self, chunks: List[list], latency_sec: float, scale: float):
+        self._chunks = chunks
+        self._latency = latency_sec
+        self._scale = scale
+
+    def __iter__(self) -> Iterator[bytes]:
+        started = time.perf_counter()
+        for offset, text in self._chunks:
+            if self._scale:
+                delay = (offset - self._latency) * self._scale - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield text.encode("utf-8")
+
+
+class CassetteTransport(httpx.BaseTransport):
+    def __init__(self, mode: str, path: str = LLM_CASSETTE_PATH, latency_scale: float = LLM_CASSETTE_LATENCY_SCALE,
+                 miss: str = LLM_CASSETTE_MISS, inner: httpx.BaseTransport = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"cassette mode must be 'record' or 'replay', got {mode!r}")
+        self.mode = mode
+        self.path = path
+        self.latency_scale = latency_scale
+        self.miss = miss
+        self.inner = inner or httpx.HTTPTransport()
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, deque] = defaultdict(deque)
+        self._by_model: Dict[str, deque] = defaultdict(deque)
+        self._served = set()
+        self.stats = Counter()  # recorded, hits, sequence, misses
+        if mode == "replay":
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No cassette at {self.path}; record one with LLM_CASSETTE_MODE=record")
+        with open(self.path, "r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entry["_id"] = i
+                self._by_key[entry["key"]].append(entry)
+                self._by_model[entry.get("model")].append(entry)
+
+    def rewind(self):
+        """Makes every recording available again (replaying the same run twice)."""
+        with self._lock:
+            self._by_key.clear()
+            self._by_model.clear()
+            self._served.clear()
+            self._load()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.mode == "replay":
+            return self._replay(request)
+        return self._record(request)
+
+    def close(self):
+        self.inner.close()
+
+    # --- record ---
+
+    def _record(self, request: httpx.Request) -> httpx.Response:
+        # an uncompressed body can be stored as text and replayed without its content-encoding
+        request.headers["Accept-Encoding"] = "identity"
+        key = request_key(request.content)
+        started = time.perf_counter()
+        response = self.inner.handle_request(request)
+        latency = time.perf_counter() - started
+
+        def save(chunks):
+            entry = {
+                "key": key, **_request_info(request), "status": response.status_code,
+                "content_type": response.headers.get("content-type", "application/json"),
+                "latency_sec": round(latency, 4), "chunks": chunks, "recorded": time.time(),
+            }
+            with self._lock:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.stats["recorded"] += 1
+
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers,
+                              stream=_RecordingStream(response.stream, started, save),
+                              extensions=response.extensions, request=request)
+
+    # --- replay ---
+
+    def _take(self, queue: deque) -> Optional[dict]:
+        # skip recordings already served through the other index
+        while queue and queue[0]["_id"] in self._served:
+            queue.popleft()
+        if not queue:
+            return None
+        entry = queue.popleft()
+        self._served.add(entry["_id"])
+        return entry
+
+    def _replay(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request.content)
+        info = _request_info(request)
+        with self._lock:
+            entry = self._take(self._by_key.get(key, deque()))
+            if entry is not None:
+                self.stats["hits"] += 1
+            elif self.miss == "sequence":
+                entry = self._take(self._by_model.get(info["model"], deque()))
+                if entry is not None:
+                    self.stats["sequence"] += 1
+            if entry is None:
+                self.stats["misses"] += 1
+        if entry is None:
+            raise CassetteMiss(f"no recorded response for {info['model']} (request {key[:12]})", request=request)
+
+        if self.latency_scale:
+            time.sleep(entry["latency_sec"] * self.latency_scale)
+        stream = _ReplayStream(entry["chunks"], entry["latency_sec"], self.latency_scale)
+        return httpx.Response(entry["status"], headers={"content-type": entry["content_type"]},
+                              stream=stream, request=request)
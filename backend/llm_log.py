@@ -0,0 +1,196 @@
+# backend/llm_log.py
+"""
+Structured, sampled log of LLM calls.
+
+Replaces the data/llm_last_response.json file that every call used to
+rewrite (synchronously, racing between workers, keeping only the last
+response). Each call is described by one JSON line in data/llm_calls.jsonl:
+
+    {"ts", "role", "model", "status", "latency_ms", "prompt_tokens",
+     "completion_tokens", "total_tokens", "stream", "error", "body"}
+
+log_llm_call() only puts the record on a bounded queue; a background thread
+writes it. Successful calls are kept with probability LLM_LOG_SAMPLE_RATE,
+failures always. Bodies are truncated to LLM_LOG_BODY_CHARS. When the file
+passes LLM_LOG_MAX_BYTES it is rotated to .1, .2, ... (LLM_LOG_BACKUPS kept).
+If the queue is full the record is dropped (and counted) rather than slowing
+the call down.
+
+Recent failures, from the command line (repo root):
+    python -m backend.llm_log --failures -n 20
+"""
+import argparse
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import List, Optional
+
+from .config import (
+    LLM_LOG_ENABLED, LLM_LOG_SAMPLE_RATE, LLM_LOG_BODY_CHARS, LLM_LOG_MAX_BYTES, LLM_LOG_BACKUPS, LLM_LOG_QUEUE_SIZE,
+)
+
+LLM_LOG_PATH = os.path.join("data", "llm_calls.jsonl")
+_STOP = object()
+
+
+class LLMCallLog:
+    def __init__(self, path: str = LLM_LOG_PATH, sample_rate: float = LLM_LOG_SAMPLE_RATE,
+                 body_chars: int = LLM_LOG_BODY_CHARS, max_bytes: int = LLM_LOG_MAX_BYTES,
+                 backups: int = LLM_LOG_BACKUPS, queue_size: int = LLM_LOG_QUEUE_SIZE, enabled: bool = LLM_LOG_ENABLED):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.body_chars = body_chars
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._thread = None
+        self._lock = threading.Lock()
+        # own generator, so sampling doesn't shift the seeded global one the RL agent draws from
+        self._rng = random.Random()
+        self.stats = Counter()  # logged, sampled_out, dropped, errors
+
+    def log(self, record: dict):
+        if not self.enabled:
+            return
+        if record.get("status") == "ok" and self._rng.random() >= self.sample_rate:
+            self.stats["sampled_out"] += 1
+            return
+        record = dict(record, ts=record.get("ts") or time.time())
+        body = record.get("body")
+        if body is not None:
+            if not isinstance(body, str):
+                body = json.dumps(body, ensure_ascii=False)
+            record["body"] = body[:self.body_chars] + ("…" if len(body) > self.body_chars else "")
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def close(self, timeout: float = 5.0):
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="llm-log", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            # write whatever else is already queued in the same append
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    self._write(batch)
+                    return
+                batch.append(nxt)
+            self._write(batch)
+
+    def _write(self, batch: list):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._rotate_if_needed()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in batch))
+            self.stats["logged"] += len(batch)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Error writing LLM call log: {e}")
+
+    def _rotate_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+llm_log = LLMCallLog()
+atexit.register(llm_log.close)
+
+
+def log_llm_call(role: Optional[str], model: str, status: str, started: float, usage: dict = None,
+                 body=None, error: str = None, stream: bool = False):
+    """Records one LLM call; `started` is its time.perf_counter() start."""
+    usage = usage or {}
+    llm_log.log({
+        "role": role,
+        "model": model,
+        "status": status,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+        "total_tokens": usage.get("total_tokens"),
+        "stream": stream,
+        "error": error,
+        "body": body,
+    })
+
+
+def read_recent(n: int = 20, failures_only: bool = False, role: str = None, path: str = LLM_LOG_PATH) -> List[dict]:
+    """The last n logged calls (newest last), across the current and rotated files."""
+    recent = deque(maxlen=n)
+    files = [f"{path}.{i}" for i in range(LLM_LOG_BACKUPS, 0, -1)] + [path]
+    for file in files:
+        if not os.path.exists(file):
+            continue
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if failures_only and record.get("status") == "ok":
+                    continue
+                if role and record.get("role") != role:
+                    continue
+                recent.append(record)
+    return list(recent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show recent LLM calls from the structured log.")
+    parser.add_argument("-n", type=int, default=20)
+    parser.add_argument("--failures", action="store_true", help="only calls that did not succeed")
+    parser.add_argument("--role", help="coach, opponent, judge, ...")
+    parser.add_argument("--body", action="store_true", help="print the (truncated) response body")
+    args = parser.parse_args()
+
+    for r in read_recent(args.n, args.failures, args.role):
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r.get("ts", 0)))
+        tokens = r.get("total_tokens")
+        print(f"{when}  {r.get('role') or '-':<9} {r.get('model', ''):<40} {r.get('status', ''):<10} "
+              f"{r.get('latency_ms', 0):>8.0f} ms  {tokens if tokens is not None else '-':>6} tok"
+              + (f"  {r['error']}" if r.get("error") else ""))
+        if args.body and r.get("body"):
+            print(f"    {r['body']}")
+
+
+if __name__ == "__main__":
+    main()
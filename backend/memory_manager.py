@@ -3,13 +3,35 @@ import os
 import time
 import shutil
 from .utils import sanitize_topic
+from .write_behind import writer
 import json
+import argparse
+import csv
+import io
+import tarfile
+import tempfile
+import threading
+from typing import Optional
 
 # --- 1. NEW: Define the main data directory ---
 DATA_DIR = "data"
 DEBATE_FILENAME = "debate.csv"
 JUDGE_FILENAME = "judge.csv"
+JUDGE_STATS_FILENAME = "judge_ensemble.csv"
+USAGE_FILENAME = "usage.csv"
 RL_MEMORY_FILE = "rl_memory.json" # <-- ADD THIS
+DEBATE_COLUMNS = ["round", "speaker", "coached_argument", "opponent_argument", "action", "reward"]
+JUDGE_COLUMNS = [
+    "round",
+    "logic_coached", "relevance_coached", "clarity_coached",
+    "persuasiveness_coached", "evidence_use_coached",
+    "total_coached", "notes_coached",
+    "logic_opponent", "relevance_opponent", "clarity_opponent",
+    "persuasiveness_opponent", "evidence_use_opponent",
+    "total_opponent", "notes_opponent"
+]
+USAGE_COLUMNS = ["round", "action", "role", "model", "calls", "prompt_tokens", "completion_tokens",
+                 "total_tokens", "cost_usd", "estimated"]
 
 # --- 2. MODIFIED: This function now creates the main 'data' folder ---
 def init_storage():
@@ -17,6 +39,8 @@ def init_storage():
     Ensures the main 'data' directory exists.
     This is called by the "Reset Storage" button to wipe ALL debates.
     """
+    # Let queued rows land first so they don't recreate wiped folders afterwards
+    writer.reset()
     # If the folder exists, wipe it completely
     if os.path.exists(DATA_DIR):
         shutil.rmtree(DATA_DIR)
@@ -81,8 +105,8 @@ def list_debates() -> list:
     # List all entries in the data directory
     entries = os.listdir(DATA_DIR)
     
-    # Filter for directories only
-    debate_ids = [entry for entry in entries if os.path.isdir(os.path.join(DATA_DIR, entry))]
+    # Filter for debate folders only (skips data/contexts and other non-debate folders)
+    debate_ids = [entry for entry in entries if os.path.isfile(os.path.join(DATA_DIR, entry, DEBATE_FILENAME))]
     
     # Sort by name (which will be timestamp)
     debate_ids.sort(reverse=True)
@@ -102,97 +126,192 @@ def read_debate(debate_id: str) -> pd.DataFrame:
     """Reads the debate.csv for a specific debate."""
     if not debate_id:
         return pd.DataFrame()
+    writer.flush(get_debate_path(debate_id))
     try:
         return pd.read_csv(get_debate_path(debate_id))
     except FileNotFoundError:
         return pd.DataFrame()
 
+ROUND_READ_CHUNK = 500  # rows per chunk when scanning debate.csv for a range of rounds
+
+def read_rounds(debate_id: str, first_round: int = 0, last_round: int = None) -> pd.DataFrame:
+    """
+    Rows of debate.csv with first_round <= round < last_round, scanned in chunks
+    so a long debate is never loaded whole just to show a few of its rounds.
+    """
+    if not debate_id:
+        return pd.DataFrame()
+    writer.flush(get_debate_path(debate_id))
+    parts = []
+    try:
+        for chunk in pd.read_csv(get_debate_path(debate_id), chunksize=ROUND_READ_CHUNK):
+            keep = chunk["round"] >= first_round
+            if last_round is not None:
+                keep &= chunk["round"] < last_round
+            parts.append(chunk[keep])
+    except FileNotFoundError:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+TAIL_READ_BLOCK = 64 * 1024  # bytes read from the end of debate.csv at first; grown until enough rounds are in
+
+def read_last_rounds(debate_id: str, n_rounds: int) -> pd.DataFrame:
+    """
+    The last n_rounds rounds of a debate. debate.csv is read backwards from its
+    end in growing blocks, so the cost depends on the size of those rounds, not
+    on how long the debate is.
+    """
+    if not debate_id:
+        return pd.DataFrame()
+    writer.flush(get_debate_path(debate_id))
+    try:
+        with open(get_debate_path(debate_id), "rb") as f:
+            header = f.readline()
+            body_start = f.tell()
+            end = f.seek(0, os.SEEK_END)
+            block = TAIL_READ_BLOCK
+            while True:
+                start = max(end - block, body_start)
+                f.seek(start)
+                tail = _parse_csv_tail(header, f.read(end - start), whole=start == body_start)
+                if tail is not None and (start == body_start or tail["round"].nunique() > n_rounds):
+                    break
+                block *= 4
+    except FileNotFoundError:
+        return pd.DataFrame()
+    if tail.empty:
+        return tail
+    tail = tail[tail["round"] > tail["round"].max() - n_rounds]
+    return tail.reset_index(drop=True)
+
+def _parse_csv_tail(header: bytes, data: bytes, whole: bool) -> Optional[pd.DataFrame]:
+    """
+    Rows in a block cut from the end of a CSV. Unless the block starts at the
+    first row (`whole`), it starts mid-row: arguments may contain quoted line
+    breaks, so the first line break after which the rest parses into complete
+    rows with an integer round is taken as the row boundary. None if the block
+    holds no complete row.
+    """
+    if whole:
+        return pd.read_csv(io.BytesIO(header + data)) if data.strip() else pd.DataFrame()
+    columns = next(csv.reader([header.decode("utf-8")]))
+    round_col = columns.index("round")
+    pos = data.find(b"\n")
+    while pos != -1:
+        rest = data[pos + 1:]
+        if _complete_rows(rest, len(columns), round_col):
+            return pd.read_csv(io.BytesIO(header + rest))
+        pos = data.find(b"\n", pos + 1)
+    return None
+
+def _complete_rows(data: bytes, n_columns: int, round_col: int) -> bool:
+    """Whether data parses into at least one row, all of n_columns fields with an integer round (stops at the first bad row)."""
+    try:
+        rows = 0
+        for row in csv.reader(io.StringIO(data.decode("utf-8"))):
+            if not row:
+                continue
+            if len(row) != n_columns or not row[round_col].lstrip("-").isdigit():
+                return False
+            rows += 1
+    except (csv.Error, UnicodeDecodeError):
+        return False
+    return rows > 0
+
 def read_judge(debate_id: str) -> pd.DataFrame:
     """Reads the judge.csv for a specific debate."""
     if not debate_id:
         return pd.DataFrame()
+    writer.flush(get_judge_path(debate_id))
     try:
         return pd.read_csv(get_judge_path(debate_id))
     except FileNotFoundError:
         return pd.DataFrame()
 
 def append_round(debate_id: str, round_data: dict):
-    """Appends a round to the correct debate.csv, aligning columns to the file header."""
+    """
+    Queues a round for debate.csv on the write-behind writer (backend/write_behind.py);
+    it is written in the file header's column order. Reads of the file wait for it.
+    """
     if not debate_id:
         return
+    writer.append(get_debate_path(debate_id), dict(round_data), DEBATE_COLUMNS)
 
-    debate_path = get_debate_path(debate_id)
-    new_row = pd.DataFrame([round_data])
 
-    # If file doesn't exist create with expected columns (safe default)
-    if not os.path.exists(debate_path):
-        # create file with appropriate columns in the expected order
-        cols = ["round", "speaker", "coached_argument", "opponent_argument", "action", "reward"]
-        pd.DataFrame(columns=cols).to_csv(debate_path, index=False)
+def append_judge(debate_id: str, judge_data: dict):
+    """
+    Queues judge scores for judge.csv, aligned to the file header so fields like
+    notes_coached/notes_opponent don't get misaligned.
+    """
+    if not debate_id:
+        return
 
-    # Read header columns (no data) and reindex new_row to that column order
-    try:
-        existing_header = pd.read_csv(debate_path, nrows=0).columns.tolist()
-        # Ensure new_row has all header columns (add missing with NaN)
-        new_row = new_row.reindex(columns=existing_header)
-    except Exception:
-        # Fallback if reading header fails — just append with current row columns
-        pass
+    row = dict(judge_data)
+    # Provide default notes if missing (older/flat verdict shapes)
+    row.setdefault("notes_coached", judge_data.get("notes", ""))
+    row.setdefault("notes_opponent", judge_data.get("opponent_notes", ""))
+    # Coerce numeric totals to float before writing (safer for reads later)
+    for num_col in ["total_coached", "total_opponent"]:
+        try:
+            row[num_col] = float(row.get(num_col))
+        except (TypeError, ValueError):
+            row[num_col] = 0.0
+        if row[num_col] != row[num_col]:  # NaN
+            row[num_col] = 0.0
 
-    # Append row (header=False because file already has header)
-    new_row.to_csv(debate_path, mode='a', header=False, index=False)
+    writer.append(get_judge_path(debate_id), row, JUDGE_COLUMNS)
 
+def get_judge_stats_path(debate_id: str) -> str:
+    """Helper to get the full path to a debate's per-judge ensemble stats CSV."""
+    return os.path.join(DATA_DIR, debate_id, JUDGE_STATS_FILENAME)
 
-def append_judge(debate_id: str, judge_data: dict):
+def read_judge_stats(debate_id: str) -> pd.DataFrame:
+    """Reads the judge_ensemble.csv (per-judge latency/agreement) for a specific debate."""
+    if not debate_id:
+        return pd.DataFrame()
+    try:
+        return pd.read_csv(get_judge_stats_path(debate_id))
+    except FileNotFoundError:
+        return pd.DataFrame()
+
+def append_judge_stats(debate_id: str, round_no: int, stats: list):
     """
-    Appends judge scores to the correct judge.csv, aligning columns to the file header
-    so fields like notes_coached/notes_opponent don't get misaligned.
+    Appends one row per ensemble judge (model, status, latency, totals, agreement)
+    to judge_ensemble.csv, next to the debate's judge.csv.
     """
-    if not debate_id:
+    if not debate_id or not stats:
         return
 
-    judge_path = get_judge_path(debate_id)
-    new_row = pd.DataFrame([judge_data])
+    cols = ["round", "model", "status", "latency_sec", "total_coached", "total_opponent",
+            "margin_deviation", "agreed"]
+    stats_path = get_judge_stats_path(debate_id)
+    rows = pd.DataFrame([{**row, "round": round_no} for row in stats]).reindex(columns=cols)
+    rows.to_csv(stats_path, mode='a', header=not os.path.exists(stats_path), index=False)
 
-    # If file doesn't exist, create it with the canonical judge columns
-    if not os.path.exists(judge_path):
-        cols = [
-            "round",
-            "logic_coached", "relevance_coached", "clarity_coached",
-            "persuasiveness_coached", "evidence_use_coached",
-            "total_coached", "notes_coached",
-            "logic_opponent", "relevance_opponent", "clarity_opponent",
-            "persuasiveness_opponent", "evidence_use_opponent",
-            "total_opponent", "notes_opponent"
-        ]
-        pd.DataFrame(columns=cols).to_csv(judge_path, index=False)
+def get_usage_path(debate_id: str) -> str:
+    """Helper to get the full path to a debate's token/cost usage CSV."""
+    return os.path.join(DATA_DIR, debate_id, USAGE_FILENAME)
 
-    # Read header columns and reindex the new row to match them exactly
+def read_usage(debate_id: str) -> pd.DataFrame:
+    """Reads usage.csv: one row per round, role and model (calls, tokens, cost)."""
+    if not debate_id:
+        return pd.DataFrame()
+    writer.flush(get_usage_path(debate_id))
     try:
-        header_cols = pd.read_csv(judge_path, nrows=0).columns.tolist()
-        # Ensure notes keys exist in the row (so reindex doesn't drop them)
-        # Provide default empty strings for notes if missing
-        if "notes_coached" not in new_row.columns:
-            new_row["notes_coached"] = new_row.apply(lambda _: judge_data.get("notes_coached", judge_data.get("notes", "")), axis=1)
-        if "notes_opponent" not in new_row.columns:
-            new_row["notes_opponent"] = new_row.apply(lambda _: judge_data.get("notes_opponent", judge_data.get("notes_opponent", judge_data.get("opponent_notes", ""))), axis=1)
-
-        # Reindex to header columns (missing columns become NaN; that's fine)
-        new_row = new_row.reindex(columns=header_cols)
-    except Exception:
-        # If header read fails for some reason, proceed with current new_row as-is
-        pass
-
-    # Optionally coerce numeric totals to float before writing (safer for reads later)
-    for num_col in ["total_coached", "total_opponent"]:
-        if num_col in new_row.columns:
-            try:
-                new_row[num_col] = pd.to_numeric(new_row[num_col], errors='coerce').fillna(0.0)
-            except Exception:
-                pass
+        return pd.read_csv(get_usage_path(debate_id))
+    except FileNotFoundError:
+        return pd.DataFrame()
 
-    # Append to file (header=False — file already has header)
-    new_row.to_csv(judge_path, mode='a', header=False, index=False)
+def append_usage(debate_id: str, round_no: int, action, rows: list):
+    """
+    Queues a round's usage rows (see backend/usage.py) for usage.csv, next to
+    the debate's judge.csv, tagged with the round and its template (action).
+    """
+    if not debate_id or not rows:
+        return
+    path = get_usage_path(debate_id)
+    for row in rows:
+        writer.append(path, {**row, "round": round_no, "action": action}, USAGE_COLUMNS)
 
 # --- 6. NEW: RL Agent Memory Functions ---
 
@@ -202,6 +321,9 @@ def get_rl_memory_path():
     """Helper to get the full path to the RL memory file."""
     return os.path.join(DATA_DIR, RL_MEMORY_FILE)
 
+# Held around every read-modify-write of the RL memory (rounds commit on worker threads)
+rl_memory_lock = threading.RLock()
+
 def read_rl_memory() -> dict:
     """
     Reads the RL agent's JSON memory file from the data directory.
@@ -219,10 +341,253 @@ def read_rl_memory() -> dict:
         return {} # Return empty dict on error
 
 def write_rl_memory(mem: dict):
-    """Saves the RL agent's memory dictionary to a JSON file."""
+    """
+    Saves the RL agent's memory dictionary to a JSON file. Written to a temp
+    file and swapped in, so a round being drafted concurrently never reads a
+    half-written file.
+    """
     path = get_rl_memory_path()
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
     try:
-        with open(path, 'w') as f:
+        with open(tmp_path, 'w') as f:
             json.dump(mem, f, indent=4)
+        os.replace(tmp_path, path)
     except Exception as e:
-        print(f"Error saving RL memory: {e}")
\ No newline at end of file
+        print(f"Error saving RL memory: {e}")
+
+
+# --- 7. Bulk archive export / import (moving the corpus between environments) ---
+
+ARCHIVE_FORMAT = "debatemind-archive"
+ARCHIVE_VERSION = 1
+ARCHIVE_BLOCK_BYTES = 1024 * 1024
+CONTEXTS_DIRNAME = "contexts"  # same folder as context_library.CONTEXTS_DIR
+# Shared top-level files: RL memory and the legacy global context artifacts
+ARCHIVE_TOP_LEVEL_FILES = (RL_MEMORY_FILE, "extracted_text.txt", "extracted_text.txt.idx.json", "context_digest.json")
+ARCHIVE_GROUP_EXTENSIONS = (".csv", ".json", ".txt")
+
+
+def _safe_archive_name(name: str) -> bool:
+    """
+    Whether a debate/context id or file name is safe as one path component.
+    Shared by export and import, so everything exported can be imported again
+    (debate ids keep punctuation such as ' , ! from the topic).
+    """
+    return bool(name) and not name.startswith(".") and not any(c in name for c in "/\\\0")
+
+
+def export_archive(dest, compression: str = "gz") -> dict:
+    """
+    Streams the whole data directory into one tar archive (dest: path or binary
+    file object, e.g. a socket or stdout): manifest.json, the shared top-level
+    files, debates/<debate_id>/* and contexts/<context_id>/*. Files are copied
+    block by block, so memory use doesn't depend on corpus size.
+    Returns counts of what was written.
+    """
+    counts = {"debates": 0, "contexts": 0, "files": 0}
+    writer.flush()
+    mode = f"w|{compression}" if compression else "w|"
+    tar = tarfile.open(dest, mode) if isinstance(dest, str) else tarfile.open(fileobj=dest, mode=mode)
+    with tar:
+        manifest = json.dumps({"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION, "created": time.time()}).encode("utf-8")
+        info = tarfile.TarInfo("manifest.json")
+        info.size, info.mtime = len(manifest), int(time.time())
+        tar.addfile(info, io.BytesIO(manifest))
+
+        for name in ARCHIVE_TOP_LEVEL_FILES:
+            path = os.path.join(DATA_DIR, name)
+            if os.path.isfile(path):
+                tar.add(path, arcname=name)
+                counts["files"] += 1
+
+        groups = [("debates", d, os.path.join(DATA_DIR, d)) for d in sorted(list_debates()) if _safe_archive_name(d)]
+        contexts_dir = os.path.join(DATA_DIR, CONTEXTS_DIRNAME)
+        if os.path.isdir(contexts_dir):
+            groups += [("contexts", c, os.path.join(contexts_dir, c)) for c in sorted(os.listdir(contexts_dir))
+                       if _safe_archive_name(c) and os.path.isdir(os.path.join(contexts_dir, c))]
+        # each group's files are written together, so import can commit one group at a time
+        for kind, group_id, folder in groups:
+            for name in sorted(os.listdir(folder)):
+                path = os.path.join(folder, name)
+                if os.path.isfile(path) and name.endswith(ARCHIVE_GROUP_EXTENSIONS):
+                    tar.add(path, arcname=f"{kind}/{group_id}/{name}")
+                    counts["files"] += 1
+            counts[kind] += 1
+    return counts
+
+def _merge_rl_memory(path: str) -> Optional[bool]:
+    """
+    Adds an imported RL memory file's template_stats to the local RL memory.
+    Returns True if merged into existing stats, False if there were none
+    locally (the imported memory is used as is), None if the file is invalid.
+    """
+    try:
+        with open(path, "r") as f:
+            imported = json.load(f)
+        incoming = imported.get("template_stats", {})
+        incoming = {str(k): (int(v.get("count", 0)), float(v.get("sum_reward", 0.0))) for k, v in incoming.items()}
+    except (ValueError, AttributeError, TypeError):
+        return None
+    with rl_memory_lock:
+        mem = read_rl_memory()
+        if not mem:
+            write_rl_memory(imported)
+            return False
+        stats = mem.setdefault("template_stats", {})
+        for key, (count, sum_reward) in incoming.items():
+            local = stats.setdefault(key, {"count": 0, "sum_reward": 0.0})
+            local["count"] += count
+            local["sum_reward"] += sum_reward
+        write_rl_memory(mem)
+    return True
+
+def _copy_member(src, dest_path: str, csv_header: bool = False) -> int:
+    """Copies one archive member to disk block by block; returns the bytes copied. CSVs must start with a 'round' column."""
+    copied = 0
+    with open(dest_path, "wb") as out:
+        first = True
+        for block in iter(lambda: src.read(ARCHIVE_BLOCK_BYTES), b""):
+            if first and csv_header and not block.split(b"\n", 1)[0].lstrip(b"\xef\xbb\xbf").startswith(b"round"):
+                raise ValueError("CSV without a 'round' header")
+            first = False
+            copied += len(block)
+            out.write(block)
+    return copied
+
+def _valid_group(kind: str, folder: str) -> bool:
+    required = (DEBATE_FILENAME,) if kind == "debates" else ("text.txt", "meta.json")
+    if not all(os.path.isfile(os.path.join(folder, name)) for name in required):
+        return False
+    for name in os.listdir(folder):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+                    json.load(f)
+            except (OSError, ValueError):
+                return False
+    return True
+
+def import_archive(src) -> dict:
+    """
+    Merges an archive written by export_archive (src: path or binary file object)
+    into the data directory in one streaming pass. Debates and contexts that
+    already exist locally (same ID) are skipped, as are shared files that already
+    exist, except the RL memory: the archive's template_stats are added to the
+    local ones (count and sum_reward per template). Every group is validated in a scratch folder and moved into place
+    only when complete, so a bad or truncated archive never leaves partial
+    debates behind. Returns counts (imported / skipped / rejected) and bytes written.
+    """
+    stats = {"debates_imported": 0, "debates_skipped": 0, "contexts_imported": 0, "contexts_skipped": 0,
+             "files_imported": 0, "files_merged": 0, "files_skipped": 0, "rejected": 0, "bytes": 0}
+    os.makedirs(DATA_DIR, exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=".import-", dir=DATA_DIR)
+    current = {"key": None, "folder": None, "skip": False, "bad": False, "bytes": 0}
+
+    def target_of(kind, group_id):
+        return os.path.join(DATA_DIR, group_id) if kind == "debates" else os.path.join(DATA_DIR, CONTEXTS_DIRNAME, group_id)
+
+    def finish_group():
+        if current["key"] is None:
+            return
+        kind, group_id = current["key"]
+        if current["skip"]:
+            stats[f"{kind}_skipped"] += 1
+        elif current["bad"] or not _valid_group(kind, current["folder"]):
+            stats["rejected"] += 1
+        else:
+            target = target_of(kind, group_id)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.rename(current["folder"], target)
+                stats[f"{kind}_imported"] += 1
+                stats["bytes"] += current["bytes"]
+            except OSError:
+                # appeared locally while importing
+                stats[f"{kind}_skipped"] += 1
+        shutil.rmtree(current["folder"], ignore_errors=True)
+        current.update(key=None, folder=None, skip=False, bad=False, bytes=0)
+
+    tar = tarfile.open(src, "r|*") if isinstance(src, str) else tarfile.open(fileobj=src, mode="r|*")
+    try:
+        with tar:
+            for member in tar:
+                parts = member.name.split("/")
+                if not member.isfile() or member.name.startswith("/") or ".." in parts:
+                    if not member.isdir():
+                        stats["rejected"] += 1
+                    continue
+
+                if parts == ["manifest.json"]:
+                    manifest = json.loads(tar.extractfile(member).read(ARCHIVE_BLOCK_BYTES) or b"{}")
+                    if manifest.get("format") != ARCHIVE_FORMAT or manifest.get("version", 0) > ARCHIVE_VERSION:
+                        raise ValueError(f"not a supported archive: {manifest.get('format')} v{manifest.get('version')}")
+                    continue
+
+                if len(parts) == 1 and parts[0] in ARCHIVE_TOP_LEVEL_FILES:
+                    finish_group()
+                    dest = os.path.join(DATA_DIR, parts[0])
+                    if os.path.exists(dest) and parts[0] != RL_MEMORY_FILE:
+                        stats["files_skipped"] += 1
+                        continue
+                    tmp_path = os.path.join(scratch, parts[0])
+                    stats["bytes"] += _copy_member(tar.extractfile(member), tmp_path)
+                    if parts[0] == RL_MEMORY_FILE:
+                        merged = _merge_rl_memory(tmp_path)
+                        if merged is None:
+                            stats["rejected"] += 1
+                        else:
+                            stats["files_merged" if merged else "files_imported"] += 1
+                        continue
+                    os.replace(tmp_path, dest)
+                    stats["files_imported"] += 1
+                    continue
+
+                if (len(parts) != 3 or parts[0] not in ("debates", "contexts") or not _safe_archive_name(parts[1])
+                        or not _safe_archive_name(parts[2]) or not parts[2].endswith(ARCHIVE_GROUP_EXTENSIONS)):
+                    stats["rejected"] += 1
+                    continue
+
+                kind, group_id, name = parts
+                if current["key"] != (kind, group_id):
+                    finish_group()
+                    current["key"] = (kind, group_id)
+                    current["skip"] = os.path.exists(target_of(kind, group_id))
+                    current["folder"] = os.path.join(scratch, kind, group_id)
+                    if not current["skip"]:
+                        os.makedirs(current["folder"], exist_ok=True)
+                if current["skip"] or current["bad"]:
+                    continue
+                try:
+                    current["bytes"] += _copy_member(tar.extractfile(member), os.path.join(current["folder"], name),
+                                                     csv_header=name.endswith(".csv"))
+                except ValueError:
+                    current["bad"] = True
+            finish_group()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import the debate data directory as one archive.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="write data/ to a .tar.gz archive")
+    exp.add_argument("archive")
+    imp = sub.add_parser("import", help="merge an archive into data/ (existing debates are kept)")
+    imp.add_argument("archive")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "export":
+        counts = export_archive(args.archive)
+        print(f"Exported {counts['debates']} debates, {counts['contexts']} contexts ({counts['files']} files) "
+              f"to {args.archive} in {time.perf_counter() - started:.1f}s")
+    else:
+        stats = import_archive(args.archive)
+        print(f"Imported {stats['debates_imported']} debates and {stats['contexts_imported']} contexts "
+              f"({stats['bytes'] / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s; skipped "
+              f"{stats['debates_skipped']} existing debates, {stats['contexts_skipped']} existing contexts, "
+              f"{stats['files_skipped']} existing shared files; merged {stats['files_merged']} RL memory file(s); "
+              f"rejected {stats['rejected']} invalid entries")
+
+if __name__ == "__main__":
+    main()
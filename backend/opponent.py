@@ -1,14 +1,16 @@
 # backend/opponent.py
 from .config import MODEL_OPPONENT
 from typing import List, Dict # Added for type hinting
-from .utils import call_openrouter, sanitize_topic, clean_model_output,load_pdf_context
+from .utils import call_openrouter, sanitize_topic, clean_model_output
+from .tokens import allocate_budget
+from .context_library import load_contexts
 
 
 SYSTEM_MESSAGE = "You are an opposing debater. Your job is to rebut the last argument concisely, using clear reasoning and evidence where possible."
 
-def build_opponent_prompt(last_argument: str, topic: str) -> List[Dict]:
+def build_opponent_prompt(last_argument: str, topic: str, memory: str = None, context_ids: List[str] = None) -> List[Dict]:
     topic = sanitize_topic(topic)
-    pdf_context = load_pdf_context()
+    pdf_context = load_contexts(context_ids)
     
     # --- THIS IS THE FIX ---
     # Create a clear instruction for the LLM
@@ -20,9 +22,16 @@ def build_opponent_prompt(last_argument: str, topic: str) -> List[Dict]:
     )
     # -----------------------
     
+    # Fit history and reference material into the opponent's token budget
+    fit = allocate_budget("opponent", SYSTEM_MESSAGE + content, memory or "", pdf_context, model=MODEL_OPPONENT)
+
+    # Earlier rounds (rolling memory) so rebuttals stay consistent across the debate
+    if fit["history"]:
+        content += f"\n\nDebate so far:\n{fit['history']}"
+
     # Conditionally add PDF context
-    if pdf_context.strip(): # Check if context is not just empty space
-        content += f"\n\nReference Material (from uploaded PDF):\n{pdf_context[:3000]}"
+    if fit["reference"].strip(): # Check if context is not just empty space
+        content += f"\n\nReference Material (from uploaded PDF):\n{fit['reference']}"
 
     messages = [
         {"role":"system", "content": SYSTEM_MESSAGE},
@@ -33,8 +42,8 @@ def build_opponent_prompt(last_argument: str, topic: str) -> List[Dict]:
     ]
     return messages
 
-def generate_opponent_argument(last_argument: str, topic: str) -> str:
-    messages = build_opponent_prompt(last_argument, topic)
-    raw = call_openrouter(messages, MODEL_OPPONENT)
+def generate_opponent_argument(last_argument: str, topic: str, memory: str = None, context_ids: List[str] = None) -> str:
+    messages = build_opponent_prompt(last_argument, topic, memory=memory, context_ids=context_ids)
+    raw = call_openrouter(messages, MODEL_OPPONENT, role="opponent")
     cleaned = clean_model_output(raw)
     return cleaned.strip() if cleaned else ""
\ No newline at end of file
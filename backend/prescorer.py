@@ -0,0 +1,287 @@
+# backend/prescorer.py
+"""
+Local, CPU-only pre-scorer used to settle lopsided rounds without an LLM judge.
+
+Each argument gets a rough 1-10 quality estimate from cheap features (topic
+overlap, length, overlap with the uploaded PDF, repetition of earlier rounds).
+When the estimated margin is wide, or one side is empty/an error string, the
+round is settled locally; otherwise the real judge is called.
+
+Settled/escalated counters go to data/prescore_stats.json as rounds are
+judged: in total, and for rounds the LLM judge also scored, per judge (model,
+or the ensemble's models), since agreement depends on the judge compared with.
+They are saved unless deferred_prescore_stats() is active: the round runner
+collects them there and applies them when the round is committed, so
+speculative rounds that are discarded are not counted.
+"""
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .config import PRESCORE_MARGIN, PRESCORE_AUDIT_RATE
+from .memory_manager import DATA_DIR
+from .context_library import iter_context_chunks
+
+PRESCORE_STATS_FILE = "prescore_stats.json"
+
+# Strings the app stores in place of an argument when generation fails
+ERROR_MARKERS = (
+    "error generating coached argument",
+    "opponent generation failed",
+    "coached model returned no valid response",
+    "llm call failed",
+    "llm api http error",
+)
+
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "for", "with", "is", "are", "was",
+    "were", "be", "been", "it", "its", "this", "that", "these", "those", "as", "at", "by", "from",
+    "we", "our", "you", "your", "they", "their", "i", "my", "not", "no", "can", "will", "would",
+    "should", "could", "do", "does", "than", "then", "so", "if", "which", "who", "what", "more",
+    "most", "also", "such", "has", "have", "had", "there", "here", "into", "about", "over",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_stats_lock = threading.Lock()
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall((text or "").lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def _is_error(text: str) -> bool:
+    s = (text or "").strip().lower()
+    return not s or any(s.startswith(marker) for marker in ERROR_MARKERS)
+
+
+def extract_features(argument: str, topic: str, pdf_vocab: set, previous: List[str]) -> Dict[str, float]:
+    """Computes the cheap per-argument features used by the pre-scorer."""
+    words = _content_words(argument)
+    vocab = set(words)
+    topic_words = set(_content_words(topic.replace("-", " ")))
+
+    topic_overlap = len(topic_words & vocab) / len(topic_words) if topic_words else 0.5
+    pdf_overlap = len(vocab & pdf_vocab) / len(vocab) if (vocab and pdf_vocab) else 0.0
+
+    repetition = 0.0
+    for prev in previous:
+        prev_vocab = set(_content_words(prev))
+        if vocab and prev_vocab:
+            repetition = max(repetition, len(vocab & prev_vocab) / len(vocab | prev_vocab))
+
+    return {
+        "is_error": float(_is_error(argument)),
+        "n_words": float(len((argument or "").split())),
+        "topic_overlap": topic_overlap,
+        "pdf_overlap": pdf_overlap,
+        "repetition": repetition,
+    }
+
+
+def estimate_score(features: Dict[str, float], has_pdf: bool) -> float:
+    """Maps features to a rough 1-10 score on the judge's scale."""
+    if features["is_error"]:
+        return 1.0
+
+    n = features["n_words"]
+    if n < 15:
+        length_term = -3.0
+    elif n < 40:
+        length_term = -1.0
+    elif n > 400:
+        length_term = -1.0
+    else:
+        length_term = 0.5
+
+    score = 5.0 + length_term
+    score += 3.0 * (features["topic_overlap"] - 0.5)
+    if has_pdf:
+        score += 2.0 * (features["pdf_overlap"] - 0.2)
+    score -= 3.0 * max(features["repetition"] - 0.5, 0.0)
+    return min(max(score, 1.0), 10.0)
+
+
+def prescore(coached: str, opponent: str, topic: str, previous_coached: List[str] = None,
+             previous_opponent: List[str] = None, context_ids: List[str] = None) -> dict:
+    """
+    Estimates both sides' scores and decides whether the round is clear-cut.
+    Returns {"coached", "opponent", "margin", "settled", "reason", "features"}.
+    """
+    pdf_vocab = set()
+    for chunk in iter_context_chunks(context_ids):
+        pdf_vocab.update(_content_words(chunk))
+    has_pdf = bool(pdf_vocab)
+
+    f_c = extract_features(coached, topic, pdf_vocab, previous_coached or [])
+    f_o = extract_features(opponent, topic, pdf_vocab, previous_opponent or [])
+    s_c = estimate_score(f_c, has_pdf)
+    s_o = estimate_score(f_o, has_pdf)
+    margin = s_c - s_o
+
+    if f_c["is_error"] and f_o["is_error"]:
+        settled, reason = True, "both arguments are empty or generation errors"
+    elif f_c["is_error"] or f_o["is_error"]:
+        side = "coached" if f_c["is_error"] else "opponent"
+        settled, reason = True, f"the {side} argument is empty or a generation error"
+    elif abs(margin) >= PRESCORE_MARGIN:
+        settled, reason = True, f"estimated margin {margin:+.1f} exceeds {PRESCORE_MARGIN:.1f}"
+    else:
+        settled, reason = False, f"estimated margin {margin:+.1f} is too close to call"
+
+    return {"coached": s_c, "opponent": s_o, "margin": margin, "settled": settled,
+            "reason": reason, "features": {"coached": f_c, "opponent": f_o}}
+
+
+def _settled_verdict(result: dict) -> dict:
+    """Builds a judge.csv-compatible flat verdict from a pre-score."""
+    verdict = {}
+    for side in ("coached", "opponent"):
+        score = int(round(result[side]))
+        for key in ("logic", "relevance", "clarity", "persuasiveness", "evidence_use"):
+            verdict[f"{key}_{side}"] = score
+        verdict[f"total_{side}"] = float(round(result[side], 2))
+        verdict[f"notes_{side}"] = f"Settled by local pre-scorer: {result['reason']}."
+    return verdict
+
+
+# --- Skip-rate / agreement bookkeeping ---
+
+def get_prescore_stats_path() -> str:
+    return os.path.join(DATA_DIR, PRESCORE_STATS_FILE)
+
+
+def read_prescore_stats() -> dict:
+    """Reads cumulative pre-scorer counters (empty dict if none yet)."""
+    path = get_prescore_stats_path()
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+_pending_records = contextvars.ContextVar("prescore_pending", default=None)
+
+
+@contextmanager
+def deferred_prescore_stats():
+    """Collects the counters recorded in this context in the yielded list instead of saving them."""
+    records = []
+    token = _pending_records.set(records)
+    try:
+        yield records
+    finally:
+        _pending_records.reset(token)
+
+
+def apply_prescore_stats(records: list):
+    """Saves counters collected by deferred_prescore_stats()."""
+    for record in records:
+        _save_record(*record)
+
+
+COUNTER_KEYS = ("rounds", "settled", "escalated", "audited", "audit_agree", "escalated_agree")
+
+
+def _record(settled: bool, compared: Optional[bool], agreed: Optional[bool], judge: str = None):
+    pending = _pending_records.get()
+    if pending is not None:
+        pending.append((settled, compared, agreed, judge))
+        return
+    _save_record(settled, compared, agreed, judge)
+
+
+def _save_record(settled: bool, compared: Optional[bool], agreed: Optional[bool], judge: str = None):
+    with _stats_lock:
+        stats = read_prescore_stats()
+        buckets = [stats]
+        if compared and judge:
+            buckets.append(stats.setdefault("by_judge", {}).setdefault(judge, {}))
+        for bucket in buckets:
+            for key in COUNTER_KEYS:
+                bucket.setdefault(key, 0)
+            bucket["rounds"] += 1
+            bucket["settled" if settled else "escalated"] += 1
+            if compared:
+                if settled:
+                    bucket["audited"] += 1
+                    bucket["audit_agree"] += int(bool(agreed))
+                else:
+                    bucket["escalated_agree"] += int(bool(agreed))
+        try:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            with open(get_prescore_stats_path(), "w") as f:
+                json.dump(stats, f, indent=4)
+        except Exception as e:
+            print(f"Error saving pre-scorer stats: {e}")
+
+
+def _summary(s: dict) -> dict:
+    rounds = s.get("rounds", 0)
+    audited = s.get("audited", 0)
+    escalated = s.get("escalated", 0)
+    return {
+        "rounds": rounds,
+        "skip_rate": s.get("settled", 0) / rounds if rounds else 0.0,
+        "audited": audited,
+        "audit_agreement": s.get("audit_agree", 0) / audited if audited else None,
+        "escalated": escalated,
+        "escalated_agreement": s.get("escalated_agree", 0) / escalated if escalated else None,
+    }
+
+
+def prescore_report() -> dict:
+    """
+    Summarises the pre-scorer: share of rounds settled without an LLM judge,
+    agreement with the LLM judge on audited settled rounds, and how often its
+    winner guess matched the judge on escalated (close) rounds. "by_judge" has
+    the same figures per judge, over the rounds that judge scored.
+    """
+    s = read_prescore_stats()
+    report = _summary(s)
+    report["by_judge"] = {judge: _summary(counts) for judge, counts in s.get("by_judge", {}).items()}
+    return report
+
+
+def _same_winner(margin_a: float, margin_b: float) -> bool:
+    sign = lambda m: 0 if abs(m) < 0.5 else (1 if m > 0 else -1)
+    return sign(margin_a) == sign(margin_b)
+
+
+def evaluate_tiered(coached: str, opponent: str, topic: str, judge_fn: Callable[[str, str, str], dict],
+                    previous_coached: List[str] = None, previous_opponent: List[str] = None,
+                    context_ids: List[str] = None, judge_label: str = "judge") -> dict:
+    """
+    Settles clear-cut rounds locally and escalates close ones to `judge_fn`
+    (e.g. judge.evaluate). A PRESCORE_AUDIT_RATE share of settled rounds is
+    still sent to the judge so agreement can be measured; for those the LLM
+    verdict is returned (the local one only if the audit call fails).
+    Agreement is also counted under `judge_label` (the judge model).
+    """
+    result = prescore(coached, opponent, topic, previous_coached, previous_opponent, context_ids)
+
+    if result["settled"]:
+        agreed, llm = None, None
+        if random.random() < PRESCORE_AUDIT_RATE:
+            try:
+                llm = judge_fn(coached, opponent, topic)
+                llm_margin = float(llm.get("total_coached", 5.0)) - float(llm.get("total_opponent", 5.0))
+                agreed = _same_winner(result["margin"], llm_margin)
+            except Exception as e:
+                print(f"Pre-scorer audit call failed: {e}")
+                llm = None
+        _record(settled=True, compared=llm is not None, agreed=agreed, judge=judge_label)
+        # an audited round already paid for the LLM verdict, the better label of the two
+        return llm if llm is not None else _settled_verdict(result)
+
+    verdict = judge_fn(coached, opponent, topic)
+    llm_margin = float(verdict.get("total_coached", 5.0)) - float(verdict.get("total_opponent", 5.0))
+    _record(settled=False, compared=True, agreed=_same_winner(result["margin"], llm_margin), judge=judge_label)
+    return verdict
@@ -1,7 +1,7 @@
 # backend/rl_agent.py
 from typing import Tuple
 from .config import TEMPLATES
-from .memory_manager import read_rl_memory, write_rl_memory
+from .memory_manager import read_rl_memory, write_rl_memory, rl_memory_lock
 import random
 
 class RLAgent:
@@ -11,18 +11,21 @@ class RLAgent:
     """
 
     def __init__(self):
-        mem = read_rl_memory()
-        self.epsilon = mem.get("epsilon", 0.25)
-        # ensure stats exist
-        stats = mem.get("template_stats", {})
-        for i in range(len(TEMPLATES)):
-            stats.setdefault(str(i), {"count":0, "sum_reward":0.0})
-        mem["template_stats"] = stats
-        write_rl_memory(mem)
+        with rl_memory_lock:
+            mem = read_rl_memory()
+            self.epsilon = mem.get("epsilon", 0.25)
+            # ensure stats exist (only written when a template is missing; this runs on every rerun)
+            stats = mem.get("template_stats", {})
+            missing = [str(i) for i in range(len(TEMPLATES)) if str(i) not in stats]
+            if missing or "template_stats" not in mem:
+                for key in missing:
+                    stats[key] = {"count":0, "sum_reward":0.0}
+                mem["template_stats"] = stats
+                write_rl_memory(mem)
 
     def select(self) -> Tuple[int, str]:
         mem = read_rl_memory()
-        stats = mem["template_stats"]
+        stats = mem.get("template_stats", {})
         # epsilon-greedy
         import random
         if random.random() < self.epsilon:
@@ -40,13 +43,14 @@ class RLAgent:
         return best_idx, TEMPLATES[best_idx]
 
     def update(self, template_idx: int, reward: float):
-        mem = read_rl_memory()
-        stats = mem["template_stats"]
-        key = str(template_idx)
-        if key not in stats:
-            stats[key] = {"count":1, "sum_reward": float(reward)}
-        else:
-            stats[key]["count"] += 1
-            stats[key]["sum_reward"] += float(reward)
-        mem["template_stats"] = stats
-        write_rl_memory(mem)
+        # rounds of several debates commit concurrently: no update may overwrite another
+        with rl_memory_lock:
+            mem = read_rl_memory()
+            stats = mem.setdefault("template_stats", {})
+            key = str(template_idx)
+            if key not in stats:
+                stats[key] = {"count":1, "sum_reward": float(reward)}
+            else:
+                stats[key]["count"] += 1
+                stats[key]["sum_reward"] += float(reward)
+            write_rl_memory(mem)
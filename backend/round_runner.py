@@ -0,0 +1,498 @@
+# backend/round_runner.py
+"""
+One debate round, split into a side-effect-free generation step and a commit.
+
+generate_round() picks a template, drafts the coached argument, the rebuttal
+and the judge verdict without writing anything, so it can run speculatively in
+the background. commit_round() persists a generated round (debate/judge CSVs,
+rolling memory, judge ensemble stats, pre-scorer and judge parse counters)
+and applies the RL update.
+
+submit_round() runs a whole round (generate + commit) as a job on the shared
+round_queue, so the UI only polls its stage/progress and picks up the result
+whenever it reruns; several debates can have rounds in flight at once.
+submit_autoplay() plays all remaining rounds in one job, judging round N while
+round N+1 is drafted.
+
+Every round carries a UsageMeter (backend/usage.py) that counts the tokens and
+cost of its LLM calls; commit_round() stores it in the debate's usage.csv.
+A debate stops drafting rounds once DEBATE_TOKEN_BUDGET / DEBATE_COST_BUDGET
+is spent, and an auto-play run once BATCH_TOKEN_BUDGET / BATCH_COST_BUDGET is.
+
+Prefetcher builds on that: after round N is committed it starts generating
+round N+1 on a background queue, hands the result over when the user asks for
+that round, and discards it if the debate ends or is reset. Hits, misses and
+the waiting time saved are kept in data/prefetch_stats.json.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .config import (
+    MODEL_JUDGE, JUDGE_ENSEMBLE_MODELS, PRESCORE_ENABLED, JUDGE_STREAMING, ROUND_WORKERS,
+    DEBATE_TOKEN_BUDGET, DEBATE_COST_BUDGET, BATCH_TOKEN_BUDGET, BATCH_COST_BUDGET,
+)
+from .context_library import get_debate_contexts, bind_debate_contexts, wait_for_uploads
+from .debate_memory import load_debate_memory, record_round
+from .debater import generate_coached_argument
+from .jobs import JobQueue
+from .judge import evaluate, evaluate_ensemble, evaluate_stream, deferred_parse_stats, apply_parse_stats
+from .memory_manager import (
+    DATA_DIR, read_debate, append_round, append_judge, append_judge_stats, read_usage, append_usage,
+)
+from .opponent import generate_opponent_argument
+from .prescorer import evaluate_tiered, deferred_prescore_stats, apply_prescore_stats
+from .usage import UsageMeter, BudgetExceeded, metering, sum_usage, add_usage, budget_exceeded
+
+PREFETCH_STATS_FILE = "prefetch_stats.json"
+
+# Shared by every session: background round generation
+round_queue = JobQueue(ROUND_WORKERS, name="rounds")
+
+
+def _log_coach_error(e: Exception):
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(os.path.join(DATA_DIR, "llm_coach_error.txt"), "a", encoding="utf-8") as fh:
+            fh.write(f"{time.ctime()}: {str(e)}\n")
+    except Exception:
+        pass
+
+
+def debate_budget_reason(debate_id: str, in_flight: dict = None) -> Optional[str]:
+    """Why the debate may not draft another round (its budget is spent, counting `in_flight` usage), or None."""
+    if not (DEBATE_TOKEN_BUDGET or DEBATE_COST_BUDGET):
+        return None
+    spent = sum_usage(read_usage(debate_id))
+    if in_flight:
+        spent = add_usage(spent, in_flight)
+    return budget_exceeded(spent, DEBATE_TOKEN_BUDGET, DEBATE_COST_BUDGET, "Debate")
+
+
+def _stream_judge(coached: str, opponent: str, topic: str, context_ids: Optional[List[str]], progress: Callable) -> dict:
+    """Streams the judge call, reporting the score fields received so far as `judge_fields` on the job."""
+    fields = {"coached": {}, "opponent": {}}
+    verdict = None
+    for event in evaluate_stream(coached, opponent, topic, context_ids=context_ids):
+        if "verdict" in event:
+            verdict = event["verdict"]
+            continue
+        fields[event["side"]][event["field"]] = event["value"]
+        progress("judge", 2 / 3, judge_fields={side: dict(got) for side, got in fields.items()})
+    return verdict
+
+
+def default_judge(coached: str, opponent: str, topic: str, context_ids: Optional[List[str]],
+                  previous_coached: List[str], previous_opponent: List[str], progress: Callable = None):
+    """
+    Judge used for background rounds: ensemble or single model (streamed into the
+    job's progress when JUDGE_STREAMING is on), behind the pre-scorer when enabled.
+    Returns (verdict, stats).
+    """
+    stats = []
+
+    def run_llm_judge(c, o, t):
+        if JUDGE_ENSEMBLE_MODELS:
+            verdict, judge_stats = evaluate_ensemble(c, o, t, context_ids=context_ids)
+            stats.extend(judge_stats)
+            return verdict
+        if JUDGE_STREAMING and progress:
+            return _stream_judge(c, o, t, context_ids, progress)
+        return evaluate(c, o, t, context_ids=context_ids)
+
+    if PRESCORE_ENABLED:
+        judge_label = f"ensemble({', '.join(JUDGE_ENSEMBLE_MODELS)})" if JUDGE_ENSEMBLE_MODELS else MODEL_JUDGE
+        verdict = evaluate_tiered(coached, opponent, topic, run_llm_judge, previous_coached=previous_coached,
+                                  previous_opponent=previous_opponent, context_ids=context_ids,
+                                  judge_label=judge_label)
+    else:
+        verdict = run_llm_judge(coached, opponent, topic)
+    return verdict, stats
+
+
+def draft_round(debate_id: str, topic: str, round_no: int, rl, previous_coached: List[str], memory: str,
+                context_ids: Optional[List[str]], progress: Callable[[str, float], None] = None,
+                meter: UsageMeter = None) -> dict:
+    """
+    Picks a template and drafts the coached argument and the rebuttal (no judge,
+    nothing saved). Their LLM usage is counted on `meter` (a new one by default),
+    returned as the draft's "usage".
+    """
+    meter = meter or UsageMeter()
+    with metering(meter):
+        draft = _draft(debate_id, topic, round_no, rl, previous_coached, memory, context_ids, progress)
+    draft["usage"] = meter
+    return draft
+
+
+def _draft(debate_id: str, topic: str, round_no: int, rl, previous_coached: List[str], memory: str,
+           context_ids: Optional[List[str]], progress: Callable[[str, float], None] = None) -> dict:
+    timings = {}
+    template_idx, template_text = rl.select()
+
+    if progress:
+        progress("coach", 0.0)
+    t0 = time.perf_counter()
+    try:
+        coached = generate_coached_argument(template_text, topic, previous=previous_coached, memory=memory, context_ids=context_ids)
+        if not coached:
+            coached = "Coached model returned no valid response."
+    except Exception as e:
+        coached = f"Error generating coached argument: {e}"
+        _log_coach_error(e)
+    timings["coach"] = time.perf_counter() - t0
+
+    if progress:
+        progress("opponent", 1 / 3)
+    t0 = time.perf_counter()
+    try:
+        opponent = generate_opponent_argument(coached, topic, memory=memory, context_ids=context_ids)
+    except Exception as e:
+        opponent = f"Opponent generation failed: {e}"
+    timings["opponent"] = time.perf_counter() - t0
+
+    return {
+        "debate_id": debate_id,
+        "round": round_no,
+        "template_idx": template_idx,
+        "coached": coached,
+        "opponent": opponent,
+        "timings": timings,
+    }
+
+
+def judge_draft(draft: dict, topic: str, context_ids: Optional[List[str]], previous_coached: List[str],
+                previous_opponent: List[str], judge_fn: Callable = None,
+                progress: Callable[[str, float], None] = None) -> dict:
+    """
+    Judges a drafted round; adds judge_scores, judge_failed, judge_stats and the
+    judge timing to it. The judge's usage goes on the draft's meter; its
+    pre-scorer and parse counters are kept on the draft ("pending_stats") until
+    commit_round().
+    """
+    if progress:
+        progress("judge", 2 / 3)
+    t0 = time.perf_counter()
+    judge_failed = False
+    judge_stats = []
+    try:
+        with metering(draft.get("usage")), deferred_prescore_stats() as prescore_records, \
+                deferred_parse_stats() as parse_counts:
+            if judge_fn:
+                judge_scores = judge_fn(draft["coached"], draft["opponent"], context_ids)
+            else:
+                judge_scores, judge_stats = default_judge(draft["coached"], draft["opponent"], topic, context_ids,
+                                                          previous_coached, previous_opponent, progress)
+    except Exception as e:
+        judge_failed = True
+        judge_scores = {
+            "total_coached": 5.0,
+            "total_opponent": 5.0,
+            "notes_coached": f"Judge error: {e}",
+            "notes_opponent": "Fallback evaluation."
+        }
+    draft["timings"]["judge"] = time.perf_counter() - t0
+    draft.update(judge_scores=judge_scores, judge_failed=judge_failed, judge_stats=judge_stats,
+                 pending_stats={"prescore": prescore_records, "judge_parse": parse_counts})
+    return draft
+
+
+def generate_round(debate_id: str, topic: str, round_no: int, rl, judge_fn: Callable = None,
+                   progress: Callable[[str, float], None] = None) -> dict:
+    """
+    Generates one round without persisting it. `judge_fn(coached, opponent, context_ids)`
+    overrides the default (non-streaming) judge. Returns a dict with template_idx,
+    coached, opponent, judge_scores, judge_failed, judge_stats, usage (UsageMeter),
+    pending_stats (counters saved by commit_round) and per-stage timings.
+    """
+    started = time.perf_counter()
+    df = read_debate(debate_id)
+    prev_args = df["coached_argument"].dropna().astype(str).tolist() if not df.empty else []
+    prev_opp = df["opponent_argument"].dropna().astype(str).tolist() if not df.empty else []
+    debate_memory = load_debate_memory(debate_id).render()
+    context_ids = get_debate_contexts(debate_id)
+
+    draft = draft_round(debate_id, topic, round_no, rl, prev_args, debate_memory, context_ids, progress)
+    result = judge_draft(draft, topic, context_ids, prev_args, prev_opp, judge_fn, progress)
+    result["timings"]["total"] = time.perf_counter() - started
+    return result
+
+
+def commit_round(result: dict, rl, record_memory: bool = True) -> Optional[str]:
+    """
+    Persists a generated round and updates the RL agent. Returns a warning
+    message for the UI, or None. `record_memory=False` skips the rolling memory
+    update for callers that already recorded the round.
+    """
+    debate_id, round_no = result["debate_id"], result["round"]
+    judge_scores = result["judge_scores"]
+    # A failed judge has no real verdict: store no reward and don't feed the RL agent
+    reward = float("nan") if result["judge_failed"] else float(judge_scores.get("total_coached", 0)) - float(judge_scores.get("total_opponent", 0))
+
+    append_round(debate_id, {
+        "round": round_no,
+        "speaker": "coached",
+        "coached_argument": result["coached"],
+        "opponent_argument": result["opponent"],
+        "action": str(result["template_idx"]),
+        "reward": reward
+    })
+    if record_memory:
+        record_round(debate_id, round_no, result["coached"], result["opponent"])
+    judge_scores["round"] = round_no
+    append_judge(debate_id, judge_scores)
+    if result.get("judge_stats"):
+        append_judge_stats(debate_id, round_no, result["judge_stats"])
+    if result.get("usage"):
+        append_usage(debate_id, round_no, str(result["template_idx"]), result["usage"].rows())
+    pending = result.get("pending_stats")
+    if pending:
+        apply_prescore_stats(pending["prescore"])
+        apply_parse_stats(pending["judge_parse"])
+
+    if result["judge_failed"]:
+        return "Judge failed; this round was not used to update the RL agent."
+    try:
+        rl.update(result["template_idx"], reward)
+    except Exception as e:
+        return f"RL update failed: {e}"
+    return None
+
+
+def run_round(debate_id: str, topic: str, round_no: int, rl, upload_jobs: List[str] = None,
+              prefetcher: "Prefetcher" = None, progress: Callable[[str, float], None] = None) -> dict:
+    """
+    Background job for one round: waits for the debate's pending uploads (binding
+    the ones that ingested), takes the speculative round from `prefetcher` when it
+    matches, otherwise generates it (raising BudgetExceeded if the debate's budget
+    is spent), then commits it. The result of generate_round() is returned with
+    a `warnings` list for the UI.
+    """
+    warnings = []
+    if upload_jobs:
+        if progress:
+            progress("context", 0.0)
+        ready, errors = wait_for_uploads(upload_jobs)
+        bound = get_debate_contexts(debate_id) or []
+        bind_debate_contexts(debate_id, bound + [c for c in ready if c not in bound])
+        warnings += [f"Context not used: {error}" for error in errors]
+
+    result = prefetcher.take(debate_id, round_no) if prefetcher else None
+    if result is None:
+        reason = debate_budget_reason(debate_id)
+        if reason:
+            raise BudgetExceeded(reason)
+        result = generate_round(debate_id, topic, round_no, rl, progress=progress)
+    if progress:
+        progress("saving", 0.95)
+    warning = commit_round(result, rl)
+    result["warnings"] = warnings + ([warning] if warning else [])
+    return result
+
+
+def submit_round(debate_id: str, topic: str, round_no: int, rl, upload_jobs: List[str] = None,
+                 prefetcher: "Prefetcher" = None) -> str:
+    """Queues run_round() on round_queue; returns the job ID to poll with get_round_job()."""
+    return round_queue.submit("round", run_round, debate_id, topic, round_no, rl,
+                              upload_jobs=upload_jobs, prefetcher=prefetcher)
+
+
+def run_remaining_rounds(debate_id: str, topic: str, first_round: int, last_round: int, rl,
+                         stop: threading.Event = None, progress: Callable[[str, float], None] = None) -> dict:
+    """
+    Auto-play: plays rounds first_round .. last_round-1 back to back. Round N is
+    judged on a second thread while round N+1 is drafted, so the judge's latency
+    hides behind generation; the price is that round N+1's template is picked
+    before round N's reward reaches the RL agent. Arguments and rolling memory
+    are carried between rounds in memory rather than re-read from the CSVs.
+
+    Each committed round is published as `rounds` on the job (and its progress)
+    so the UI can show it as soon as it lands. Setting `stop` ends the run after
+    the rounds already in flight, and so does spending the debate's or this
+    run's budget (checked before each draft, counting the round still being
+    judged). Returns {"rounds", "wall_sec", "llm_sec", "usage", "stopped"}, where
+    usage totals the run and stopped is the budget message, if any.
+    """
+    started = time.perf_counter()
+    df = read_debate(debate_id)
+    prev_args = df["coached_argument"].dropna().astype(str).tolist() if not df.empty else []
+    prev_opp = df["opponent_argument"].dropna().astype(str).tolist() if not df.empty else []
+    memory = load_debate_memory(debate_id)
+    context_ids = get_debate_contexts(debate_id)
+    n_rounds = max(last_round - first_round, 1)
+    done = []
+    batch = UsageMeter()
+    spent_before = sum_usage(read_usage(debate_id))
+    stopped = None
+
+    def finish(judged):
+        result = judged.result()
+        warning = commit_round(result, rl, record_memory=False)
+        result["warnings"] = [warning] if warning else []
+        done.append(result)
+        if progress:
+            progress("saving", len(done) / n_rounds, rounds=list(done))
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="autoplay-judge") as judge_pool:
+        pending = None
+        for round_no in range(first_round, last_round):
+            if stop is not None and stop.is_set():
+                break
+            spent = batch.totals()
+            stopped = (budget_exceeded(add_usage(spent_before, spent), DEBATE_TOKEN_BUDGET, DEBATE_COST_BUDGET, "Debate")
+                       or budget_exceeded(spent, BATCH_TOKEN_BUDGET, BATCH_COST_BUDGET, "Auto-play"))
+            if stopped:
+                break
+            if progress:
+                progress("drafting", len(done) / n_rounds, current=round_no)
+            draft = draft_round(debate_id, topic, round_no, rl, prev_args, memory.render(), context_ids,
+                                meter=UsageMeter(parent=batch))
+            memory = record_round(debate_id, round_no, draft["coached"], draft["opponent"])
+            judged = judge_pool.submit(judge_draft, draft, topic, context_ids, list(prev_args), list(prev_opp))
+            prev_args.append(draft["coached"])
+            prev_opp.append(draft["opponent"])
+            # the previous round's judge ran while this round was drafted
+            if pending is not None:
+                finish(pending)
+            pending = judged
+        if pending is not None:
+            finish(pending)
+
+    return {
+        "rounds": done,
+        "wall_sec": time.perf_counter() - started,
+        "llm_sec": sum(sum(r["timings"].values()) for r in done),
+        "usage": batch.totals(),
+        "stopped": stopped,
+    }
+
+
+_autoplay_stops: Dict[str, threading.Event] = {}
+
+
+def submit_autoplay(debate_id: str, topic: str, first_round: int, last_round: int, rl) -> str:
+    """Queues run_remaining_rounds() on round_queue; returns the job ID (see stop_autoplay)."""
+    for job_id in [j for j in _autoplay_stops if (round_queue.get(j) or {}).get("status") not in ("queued", "running")]:
+        _autoplay_stops.pop(job_id, None)
+    stop = threading.Event()
+    job_id = round_queue.submit("autoplay", run_remaining_rounds, debate_id, topic, first_round, last_round, rl, stop=stop)
+    _autoplay_stops[job_id] = stop
+    return job_id
+
+
+def stop_autoplay(job_id: str):
+    """Asks an auto-play job to stop after the rounds already in flight."""
+    stop = _autoplay_stops.pop(job_id, None)
+    if stop:
+        stop.set()
+
+
+def finished_rounds(job: dict) -> List[dict]:
+    """Committed round results of a round or auto-play job (auto-play publishes them as they land)."""
+    if job["kind"] == "autoplay":
+        return job.get("rounds") or []
+    return [job["result"]] if job["status"] == "done" else []
+
+
+def get_round_job(job_id: str) -> Optional[dict]:
+    """
+    Job status: status, stage (context/coach/opponent/judge/drafting/saving), progress,
+    judge_fields, result, error; auto-play jobs also have current and rounds.
+    """
+    return round_queue.get(job_id) if job_id else None
+
+
+# --- Speculative prefetch ---
+
+_stats_lock = threading.Lock()
+
+
+def get_prefetch_stats_path() -> str:
+    return os.path.join(DATA_DIR, PREFETCH_STATS_FILE)
+
+
+def read_prefetch_stats() -> dict:
+    """Cumulative prefetch counters: started, hits, misses, discarded, time_saved_sec."""
+    path = get_prefetch_stats_path()
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def _record_prefetch(**increments):
+    with _stats_lock:
+        stats = read_prefetch_stats()
+        for key, value in increments.items():
+            stats[key] = stats.get(key, 0) + value
+        try:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            with open(get_prefetch_stats_path(), "w") as f:
+                json.dump(stats, f, indent=4)
+        except Exception as e:
+            print(f"Error saving prefetch stats: {e}")
+
+
+def prefetch_report() -> dict:
+    s = read_prefetch_stats()
+    asked = s.get("hits", 0) + s.get("misses", 0)
+    return {
+        "started": s.get("started", 0),
+        "hits": s.get("hits", 0),
+        "misses": s.get("misses", 0),
+        "discarded": s.get("discarded", 0),
+        "hit_rate": s.get("hits", 0) / asked if asked else None,
+        "time_saved_sec": s.get("time_saved_sec", 0.0),
+    }
+
+
+class Prefetcher:
+    """Holds at most one speculative round (per session) generated on round_queue."""
+
+    def __init__(self):
+        self.key = None      # (debate_id, round_no)
+        self.job_id = None
+
+    def start(self, debate_id: str, topic: str, round_no: int, rl):
+        self.discard()
+        if debate_budget_reason(debate_id):
+            return
+        self.key = (debate_id, round_no)
+        self.job_id = round_queue.submit("prefetch", generate_round, debate_id, topic, round_no, rl)
+        _record_prefetch(started=1)
+
+    def take(self, debate_id: str, round_no: int) -> Optional[dict]:
+        """
+        Returns the speculative round if it was generated for exactly this debate
+        and round (waiting for it if it's still running), else None.
+        """
+        if self.job_id is None:
+            _record_prefetch(misses=1)
+            return None
+        if self.key != (debate_id, round_no):
+            self.discard()
+            _record_prefetch(misses=1)
+            return None
+
+        asked = time.perf_counter()
+        job = round_queue.wait([self.job_id])[0]
+        waited = time.perf_counter() - asked
+        self.key = self.job_id = None
+        if not job or job["status"] != "done":
+            _record_prefetch(misses=1)
+            return None
+        result = job["result"]
+        _record_prefetch(hits=1, time_saved_sec=max(result["timings"]["total"] - waited, 0.0))
+        return result
+
+    def discard(self):
+        """Drops the speculative round (a running generation finishes but its result is ignored)."""
+        if self.job_id is not None:
+            _record_prefetch(discarded=1)
+        self.key = self.job_id = None
@@ -0,0 +1,231 @@
+# backend/simulator.py
+"""
+Offline bandit simulator for tuning the RLAgent without spending LLM calls.
+
+Per-template reward distributions are fitted from the `reward` column of every
+stored debate.csv, then thousands of independent agents are simulated side by
+side in NumPy (one row per run, one column per template). Every parameter
+setting is stacked into the same arrays, so a full sweep is a single loop over
+the horizon.
+
+Usage:
+    python -m backend.simulator --runs 2000 --horizon 500 --apply
+"""
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import TEMPLATES
+from .memory_manager import list_debates, read_debate, read_rl_memory, write_rl_memory, rl_memory_lock
+
+# Rewards are total_coached - total_opponent on a 1-10 rubric
+REWARD_MIN = -9.0
+REWARD_MAX = 9.0
+
+# Pseudo-count used to shrink sparse templates towards the pooled estimate
+PRIOR_STRENGTH = 3.0
+
+DEFAULT_EPSILONS = [0.0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5]
+
+
+def collect_rewards() -> Dict[int, List[float]]:
+    """
+    Reads every stored debate and groups the observed rewards by template index.
+    Rows with a missing or non-numeric action/reward are skipped.
+    """
+    rewards = {i: [] for i in range(len(TEMPLATES))}
+    for debate_id in list_debates():
+        df = read_debate(debate_id)
+        if df.empty or "action" not in df.columns or "reward" not in df.columns:
+            continue
+        for action, reward in zip(df["action"], df["reward"]):
+            try:
+                idx = int(action)
+                value = float(reward)
+            except (TypeError, ValueError):
+                continue
+            if idx in rewards and np.isfinite(value):
+                rewards[idx].append(value)
+    return rewards
+
+
+def fit_reward_model(rewards: Dict[int, List[float]]) -> Dict[str, list]:
+    """
+    Fits a clipped Normal(mean, std) per template.
+    Templates with few (or no) observations are shrunk towards the pooled
+    mean/std so the simulator never treats an untried template as a sure thing.
+    """
+    pooled = np.array([r for vals in rewards.values() for r in vals], dtype=float)
+    if pooled.size:
+        pooled_mean = float(pooled.mean())
+        pooled_std = float(pooled.std()) if pooled.size > 1 else 1.0
+    else:
+        pooled_mean, pooled_std = 0.0, 1.0
+    pooled_std = max(pooled_std, 0.5)
+
+    means, stds, counts = [], [], []
+    for i in range(len(TEMPLATES)):
+        vals = np.array(rewards.get(i, []), dtype=float)
+        n = vals.size
+        w = n / (n + PRIOR_STRENGTH)
+        mean = w * (vals.mean() if n else 0.0) + (1 - w) * pooled_mean
+        var = w * (vals.var() if n > 1 else pooled_std ** 2) + (1 - w) * pooled_std ** 2
+        means.append(float(mean))
+        stds.append(float(max(np.sqrt(var), 0.1)))
+        counts.append(int(n))
+
+    return {"means": means, "stds": stds, "counts": counts}
+
+
+def simulate_epsilon_greedy(model: Dict[str, list], epsilons: List[float], runs: int = 2000,
+                            horizon: int = 500, seed: Optional[int] = None,
+                            warm_stats: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Simulates RLAgent's epsilon-greedy policy for every epsilon at once.
+
+    Mirrors RLAgent.select(): explore uniformly with probability epsilon,
+    otherwise pick the best average reward where unseen templates count as 0.0
+    and ties go to the lowest index.
+
+    Returns the mean cumulative regret curve per epsilon (shape: settings x horizon)
+    and the average reward per step.
+    """
+    rng = np.random.default_rng(seed)
+    means = np.asarray(model["means"], dtype=float)
+    stds = np.asarray(model["stds"], dtype=float)
+    n_arms = means.size
+    n_settings = len(epsilons)
+    rows = n_settings * runs
+
+    eps = np.repeat(np.asarray(epsilons, dtype=float), runs)
+    counts = np.zeros((rows, n_arms), dtype=np.int64)
+    sums = np.zeros((rows, n_arms), dtype=float)
+    if warm_stats:
+        for key, s in warm_stats.items():
+            i = int(key)
+            if 0 <= i < n_arms:
+                counts[:, i] = int(s.get("count", 0))
+                sums[:, i] = float(s.get("sum_reward", 0.0))
+
+    row_idx = np.arange(rows)
+    best_mean = means.max()
+    regret = np.empty((n_settings, horizon), dtype=float)
+    reward_curve = np.empty((n_settings, horizon), dtype=float)
+
+    for t in range(horizon):
+        avg = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        arms = avg.argmax(axis=1)
+        explore = rng.random(rows) < eps
+        arms[explore] = rng.integers(0, n_arms, size=int(explore.sum()))
+
+        r = means[arms] + stds[arms] * rng.standard_normal(rows)
+        np.clip(r, REWARD_MIN, REWARD_MAX, out=r)
+        counts[row_idx, arms] += 1
+        sums[row_idx, arms] += r
+
+        regret[:, t] = (best_mean - means[arms]).reshape(n_settings, runs).mean(axis=1)
+        reward_curve[:, t] = r.reshape(n_settings, runs).mean(axis=1)
+
+    return {"regret": np.cumsum(regret, axis=1), "reward": reward_curve}
+
+
+# Policies the simulator can sweep, keyed by name -> (simulate fn, parameter grid)
+POLICIES = {
+    "epsilon_greedy": (simulate_epsilon_greedy, DEFAULT_EPSILONS),
+}
+
+
+def run_sweep(runs: int = 2000, horizon: int = 500, epsilons: Optional[List[float]] = None,
+              seed: Optional[int] = None, warm_start: bool = False) -> dict:
+    """
+    Fits the reward model from storage, sweeps every policy/parameter setting
+    and returns a JSON-serialisable report with regret curves and a recommendation.
+    """
+    started = time.perf_counter()
+    rewards = collect_rewards()
+    model = fit_reward_model(rewards)
+    warm_stats = read_rl_memory().get("template_stats") if warm_start else None
+
+    # Regret curves are downsampled to keep the report small
+    checkpoints = np.unique(np.linspace(0, horizon - 1, num=min(horizon, 50)).astype(int))
+
+    settings = []
+    for policy, (simulate, default_grid) in POLICIES.items():
+        grid = list(epsilons) if epsilons else list(default_grid)
+        result = simulate(model, grid, runs=runs, horizon=horizon, seed=seed, warm_stats=warm_stats)
+        for i, value in enumerate(grid):
+            settings.append({
+                "policy": policy,
+                "epsilon": float(value),
+                "final_regret": float(result["regret"][i, -1]),
+                "mean_reward": float(result["reward"][i].mean()),
+                "regret_curve": [
+                    [int(t) + 1, float(result["regret"][i, t])] for t in checkpoints
+                ],
+            })
+
+    best = min(settings, key=lambda s: s["final_regret"])
+    return {
+        "model": model,
+        "runs": runs,
+        "horizon": horizon,
+        "simulated_rounds": runs * horizon * len(settings),
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+        "settings": settings,
+        "recommended": {"policy": best["policy"], "epsilon": best["epsilon"]},
+    }
+
+
+def apply_recommendation(report: dict):
+    """
+    Writes the recommended epsilon into rl_memory.json, where RLAgent reads it on start-up.
+    A short summary of the sweep is stored alongside for reference.
+    """
+    with rl_memory_lock:
+        mem = read_rl_memory()
+        mem["epsilon"] = report["recommended"]["epsilon"]
+        mem["simulator"] = {
+            "recommended": report["recommended"],
+            "runs": report["runs"],
+            "horizon": report["horizon"],
+            "model": report["model"],
+            "updated_at": int(time.time()),
+        }
+        write_rl_memory(mem)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate RLAgent policies against fitted template rewards.")
+    parser.add_argument("--runs", type=int, default=2000, help="Independent agents per setting")
+    parser.add_argument("--horizon", type=int, default=500, help="Rounds per simulated agent")
+    parser.add_argument("--epsilons", type=str, default="", help="Comma-separated epsilon grid")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--warm-start", action="store_true", help="Start from the current template_stats")
+    parser.add_argument("--apply", action="store_true", help="Save the recommended epsilon to rl_memory.json")
+    args = parser.parse_args()
+
+    grid = [float(x) for x in args.epsilons.split(",") if x.strip()] or None
+    report = run_sweep(runs=args.runs, horizon=args.horizon, epsilons=grid,
+                       seed=args.seed, warm_start=args.warm_start)
+
+    model = report["model"]
+    print("Fitted reward model (template: mean ± std, n):")
+    for i, (m, s, n) in enumerate(zip(model["means"], model["stds"], model["counts"])):
+        print(f"  {i}: {m:+.2f} ± {s:.2f}  (n={n})")
+
+    print(f"\nSimulated {report['simulated_rounds']:,} rounds in {report['elapsed_sec']}s")
+    print(f"{'policy':<16}{'epsilon':>8}{'final regret':>14}{'mean reward':>13}")
+    for s in report["settings"]:
+        print(f"{s['policy']:<16}{s['epsilon']:>8.2f}{s['final_regret']:>14.2f}{s['mean_reward']:>13.2f}")
+
+    rec = report["recommended"]
+    print(f"\nRecommended: {rec['policy']} with epsilon={rec['epsilon']}")
+    if args.apply:
+        apply_recommendation(report)
+        print("Saved recommendation to rl_memory.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# backend/summarizer.py
+"""
+Small, dependency-free extractive summarizer (TF-IDF sentence ranking).
+
+Sentences are treated as documents: a sentence scores high when it contains
+terms that are frequent in it but rare across the other sentences. Document
+frequencies live in a Counter so callers can add sentences incrementally
+instead of re-scanning the whole text.
+"""
+import math
+import re
+from collections import Counter
+from typing import Iterable, List
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "of", "to", "in", "on", "for", "with", "is", "are", "was",
+    "were", "be", "been", "it", "its", "this", "that", "these", "those", "as", "at", "by", "from",
+    "we", "our", "you", "your", "they", "their", "i", "my", "not", "no", "can", "will", "would",
+    "should", "could", "do", "does", "than", "then", "so", "if", "which", "who", "what", "more",
+    "most", "also", "such", "has", "have", "had", "there", "here", "into", "about", "over", "while",
+    "however", "may", "must", "one", "all", "any", "some", "only", "very", "just", "because",
+}
+
+MAX_SENTENCE_CHARS = 300
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits text into sentences, dropping markdown bullets/headings and very short fragments."""
+    if not text:
+        return []
+    sentences = []
+    for block in re.split(r"\n\s*\n|\n(?=\s*[-*•\d]+[.)]?\s)", text):
+        block = re.sub(r"^\s*(?:[-*•#>]+|\d+[.)])\s*", "", block.strip())
+        block = re.sub(r"\s+", " ", block).replace("**", "")
+        for sent in _SENTENCE_RE.split(block):
+            sent = sent.strip()
+            if len(sent.split()) >= 5:
+                sentences.append(sent[:MAX_SENTENCE_CHARS])
+    return sentences
+
+
+def terms(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def sentence_score(term_counts: Counter, df: Counter, n_docs: int) -> float:
+    """TF-IDF mass of a sentence, normalised by sqrt(length) so long sentences don't win by default."""
+    length = sum(term_counts.values())
+    if not length:
+        return 0.0
+    score = 0.0
+    for term, tf in term_counts.items():
+        score += tf * math.log((1 + n_docs) / (1 + df.get(term, 0)) + 1.0)
+    return score / math.sqrt(length)
+
+
+def _too_similar(a: set, b: set, threshold: float = 0.6) -> bool:
+    return bool(a and b) and len(a & b) / len(a | b) >= threshold
+
+
+def rank_sentences(sentences: Iterable[str], top_k: int, df: Counter = None, n_docs: int = None) -> List[int]:
+    """
+    Returns the indices of the top_k sentences (in their original order),
+    skipping near-duplicates of already chosen ones. `df`/`n_docs` may be
+    supplied to rank against a larger, incrementally maintained corpus.
+    """
+    sentences = list(sentences)
+    counts = [Counter(terms(s)) for s in sentences]
+    if df is None:
+        df = Counter()
+        for c in counts:
+            df.update(c.keys())
+        n_docs = len(sentences)
+
+    order = sorted(range(len(sentences)), key=lambda i: sentence_score(counts[i], df, n_docs), reverse=True)
+    chosen = []
+    for i in order:
+        if len(chosen) >= top_k:
+            break
+        if any(_too_similar(set(counts[i]), set(counts[j])) for j in chosen):
+            continue
+        chosen.append(i)
+    return sorted(chosen)
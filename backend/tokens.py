@@ -0,0 +1,177 @@
+# backend/tokens.py
+"""
+Offline token estimation and per-role prompt budgeting.
+
+No real tokenizer is downloaded: text is pre-split like BPE tokenizers do
+(words, numbers, punctuation, whitespace runs) and each piece is costed with
+a per-family characters-per-token ratio. One tokenizer instance (with its
+piece-cost cache) is kept per model family.
+
+allocate_budget() splits a role's token budget between the fixed instruction,
+the debate history and the reference passages, trimming at sentence
+boundaries instead of fixed character offsets. History is trimmed from the
+front (oldest summary lines first), so the most recent rounds survive longest.
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Dict
+
+from .config import TOKEN_BUDGETS, HISTORY_BUDGET_SHARE
+
+# Per family: (longest word usually kept as one token, characters per token beyond that).
+# Larger vocabularies (llama3, gpt) keep longer words whole.
+FAMILY_PARAMS = {
+    "llama3": (10, 4.5),
+    "mistral": (7, 3.8),
+    "gpt": (10, 4.5),
+    "claude": (8, 4.0),
+    "default": (7, 3.8),
+}
+
+_PIECE_RE = re.compile(r"\s+|[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]+")
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s)|\n")
+
+
+def model_family(model: str) -> str:
+    """Maps an OpenRouter model id to a tokenizer family."""
+    m = (model or "").lower()
+    if "llama-3" in m or "llama3" in m:
+        return "llama3"
+    if "mistral" in m or "mixtral" in m:
+        return "mistral"
+    if m.startswith("openai/") or "gpt" in m:
+        return "gpt"
+    if m.startswith("anthropic/") or "claude" in m:
+        return "claude"
+    return "default"
+
+
+class ApproxTokenizer:
+    def __init__(self, whole_word_chars: int, chars_per_token: float):
+        self.whole_word_chars = whole_word_chars
+        self.chars_per_token = chars_per_token
+        self._cache = {}
+
+    def piece_tokens(self, piece: str) -> int:
+        cost = self._cache.get(piece)
+        if cost is None:
+            if piece.isspace():
+                # a single space merges into the next word; newlines/indentation cost ~1 per run
+                cost = 0 if piece == " " else 1
+            elif piece.isalpha():
+                if len(piece) <= self.whole_word_chars:
+                    cost = 1
+                else:
+                    cost = math.ceil(len(piece) / self.chars_per_token)
+            else:
+                # digit groups and punctuation runs ("**", "},", "...")
+                cost = math.ceil(len(piece) / 2)
+            if len(self._cache) < 50000:
+                self._cache[piece] = cost
+        return cost
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return sum(self.piece_tokens(p) for p in _PIECE_RE.findall(text))
+
+    def cut_index(self, text: str, max_tokens: int) -> int:
+        """Largest character offset whose prefix fits within max_tokens."""
+        used = 0
+        for match in _PIECE_RE.finditer(text):
+            used += self.piece_tokens(match.group())
+            if used > max_tokens:
+                return match.start()
+        return len(text)
+
+    def cut_index_from_end(self, text: str, max_tokens: int) -> int:
+        """Smallest character offset whose suffix fits within max_tokens."""
+        used = 0
+        for match in reversed(list(_PIECE_RE.finditer(text))):
+            used += self.piece_tokens(match.group())
+            if used > max_tokens:
+                return match.end()
+        return 0
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(family: str) -> ApproxTokenizer:
+    return ApproxTokenizer(*FAMILY_PARAMS.get(family, FAMILY_PARAMS["default"]))
+
+
+def estimate_tokens(text: str, model: str = None) -> int:
+    """Approximate number of tokens `text` costs for `model`."""
+    return get_tokenizer(model_family(model)).count(text)
+
+
+def estimate_messages_tokens(messages: list, model: str = None) -> int:
+    """Approximate prompt tokens for a chat message list (~4 tokens of framing per message)."""
+    return sum(estimate_tokens(m.get("content", ""), model) + 4 for m in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = None, keep: str = "head") -> str:
+    """
+    Trims text to at most max_tokens, cutting at the last sentence or line end
+    that fits (or the last word boundary if no sentence fits).
+
+    keep="tail" drops the beginning instead, starting the kept text at the
+    first line or sentence start that fits.
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    tok = get_tokenizer(model_family(model))
+    if keep == "tail":
+        start = tok.cut_index_from_end(text, max_tokens)
+        if start <= 0:
+            return text
+        tail = text[start:]
+        starts = [m.end() for m in _SENTENCE_END_RE.finditer(tail)]
+        if starts and starts[0] < len(tail) * 2 // 3:
+            return tail[starts[0]:].lstrip()
+        space = tail.find(" ")
+        return (tail[space:] if space >= 0 else tail).lstrip()
+    cut = tok.cut_index(text, max_tokens)
+    if cut >= len(text):
+        return text
+    head = text[:cut]
+    ends = [m.end() for m in _SENTENCE_END_RE.finditer(head)]
+    if ends and ends[-1] > cut // 3:
+        return head[:ends[-1]].rstrip()
+    space = head.rfind(" ")
+    return (head[:space] if space > 0 else head).rstrip()
+
+
+def allocate_budget(role: str, instruction: str, history: str = "", reference: str = "",
+                    model: str = None, total: int = None) -> Dict[str, str]:
+    """
+    Fits history and reference text into the role's token budget.
+
+    The instruction (system prompt, task, arguments under evaluation) is
+    always kept; what remains is split HISTORY_BUDGET_SHARE / rest between
+    history and reference, and any share one side doesn't need goes to the other.
+    History keeps its tail: RollingMemory.render() puts the newest rounds last.
+    Returns {"history": ..., "reference": ..., "tokens": estimated total}.
+    """
+    total = total or TOKEN_BUDGETS.get(role, TOKEN_BUDGETS["default"])
+    fixed = estimate_tokens(instruction, model)
+    remaining = max(total - fixed, 0)
+
+    need_h = estimate_tokens(history, model)
+    need_r = estimate_tokens(reference, model)
+    share_h = int(remaining * HISTORY_BUDGET_SHARE) if reference else remaining
+    share_r = remaining - share_h if history else remaining
+
+    # water-fill: unused budget from one side flows to the other
+    if need_h < share_h:
+        share_r = remaining - need_h
+    elif need_r < share_r:
+        share_h = remaining - need_r
+
+    history_fit = truncate_to_tokens(history, share_h, model, keep="tail") if need_h > share_h else history
+    reference_fit = truncate_to_tokens(reference, share_r, model) if need_r > share_r else reference
+    return {
+        "history": history_fit,
+        "reference": reference_fit,
+        "tokens": fixed + estimate_tokens(history_fit, model) + estimate_tokens(reference_fit, model),
+    }
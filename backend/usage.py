@@ -0,0 +1,156 @@
+# backend/usage.py
+"""
+Token and cost accounting for LLM calls.
+
+call_openrouter() reports the `usage` block of every response to
+record_usage(), which adds it to the UsageMeter bound with metering() in the
+calling context (a round being drafted or judged); calls made outside one are
+not counted. When a response carries no usage (or a stream ends early) the
+tokens are estimated with backend/tokens.py and the row is flagged as such.
+Cost is OpenRouter's reported `usage.cost` when present, otherwise priced with
+LLM_PRICES (USD per million prompt/completion tokens).
+
+A meter yields one row per (role, model); commit_round() stores them with the
+round in the debate's usage.csv. The helpers below aggregate those rows per
+round and per template, and check spend against the per-debate and per-batch
+(auto-play run) budgets.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .config import LLM_PRICES
+from .tokens import estimate_messages_tokens, estimate_tokens
+
+USAGE_FIELDS = ["calls", "prompt_tokens", "completion_tokens", "total_tokens", "cost_usd"]
+
+_current_meter = contextvars.ContextVar("usage_meter", default=None)
+
+
+class UsageMeter:
+    """Thread-safe usage totals per (role, model). A `parent` meter receives everything added here too."""
+
+    def __init__(self, parent: "UsageMeter" = None):
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._rows: Dict[tuple, dict] = {}
+
+    def add(self, role: str, model: str, prompt_tokens: int, completion_tokens: int, cost_usd: float,
+            estimated: bool = False):
+        with self._lock:
+            row = self._rows.setdefault((role, model), {"role": role, "model": model, "estimated": False,
+                                                        **{f: 0 for f in USAGE_FIELDS}})
+            row["calls"] += 1
+            row["prompt_tokens"] += prompt_tokens
+            row["completion_tokens"] += completion_tokens
+            row["total_tokens"] += prompt_tokens + completion_tokens
+            row["cost_usd"] += cost_usd
+            row["estimated"] = row["estimated"] or estimated
+        if self.parent is not None:
+            self.parent.add(role, model, prompt_tokens, completion_tokens, cost_usd, estimated)
+
+    def rows(self) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self._rows.values()]
+
+    def totals(self) -> dict:
+        return sum_usage(self.rows())
+
+
+@contextmanager
+def metering(meter: Optional[UsageMeter]):
+    """Counts the LLM calls made in this context (and in contexts copied from it) on `meter`."""
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = LLM_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+def record_usage(role: Optional[str], model: str, usage: Optional[dict], messages: list = None,
+                 completion: str = None):
+    """Adds one call to the current meter; estimates the tokens if the response had no usage."""
+    meter = _current_meter.get()
+    if meter is None:
+        return
+    usage = usage or {}
+    prompt_tokens = usage.get("prompt_tokens")
+    completion_tokens = usage.get("completion_tokens")
+    estimated = prompt_tokens is None or completion_tokens is None
+    if prompt_tokens is None:
+        prompt_tokens = estimate_messages_tokens(messages or [], model)
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(completion or "", model)
+    cost = usage.get("cost")
+    if not isinstance(cost, (int, float)):
+        cost = call_cost(model, prompt_tokens, completion_tokens)
+    meter.add(role or "other", model, int(prompt_tokens), int(completion_tokens), float(cost), estimated)
+
+
+def sum_usage(rows) -> dict:
+    """Totals of USAGE_FIELDS over meter rows or a usage.csv DataFrame."""
+    df = pd.DataFrame(rows) if not isinstance(rows, pd.DataFrame) else rows
+    totals = {f: 0 for f in USAGE_FIELDS}
+    if df.empty:
+        return totals
+    for f in USAGE_FIELDS:
+        if f in df:
+            totals[f] = pd.to_numeric(df[f], errors="coerce").fillna(0).sum().item()
+    return totals
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised instead of drafting a round once a token/cost budget is spent."""
+
+
+def add_usage(a: dict, b: dict) -> dict:
+    return {f: a.get(f, 0) + b.get(f, 0) for f in USAGE_FIELDS}
+
+
+def budget_exceeded(spent: dict, token_budget: int, cost_budget: float, label: str) -> Optional[str]:
+    """A message if `spent` has reached either budget (0 = unlimited), else None."""
+    if token_budget and spent.get("total_tokens", 0) >= token_budget:
+        return f"{label} token budget reached ({spent['total_tokens']:,} of {token_budget:,} tokens)."
+    if cost_budget and spent.get("cost_usd", 0) >= cost_budget:
+        return f"{label} cost budget reached (${spent['cost_usd']:.4f} of ${cost_budget:.4f})."
+    return None
+
+
+def usage_by_round(usage: pd.DataFrame) -> pd.DataFrame:
+    """Tokens per round and role (columns: one per role), plus total cost per round."""
+    if usage.empty:
+        return pd.DataFrame()
+    tokens = usage.pivot_table(index="round", columns="role", values="total_tokens", aggfunc="sum", fill_value=0)
+    tokens["cost_usd"] = usage.groupby("round")["cost_usd"].sum()
+    return tokens
+
+
+def usage_by_template(usage: pd.DataFrame, debate: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per template (the round's `action`): rounds, tokens, cost, summed reward and
+    the tokens/cost spent per point of reward (only where the summed reward is positive).
+    """
+    if usage.empty or debate.empty:
+        return pd.DataFrame()
+    per_round = usage.groupby("round")[["total_tokens", "cost_usd"]].sum()
+    rounds = debate[["round", "action", "reward"]].drop_duplicates("round").set_index("round")
+    joined = rounds.join(per_round, how="inner")
+    joined["reward"] = pd.to_numeric(joined["reward"], errors="coerce")
+    summary = joined.groupby("action").agg(
+        rounds=("reward", "size"),
+        total_tokens=("total_tokens", "sum"),
+        cost_usd=("cost_usd", "sum"),
+        reward=("reward", "sum"),
+    )
+    positive = summary["reward"].where(summary["reward"] > 0)
+    summary["tokens_per_point"] = summary["total_tokens"] / positive
+    summary["cost_per_point"] = summary["cost_usd"] / positive
+    return summary
@@ -1,10 +1,18 @@
 # backend/utils.py
 import json
+import math
 import re
-from typing import Dict, Any
-from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL, HTTP_TIMEOUT
+from typing import Dict, Any, List, Optional
+from .config import (
+    OPENROUTER_API_KEY, OPENROUTER_API_URL, HTTP_TIMEOUT, HTTP_POOL_SIZE, LLM_USAGE_ACCOUNTING, LLM_CASSETTE_MODE,
+)
 import httpx
 import os
+import threading
+import time
+from .llm_log import log_llm_call
+from .usage import record_usage
+from .llm_cassette import CassetteTransport
 
 import re
 
@@ -72,12 +80,51 @@ def sanitize_topic(topic: str) -> str:
 
     return text
 
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    """
+    Process-wide HTTP client, so LLM calls from every session and background
+    worker reuse keep-alive connections instead of a new TLS handshake per call
+    (httpx.Client is thread-safe). With LLM_CASSETTE_MODE set, requests go
+    through the record/replay transport (backend/llm_cassette.py).
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            transport = httpx.HTTPTransport(
+                limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+            )
+            if LLM_CASSETTE_MODE in ("record", "replay"):
+                transport = CassetteTransport(LLM_CASSETTE_MODE, inner=transport)
+            _http_client = httpx.Client(timeout=HTTP_TIMEOUT, transport=transport)
+        return _http_client
+
+def use_http_transport(transport: httpx.BaseTransport) -> httpx.Client:
+    """Swaps the shared client for one using `transport` (e.g. a CassetteTransport in a benchmark)."""
+    global _http_client
+    with _http_client_lock:
+        old, _http_client = _http_client, httpx.Client(timeout=HTTP_TIMEOUT, transport=transport)
+    if old is not None:
+        old.close()
+    return _http_client
+
 # backend/utils.py  -> replace call_openrouter(...) with this version
 
-def call_openrouter(messages, model):
+def _http_error_text(e: httpx.HTTPStatusError) -> str:
+    try:
+        return e.response.text[:400]
+    except Exception:
+        return str(e)
+
+def call_openrouter(messages, model, response_format=None, temperature=0.7, role=None):
     """
     Robust LLM caller for OpenRouter-compatible endpoints.
-    Tries multiple response patterns, saves last raw JSON to data/llm_last_response.json for debugging.
+    Tries multiple response patterns. Every call is recorded (sampled, in the
+    background) in data/llm_calls.jsonl under `role` ("coach", "judge", ...),
+    and its token usage is added to the current usage meter (backend/usage.py).
+    `response_format` is passed through as-is (e.g. a json_schema spec) for structured output.
     """
     if not OPENROUTER_API_KEY:
         raise RuntimeError("OPENROUTER_API_KEY is not set in environment")
@@ -85,155 +132,233 @@ def call_openrouter(messages, model):
     payload = {
         "model": model,
         "messages": messages,
-        "temperature": 0.7
+        "temperature": temperature
     }
+    if response_format:
+        payload["response_format"] = response_format
+    if LLM_USAGE_ACCOUNTING:
+        payload["usage"] = {"include": True}
     headers = {
         "Authorization": f"Bearer {OPENROUTER_API_KEY}",
         "Content-Type": "application/json",
     }
 
+    started = time.perf_counter()
     try:
-        with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-            resp = client.post(OPENROUTER_API_URL, json=payload, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-
-            # Save raw response for debugging (safe: non-sensitive but don't commit to git)
-            try:
-                os.makedirs("data", exist_ok=True)
-                with open("data/llm_last_response.json", "w", encoding="utf-8") as fh:
-                    json.dump(data, fh, indent=2, ensure_ascii=False)
-            except Exception:
-                pass
-
-            # 1) OpenAI-like response (choices[0].message.content)
-            try:
-                return data["choices"][0]["message"]["content"]
-            except Exception:
-                pass
-
-            # 2) OpenRouter / Anthropic-ish output: "output"[0]["content"][0]["text"] or "output_text"
-            try:
-                out = data.get("output")
-                if isinstance(out, list) and out:
-                    # path: output[0].get('content') -> list of dicts with 'text' or 'type' 'output_text'
-                    first = out[0]
-                    if isinstance(first, dict):
-                        # search for nested text fields
-                        if "content" in first and isinstance(first["content"], list) and first["content"]:
-                            for c in first["content"]:
-                                if isinstance(c, dict) and "text" in c:
-                                    return c["text"]
-                                if isinstance(c, dict) and "type" in c and c["type"] == "output_text" and "text" in c:
-                                    return c["text"]
-                        # direct text key
-                        if "text" in first:
-                            return first["text"]
-                # fallback nested top-level key
-                if "output_text" in data:
-                    return data["output_text"]
-            except Exception:
-                pass
-
-            # 3) Some routers return a top-level "result" or "message"
-            for key in ("result", "message", "response", "text"):
-                if key in data and isinstance(data[key], str):
-                    return data[key]
-
-            # If we reach here, nothing parsed — return stringified JSON as last resort
-            return json.dumps(data)
-    except httpx.HTTPStatusError as e:
-        # write response body to log for debugging
-        text = ""
+        client = get_http_client()
+        resp = client.post(OPENROUTER_API_URL, json=payload, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
+        usage = data.get("usage") if isinstance(data.get("usage"), dict) else None
+        log_llm_call(role, model, "ok", started, usage=usage, body=data)
+        # without a usage block the tokens are estimated (completion from the returned choices)
+        record_usage(role, model, usage, messages, None if usage else json.dumps(data.get("choices", data)))
+
+        # 1) OpenAI-like response (choices[0].message.content)
+        try:
+            return data["choices"][0]["message"]["content"]
+        except Exception:
+            pass
+
+        # 2) OpenRouter / Anthropic-ish output: "output"[0]["content"][0]["text"] or "output_text"
         try:
-            text = e.response.text[:400]
+            out = data.get("output")
+            if isinstance(out, list) and out:
+                # path: output[0].get('content') -> list of dicts with 'text' or 'type' 'output_text'
+                first = out[0]
+                if isinstance(first, dict):
+                    # search for nested text fields
+                    if "content" in first and isinstance(first["content"], list) and first["content"]:
+                        for c in first["content"]:
+                            if isinstance(c, dict) and "text" in c:
+                                return c["text"]
+                            if isinstance(c, dict) and "type" in c and c["type"] == "output_text" and "text" in c:
+                                return c["text"]
+                    # direct text key
+                    if "text" in first:
+                        return first["text"]
+            # fallback nested top-level key
+            if "output_text" in data:
+                return data["output_text"]
         except Exception:
-            text = str(e)
+            pass
+
+        # 3) Some routers return a top-level "result" or "message"
+        for key in ("result", "message", "response", "text"):
+            if key in data and isinstance(data[key], str):
+                return data[key]
+
+        # If we reach here, nothing parsed — return stringified JSON as last resort
+        return json.dumps(data)
+    except httpx.HTTPStatusError as e:
+        text = _http_error_text(e)
+        log_llm_call(role, model, "http_error", started, body=text, error=f"HTTP {e.response.status_code}")
         raise RuntimeError(f"LLM API HTTP error: {e.response.status_code} — {text}")
     except Exception as e:
+        log_llm_call(role, model, "error", started, error=str(e))
         raise RuntimeError(f"LLM call failed: {str(e)}")
 
 
-def parse_judge_json(raw: str) -> Dict[str, Any]:
+def call_openrouter_stream(messages, model, response_format=None, temperature=0.7, role=None):
     """
-    Robustly extract JSON object from the judge's text output and return a flat dict.
-    Accepts:
-      - fully nested JSON: {"coached": {...}, "opponent": {...}}
-      - flat JSON: {"logic_coached": 7, "notes_coached": "...", ...}
-    Normalizes numeric scores to ints, ensures notes fields exist and are strings.
+    Streaming variant of call_openrouter: yields content deltas as the model
+    generates them (OpenAI-style server-sent events with "stream": true).
+    The call is logged once the stream ends, with the text received so far.
     """
-    def to_int_safe(v, default=5):
-        try:
-            # handle "7", "7.0", 7.0, 7
-            if isinstance(v, (int, float)):
-                return int(round(v))
-            if isinstance(v, str):
-                v2 = v.strip()
-                if not v2:
-                    return default
-                return int(round(float(v2)))
-        except Exception:
-            return default
-        return default
-
-    def pick_note(blob, *keys):
-        # Look in nested blob for possible note keys; return first non-empty string
-        for k in keys:
-            if not blob:
-                continue
-            val = blob.get(k) if isinstance(blob, dict) else None
-            if isinstance(val, str) and val.strip():
-                return val.strip()
-        return ""
+    if not OPENROUTER_API_KEY:
+        raise RuntimeError("OPENROUTER_API_KEY is not set in environment")
 
-    # default safe flat structure
-    fallback = {
-        "logic_coached":5, "relevance_coached":5, "clarity_coached":5, "persuasiveness_coached":5, "evidence_use_coached":5,
-        "total_coached":5.0, "notes_coached":"Fallback: Error parsing judge response.",
-        "logic_opponent":5, "relevance_opponent":5, "clarity_opponent":5, "persuasiveness_opponent":5, "evidence_use_opponent":5,
-        "total_opponent":5.0, "notes_opponent":"Fallback: Error parsing judge response."
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "stream": True
+    }
+    if response_format:
+        payload["response_format"] = response_format
+    if LLM_USAGE_ACCOUNTING:
+        payload["usage"] = {"include": True}
+    headers = {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
     }
 
+    started = time.perf_counter()
+    parts = []
+    usage = None
+    status = "cancelled"  # generator closed before the stream finished
     try:
-        # 1) Try direct JSON parse
-        try:
-            nested = json.loads(raw)
-        except Exception:
-            # 2) fallback: extract first {...} block from text
-            start = raw.find("{")
-            end = raw.rfind("}")
-            if start == -1 or end == -1 or end <= start:
-                raise ValueError("No JSON object found in judge output")
-            blob = raw[start:end+1]
-            nested = json.loads(blob)
+        client = get_http_client()
+        with client.stream("POST", OPENROUTER_API_URL, json=payload, headers=headers) as resp:
+            if resp.status_code >= 400:
+                resp.read()
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                # SSE: skip keep-alive comments (": OPENROUTER PROCESSING") and blank lines
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                    # the final chunk may carry token usage (and no choices)
+                    usage = event.get("usage") or usage
+                    delta = event["choices"][0].get("delta", {}).get("content")
+                except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                    continue
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        status = "ok"
+    except httpx.HTTPStatusError as e:
+        text = _http_error_text(e)
+        status = "http_error"
+        log_llm_call(role, model, status, started, body=text, error=f"HTTP {e.response.status_code}", stream=True)
+        raise RuntimeError(f"LLM API HTTP error: {e.response.status_code} — {text}")
+    except Exception as e:
+        status = "error"
+        log_llm_call(role, model, status, started, body="".join(parts), error=str(e), stream=True)
+        raise RuntimeError(f"LLM stream failed: {str(e)}")
+    finally:
+        if status in ("ok", "cancelled"):
+            log_llm_call(role, model, status, started, usage=usage, body="".join(parts), stream=True)
+        if parts:
+            record_usage(role, model, usage if status == "ok" else None, messages, "".join(parts))
+
 
-        flat = {}
+def _to_int_safe(v, default=5):
+    try:
+        # handle "7", "7.0", 7.0, 7
+        if isinstance(v, (int, float)):
+            return int(round(v))
+        if isinstance(v, str):
+            v2 = v.strip()
+            if not v2:
+                return default
+            return int(round(float(v2)))
+    except Exception:
+        return default
+    return default
 
-        # If nested contains 'coached' and 'opponent' nested dicts
-        if isinstance(nested, dict) and "coached" in nested and "opponent" in nested:
-            coached_blob = nested.get("coached", {}) or {}
-            opponent_blob = nested.get("opponent", {}) or {}
+def _pick_note(blob, *keys):
+    # Look in nested blob for possible note keys; return first non-empty string
+    for k in keys:
+        if not blob:
+            continue
+        val = blob.get(k) if isinstance(blob, dict) else None
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    return ""
 
-            coach_keys = ["logic", "relevance", "clarity", "persuasiveness", "evidence_use"]
-            opp_keys = coach_keys
+SCORE_KEYS = ["logic", "relevance", "clarity", "persuasiveness", "evidence_use"]
 
+def _flatten_verdict(nested) -> Optional[Dict[str, Any]]:
+    """
+    Converts one decoded judge verdict (nested or flat style) into the flat
+    dict stored in judge.csv. Returns None if the shape is not recognised.
+    """
+    flat = {}
+
+    # If nested contains 'coached' and 'opponent' nested dicts
+    if isinstance(nested, dict) and "coached" in nested and "opponent" in nested:
+        coached_blob = nested.get("coached", {}) or {}
+        opponent_blob = nested.get("opponent", {}) or {}
+
+        coach_vals = []
+        for k in SCORE_KEYS:
+            score = coached_blob.get(k, coached_blob.get(f"{k}_score", 5))
+            s = _to_int_safe(score, default=5)
+            flat[f"{k}_coached"] = s
+            coach_vals.append(s)
+
+        opp_vals = []
+        for k in SCORE_KEYS:
+            score = opponent_blob.get(k, opponent_blob.get(f"{k}_score", 5))
+            s = _to_int_safe(score, default=5)
+            flat[f"{k}_opponent"] = s
+            opp_vals.append(s)
+
+        # notes: look in many possible key names
+        notes_c = _pick_note(coached_blob, "notes", "note", "feedback", "comment")
+        notes_o = _pick_note(opponent_blob, "notes", "note", "feedback", "comment")
+
+        flat["notes_coached"] = notes_c or "No notes provided."
+        flat["notes_opponent"] = notes_o or "No notes provided."
+
+        flat["total_coached"] = sum(coach_vals)/len(coach_vals) if coach_vals else 5.0
+        flat["total_opponent"] = sum(opp_vals)/len(opp_vals) if opp_vals else 5.0
+
+        return flat
+
+    # If nested is a flat mapping with keys like 'logic_coached', 'notes_coached'
+    if isinstance(nested, dict):
+        # attempt to detect flat style
+        keys_lower = {k.lower(): k for k in nested.keys()}
+        # scoring keys we expect
+        core_keys = [f"{k}_coached" for k in SCORE_KEYS] + [f"{k}_opponent" for k in SCORE_KEYS]
+        found_core = any(k in keys_lower for k in core_keys)
+        if found_core:
+            # pull each expected key with sensible defaults
             coach_vals = []
-            for k in coach_keys:
-                score = coached_blob.get(k, coached_blob.get(f"{k}_score", 5))
-                s = to_int_safe(score, default=5)
-                flat[f"{k}_coached"] = s
-                coach_vals.append(s)
+            for k in [f"{k}_coached" for k in SCORE_KEYS]:
+                rawv = nested.get(k, nested.get(k.lower(), 5))
+                v = _to_int_safe(rawv, default=5)
+                flat[k] = v
+                coach_vals.append(v)
 
             opp_vals = []
-            for k in opp_keys:
-                score = opponent_blob.get(k, opponent_blob.get(f"{k}_score", 5))
-                s = to_int_safe(score, default=5)
-                flat[f"{k}_opponent"] = s
-                opp_vals.append(s)
-
-            # notes: look in many possible key names
-            notes_c = pick_note(coached_blob, "notes", "note", "feedback", "comment")
-            notes_o = pick_note(opponent_blob, "notes", "note", "feedback", "comment")
+            for k in [f"{k}_opponent" for k in SCORE_KEYS]:
+                rawv = nested.get(k, nested.get(k.lower(), 5))
+                v = _to_int_safe(rawv, default=5)
+                flat[k] = v
+                opp_vals.append(v)
+
+            # notes may appear as notes_coached / notes_opponent or other variants
+            notes_c = nested.get("notes_coached") or nested.get("coach_notes") or nested.get("coached_notes") or nested.get("notes") or ""
+            notes_o = nested.get("notes_opponent") or nested.get("opponent_notes") or ""
+            notes_c = notes_c if isinstance(notes_c, str) and notes_c.strip() else ""
+            notes_o = notes_o if isinstance(notes_o, str) and notes_o.strip() else ""
 
             flat["notes_coached"] = notes_c or "No notes provided."
             flat["notes_opponent"] = notes_o or "No notes provided."
@@ -243,43 +368,127 @@ def parse_judge_json(raw: str) -> Dict[str, Any]:
 
             return flat
 
-        # If nested is a flat mapping with keys like 'logic_coached', 'notes_coached'
-        if isinstance(nested, dict):
-            # attempt to detect flat style
-            keys_lower = {k.lower(): k for k in nested.keys()}
-            # scoring keys we expect
-            core_keys = ["logic_coached","relevance_coached","clarity_coached","persuasiveness_coached","evidence_use_coached",
-                         "logic_opponent","relevance_opponent","clarity_opponent","persuasiveness_opponent","evidence_use_opponent"]
-            found_core = any(k in keys_lower for k in core_keys)
-            if found_core:
-                # pull each expected key with sensible defaults
-                coach_vals = []
-                for k in ["logic_coached","relevance_coached","clarity_coached","persuasiveness_coached","evidence_use_coached"]:
-                    rawv = nested.get(k, nested.get(k.lower(), 5))
-                    v = to_int_safe(rawv, default=5)
-                    flat[k] = v
-                    coach_vals.append(v)
-
-                opp_vals = []
-                for k in ["logic_opponent","relevance_opponent","clarity_opponent","persuasiveness_opponent","evidence_use_opponent"]:
-                    rawv = nested.get(k, nested.get(k.lower(), 5))
-                    v = to_int_safe(rawv, default=5)
-                    flat[k] = v
-                    opp_vals.append(v)
-
-                # notes may appear as notes_coached / notes_opponent or other variants
-                notes_c = nested.get("notes_coached") or nested.get("coach_notes") or nested.get("coached_notes") or nested.get("notes") or ""
-                notes_o = nested.get("notes_opponent") or nested.get("opponent_notes") or ""
-                notes_c = notes_c if isinstance(notes_c, str) and notes_c.strip() else ""
-                notes_o = notes_o if isinstance(notes_o, str) and notes_o.strip() else ""
-
-                flat["notes_coached"] = notes_c or "No notes provided."
-                flat["notes_opponent"] = notes_o or "No notes provided."
-
-                flat["total_coached"] = sum(coach_vals)/len(coach_vals) if coach_vals else 5.0
-                flat["total_opponent"] = sum(opp_vals)/len(opp_vals) if opp_vals else 5.0
-
-                return flat
+    return None
+
+def _load_json_blob(raw: str, opener: str, closer: str):
+    """Tries json.loads on the raw text, then on the outermost opener...closer slice."""
+    try:
+        return json.loads(raw)
+    except Exception:
+        start = raw.find(opener)
+        end = raw.rfind(closer)
+        if start == -1 or end == -1 or end <= start:
+            raise ValueError("No JSON found in judge output")
+        return json.loads(raw[start:end+1])
+
+class JudgeOutputError(ValueError):
+    """Raised when judge output doesn't match the required verdict schema."""
+
+
+def validate_judge_output(raw: str) -> Dict[str, Any]:
+    """
+    Strict, single-pass parser for the nested judge verdict.
+
+    Decodes the output once (a surrounding markdown code fence is tolerated) and
+    checks it against the schema: "coached" and "opponent" objects, each with
+    integer 1-10 scores for every rubric key and a non-empty "notes" string.
+    Raises JudgeOutputError on the first violation instead of guessing.
+    Returns the same flat dict shape as parse_judge_json.
+    """
+    if not isinstance(raw, str):
+        raise JudgeOutputError("judge output is not a string")
+    text = raw.strip()
+    if text.startswith("```") and text.endswith("```"):
+        text = text[3:-3]
+        if text[:4].lower() == "json":
+            text = text[4:]
+    try:
+        nested = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise JudgeOutputError(f"invalid JSON: {e.msg} at position {e.pos}")
+    return validate_verdict(nested)
+
+def validate_verdict(nested) -> Dict[str, Any]:
+    """Checks one decoded verdict against the schema (see validate_judge_output) and flattens it."""
+    if not isinstance(nested, dict):
+        raise JudgeOutputError("top level must be a JSON object")
+
+    flat = {}
+    for side in ("coached", "opponent"):
+        blob = nested.get(side)
+        if not isinstance(blob, dict):
+            raise JudgeOutputError(f'"{side}" must be an object')
+        total = 0
+        for key in SCORE_KEYS:
+            v = blob.get(key)
+            # NaN/Infinity decode as floats; int() would raise on them
+            if (isinstance(v, bool) or not isinstance(v, (int, float)) or not math.isfinite(v)
+                    or v != int(v) or not 1 <= v <= 10):
+                raise JudgeOutputError(f'"{side}.{key}" must be an integer from 1 to 10, got {v!r}')
+            flat[f"{key}_{side}"] = int(v)
+            total += int(v)
+        notes = blob.get("notes")
+        if not isinstance(notes, str) or not notes.strip():
+            raise JudgeOutputError(f'"{side}.notes" must be a non-empty string')
+        flat[f"notes_{side}"] = notes.strip()
+        flat[f"total_{side}"] = total / len(SCORE_KEYS)
+    return flat
+
+def validate_judge_batch(raw: str, expected: int) -> Optional[List[Optional[Dict[str, Any]]]]:
+    """
+    Strict parser for a JSON array of verdicts (one per pair). Returns None
+    unless the array holds exactly `expected` items; otherwise a list with each
+    item validated by validate_verdict(), or None where an item fails, so the
+    caller re-judges only those pairs instead of storing guessed scores.
+    """
+    try:
+        data = _load_json_blob(raw, "[", "]")
+    except Exception as e:
+        print(f"validate_judge_batch: could not decode batch verdicts: {e}")
+        return None
+
+    # tolerate {"verdicts": [...]} / {"results": [...]} wrappers
+    if isinstance(data, dict):
+        data = data.get("verdicts", data.get("results"))
+    if not isinstance(data, list) or len(data) != expected:
+        print(f"validate_judge_batch: expected {expected} verdicts, got {len(data) if isinstance(data, list) else 'none'}")
+        return None
+
+    # honour explicit pair numbers if the judge reordered them
+    if all(isinstance(v, dict) and isinstance(v.get("pair"), int) for v in data):
+        data = sorted(data, key=lambda v: v["pair"])
+
+    verdicts = []
+    for i, item in enumerate(data):
+        try:
+            verdicts.append(validate_verdict(item))
+        except JudgeOutputError as e:
+            print(f"validate_judge_batch: verdict {i + 1} is invalid: {e}")
+            verdicts.append(None)
+    return verdicts
+
+def parse_judge_json(raw: str):
+    """
+    Robustly extract JSON object from the judge's text output and return a flat dict.
+    Accepts:
+      - fully nested JSON: {"coached": {...}, "opponent": {...}}
+      - flat JSON: {"logic_coached": 7, "notes_coached": "...", ...}
+    Normalizes numeric scores to ints, ensures notes fields exist and are strings.
+    """
+
+    # default safe flat structure
+    fallback = {
+        "logic_coached":5, "relevance_coached":5, "clarity_coached":5, "persuasiveness_coached":5, "evidence_use_coached":5,
+        "total_coached":5.0, "notes_coached":"Fallback: Error parsing judge response.",
+        "logic_opponent":5, "relevance_opponent":5, "clarity_opponent":5, "persuasiveness_opponent":5, "evidence_use_opponent":5,
+        "total_opponent":5.0, "notes_opponent":"Fallback: Error parsing judge response."
+    }
+
+    try:
+        nested = _load_json_blob(raw, "{", "}")
+        flat = _flatten_verdict(nested)
+        if flat is not None:
+            return flat
 
         # If nothing matched, return fallback (ensures notes exist)
         print("parse_judge_json: Unexpected JSON structure, returning fallback.")
@@ -290,16 +499,6 @@ def parse_judge_json(raw: str) -> Dict[str, Any]:
         print(f"Error parsing judge JSON, using fallback. Error: {e}")
         return fallback
 
-    except Exception as e:
-        # fallback: neutral scores (this part is unchanged)
-        print(f"Error parsing judge JSON, using fallback. Error: {e}")
-        return {
-            "logic_coached":5, "relevance_coached":5, "clarity_coached":5, "persuasiveness_coached":5, "evidence_use_coached": 5,
-            "total_coached":5.0, "notes_coached":"Fallback: Error parsing judge response.",
-            "logic_opponent":5, "relevance_opponent":5, "clarity_opponent":5, "persuasiveness_opponent":5, "evidence_use_opponent": 5,
-            "total_opponent":5.0, "notes_opponent":"Fallback: Error parsing judge response."
-        }
-
 def load_pdf_context(file_path="data/extracted_text.txt"):
     """Load extracted PDF text as context for debates."""
     if not os.path.exists(file_path):
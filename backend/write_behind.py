@@ -0,0 +1,180 @@
+# backend/write_behind.py
+"""
+Write-behind appender for the debate CSVs.
+
+append_round()/append_judge() used to read the CSV header, build a one-row
+DataFrame and append it to disk on the caller's thread. CsvAppendWriter
+takes plain row dicts on a bounded queue instead; a background thread drains
+it in group commits (everything queued within WRITE_BEHIND_LINGER_MS, up to
+WRITE_BEHIND_BATCH rows), writing each file's rows with a single open/append
+using the csv module. A full queue blocks the caller (backpressure) rather
+than growing without limit.
+
+Durability is set by WRITE_BEHIND_FSYNC:
+    off       leave flushing to the OS
+    batch     fsync every file touched by a group commit (default)
+    interval  fsync a file at most every WRITE_BEHIND_FSYNC_INTERVAL seconds
+
+Readers call flush(path) before reading a file, which waits only if rows for
+that file are still queued, so a session always reads its own writes. Pending
+rows are flushed at interpreter exit.
+"""
+import atexit
+import csv
+import math
+import os
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List
+
+from .config import (
+    WRITE_BEHIND, WRITE_BEHIND_QUEUE_SIZE, WRITE_BEHIND_BATCH, WRITE_BEHIND_LINGER_MS,
+    WRITE_BEHIND_FSYNC, WRITE_BEHIND_FSYNC_INTERVAL,
+)
+
+_STOP = object()
+
+
+def _cell(value):
+    """CSV cell as pandas.to_csv would write it (None/NaN as empty)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return value
+
+
+class CsvAppendWriter:
+    def __init__(self, enabled: bool = WRITE_BEHIND, queue_size: int = WRITE_BEHIND_QUEUE_SIZE,
+                 batch: int = WRITE_BEHIND_BATCH, linger_ms: float = WRITE_BEHIND_LINGER_MS,
+                 fsync: str = WRITE_BEHIND_FSYNC, fsync_interval: float = WRITE_BEHIND_FSYNC_INTERVAL):
+        self.enabled = enabled
+        self.batch = max(batch, 1)
+        self.linger = linger_ms / 1000.0
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._pending = Counter()      # path -> rows queued but not yet on disk
+        self._cond = threading.Condition()
+        self._headers: Dict[str, List[str]] = {}
+        self._last_fsync: Dict[str, float] = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.stats = Counter()         # rows, commits, fsyncs, errors
+
+    def append(self, path: str, row: dict, default_columns: List[str]):
+        """Queues one row for path (created with default_columns if missing); written in the header's column order."""
+        if not self.enabled:
+            self._commit([(path, row, default_columns)])
+            return
+        self._ensure_thread()
+        with self._cond:
+            self._pending[path] += 1
+        self._queue.put((path, row, default_columns))
+
+    def flush(self, path: str = None, timeout: float = None) -> bool:
+        """Waits until the rows queued for path (or for every file) are on disk. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: (self._pending[path] == 0) if path else not +self._pending, timeout=timeout
+            )
+
+    def reset(self):
+        """Forgets cached headers (after the data directory was wiped)."""
+        self.flush()
+        with self._cond:
+            self._headers.clear()
+            self._last_fsync.clear()
+
+    def close(self, timeout: float = 10.0):
+        """Writes everything still queued and stops the writer thread."""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="csv-write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            # group commit: take whatever else arrives within the linger window
+            deadline = time.monotonic() + self.linger
+            stop = False
+            while len(batch) < self.batch:
+                try:
+                    nxt = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _header(self, path: str, default_columns: List[str]) -> List[str]:
+        header = self._headers.get(path)
+        if header is not None and os.path.exists(path):
+            return header
+        if os.path.exists(path):
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+        if not header:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f, lineterminator="\n").writerow(default_columns)
+            header = list(default_columns)
+        self._headers[path] = header
+        return header
+
+    def _commit(self, batch: list):
+        by_path = OrderedDict()
+        for path, row, default_columns in batch:
+            by_path.setdefault(path, (default_columns, []))[1].append(row)
+
+        for path, (default_columns, rows) in by_path.items():
+            try:
+                header = self._header(path, default_columns)
+                with open(path, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f, lineterminator="\n")
+                    writer.writerows([_cell(row.get(col)) for col in header] for row in rows)
+                    if self._should_fsync(path):
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self.stats["fsyncs"] += 1
+                self.stats["rows"] += len(rows)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Error writing {len(rows)} rows to {path}: {e}")
+            finally:
+                with self._cond:
+                    if self.enabled:
+                        self._pending[path] -= len(rows)
+                        if self._pending[path] <= 0:
+                            del self._pending[path]
+                    self._cond.notify_all()
+        self.stats["commits"] += 1
+
+    def _should_fsync(self, path: str) -> bool:
+        if self.fsync == "batch":
+            return True
+        if self.fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync.get(path, 0.0) >= self.fsync_interval:
+                self._last_fsync[path] = now
+                return True
+        return False
+
+
+writer = CsvAppendWriter()
+atexit.register(writer.close)
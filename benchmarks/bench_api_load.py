@@ -0,0 +1,292 @@
+# benchmarks/bench_api_load.py
+"""
+Load generator for the FastAPI service (api/main_api.py).
+
+Drives /generate-coached, /generate-opponent and /judge with asyncio + httpx
+and reports throughput, latency percentiles and error rates per endpoint.
+
+    closed loop  --concurrency N clients, each sending its next request as soon
+                 as the previous one returns (finds the saturation throughput)
+    open loop    --rate R requests/second with Poisson arrivals, whatever the
+                 server does; latency is measured from each request's scheduled
+                 start, so queueing behind a saturated server is not hidden
+
+By default the harness starts everything itself: a mock upstream
+(benchmarks/mock_upstream.py) with the given latency, then the API under
+uvicorn once per combination of --workers and --handlers ("sync" handlers run
+in each worker's threadpool, 40 threads by default, so one worker tops out
+around 40 / upstream latency requests per second; "async" handlers await the
+upstream on the event loop). A comparison table closes the run. Use --target
+to load an API that is already running instead.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_api_load --workers 1,2 --handlers sync,async --concurrency 100 --duration 20
+    python -m benchmarks.bench_api_load --mode open --rate 150 --upstream-latency-ms 1000
+    python -m benchmarks.bench_api_load --target http://127.0.0.1:8000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(REPO_DIR, "api")
+
+TOPIC = "Remote work should be the default for office jobs"
+ARGUMENT = "Remote work widens the hiring pool and removes commuting time, which raises output."
+REBUTTAL = "Remote work erodes mentoring and informal collaboration, which costs more than the commute."
+
+ENDPOINTS = {
+    "coached": ("/generate-coached", {"topic": TOPIC, "instruction": "Be concise and focus on evidence.", "previous": []}),
+    "opponent": ("/generate-opponent", {"topic": TOPIC, "last_argument": ARGUMENT}),
+    "judge": ("/judge", {"topic": TOPIC, "coached": ARGUMENT, "opponent": REBUTTAL}),
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    idx = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[idx]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"coached:1,opponent:1,judge:2" -> weights per endpoint."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition(":")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# --- load generation ---
+
+class Recorder:
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.samples = defaultdict(list)   # endpoint -> [(latency_sec, ok, error)]
+
+    def add(self, endpoint: str, started: float, latency: float, ok: bool, error: Optional[str]):
+        if started >= self.measure_from:
+            self.samples[endpoint].append((latency, ok, error))
+
+
+async def send_one(client: httpx.AsyncClient, base_url: str, endpoint: str, recorder: Recorder, started: float):
+    path, body = ENDPOINTS[endpoint]
+    error = None
+    try:
+        resp = await client.post(base_url + path, json=body)
+        ok = resp.status_code == 200
+        if not ok:
+            error = f"HTTP {resp.status_code}"
+    except httpx.HTTPError as e:
+        ok, error = False, type(e).__name__
+    recorder.add(endpoint, started, time.perf_counter() - started, ok, error)
+
+
+async def closed_loop(client, base_url: str, mix: Dict[str, float], concurrency: int, duration: float,
+                      warmup: float, rng: random.Random) -> Recorder:
+    start = time.perf_counter()
+    recorder = Recorder(start + warmup)
+    end = start + warmup + duration
+    names, weights = list(mix), list(mix.values())
+
+    async def client_loop():
+        while time.perf_counter() < end:
+            await send_one(client, base_url, rng.choices(names, weights)[0], recorder, time.perf_counter())
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return recorder
+
+
+async def open_loop(client, base_url: str, mix: Dict[str, float], rate: float, duration: float,
+                    warmup: float, rng: random.Random) -> Recorder:
+    start = time.perf_counter()
+    recorder = Recorder(start + warmup)
+    end = start + warmup + duration
+    names, weights = list(mix), list(mix.values())
+    tasks = []
+    scheduled = start
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled >= end:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send_one(client, base_url, rng.choices(names, weights)[0], recorder, scheduled)))
+    await asyncio.gather(*tasks)
+    return recorder
+
+
+async def run_load(base_url: str, args, mix: Dict[str, float]) -> Dict[str, dict]:
+    max_conn = args.concurrency if args.mode == "closed" else None
+    limits = httpx.Limits(max_connections=max_conn, max_keepalive_connections=max_conn)
+    rng = random.Random(args.seed)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        if args.mode == "closed":
+            recorder = await closed_loop(client, base_url, mix, args.concurrency, args.duration, args.warmup, rng)
+        else:
+            recorder = await open_loop(client, base_url, mix, args.rate, args.duration, args.warmup, rng)
+    return summarize(recorder, args.duration)
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, dict]:
+    report = {}
+    everything = []
+    for endpoint, samples in sorted(recorder.samples.items()):
+        report[endpoint] = _stats(samples, duration)
+        everything += samples
+    report["all"] = _stats(everything, duration)
+    return report
+
+
+def _stats(samples: list, duration: float) -> dict:
+    latencies = sorted(s[0] for s in samples if s[1])
+    errors = defaultdict(int)
+    for _, ok, error in samples:
+        if not ok:
+            errors[error] += 1
+    n = len(samples)
+    return {
+        "requests": n,
+        "ok": len(latencies),
+        "error_rate": (n - len(latencies)) / n if n else 0.0,
+        "errors": dict(errors),
+        "throughput": len(latencies) / duration,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else float("nan"),
+    }
+
+
+# --- processes under test ---
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 30.0) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            resp = httpx.get(url, timeout=1.0)
+            if resp.status_code == 200:
+                return resp.json()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_mock_upstream(args) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_upstream", "--port", str(port),
+         "--latency-ms", str(args.upstream_latency_ms), "--jitter-ms", str(args.upstream_jitter_ms),
+         "--error-rate", str(args.upstream_error_rate)],
+        cwd=REPO_DIR,
+    )
+    wait_ready(f"http://127.0.0.1:{port}/")
+    return proc, f"http://127.0.0.1:{port}/v1/chat/completions"
+
+
+def start_api(upstream_url: str, workers: int, handlers: str) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(os.environ, OPENROUTER_API_URL=upstream_url, API_HANDLERS=handlers,
+               OPENROUTER_API_KEY=os.environ.get("OPENROUTER_API_KEY") or "load-test")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main_api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log", "--backlog", "4096"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    info = wait_ready(base_url + "/")
+    if info.get("handlers", "sync") != handlers:
+        proc.terminate()
+        raise RuntimeError(f"API reports {info.get('handlers')!r} handlers, expected {handlers!r}")
+    return proc, base_url
+
+
+def stop(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# --- reporting ---
+
+def print_report(title: str, report: Dict[str, dict]):
+    print(f"\n{title}")
+    print(f"{'endpoint':<10}{'requests':>9}{'ok/s':>8}{'errors':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint, r in report.items():
+        print(f"{endpoint:<10}{r['requests']:>9}{r['throughput']:>8.1f}{r['error_rate'] * 100:>7.1f}%"
+              f"{r['p50'] * 1000:>9.0f}{r['p90'] * 1000:>9.0f}{r['p99'] * 1000:>9.0f}{r['max'] * 1000:>9.0f}")
+    if report["all"]["errors"]:
+        print("errors: " + ", ".join(f"{k} x{v}" for k, v in report["all"]["errors"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the DebateMind API.")
+    parser.add_argument("--target", help="base URL of a running API (skips starting the mock upstream and uvicorn)")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=64, help="closed loop: concurrent clients")
+    parser.add_argument("--rate", type=float, default=50.0, help="open loop: mean arrivals per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds (after --warmup)")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("coached:1,opponent:1,judge:1"))
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--workers", default="1", help="comma-separated uvicorn worker counts to compare")
+    parser.add_argument("--handlers", default="sync,async", help="comma-separated handler modes to compare")
+    parser.add_argument("--upstream-latency-ms", type=float, default=800.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    load = f"{args.concurrency} clients" if args.mode == "closed" else f"{args.rate:g} req/s offered"
+    if args.target:
+        report = asyncio.run(run_load(args.target.rstrip("/"), args, args.mix))
+        print_report(f"{args.target} — {args.mode} loop, {load}, {args.duration:g}s", report)
+        return
+
+    upstream, upstream_url = start_mock_upstream(args)
+    print(f"mock upstream: {args.upstream_latency_ms:g} ± {args.upstream_jitter_ms:g} ms, "
+          f"{args.upstream_error_rate * 100:g}% errors")
+    results = []
+    try:
+        for handlers in [h.strip() for h in args.handlers.split(",") if h.strip()]:
+            for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+                api, base_url = start_api(upstream_url, workers, handlers)
+                try:
+                    report = asyncio.run(run_load(base_url, args, args.mix))
+                finally:
+                    stop(api)
+                name = f"{handlers} handlers, {workers} worker{'s' if workers > 1 else ''}"
+                print_report(f"{name} — {args.mode} loop, {load}, {args.duration:g}s", report)
+                results.append((name, report["all"]))
+    finally:
+        stop(upstream)
+
+    print(f"\n{'configuration':<28}{'ok/s':>8}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, r in results:
+        print(f"{name:<28}{r['throughput']:>8.1f}{r['error_rate'] * 100:>7.1f}%{r['p50'] * 1000:>9.0f}{r['p99'] * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_chat_render.py
+"""
+Cost of the Arena typing animation for one long argument.
+
+Compares the old per-word renderer (the whole bubble rebuilt and sent for every
+word) with backend/chat_render.stream_frames (frame-capped, coalesced) and
+reports frames sent, bytes sent over the websocket and CPU time spent building
+them. Sleeping is simulated, so the run takes no wall-clock time; the reported
+animation length is what a user would see.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_chat_render --words 1000 --fps 20
+"""
+import argparse
+import random
+import time
+
+from backend.chat_render import stream_frames
+
+VOCAB = (
+    "remote work improves focus but weakens collaboration because teams lose informal contact "
+    "while commuting time drops and productivity data from several studies remains mixed <em> & "
+).split()
+
+
+def make_argument(n_words: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    words = [rng.choice(VOCAB) for _ in range(n_words)]
+    # a paragraph break every ~80 words, like real arguments
+    return " ".join(w + ("\n\n" if i % 80 == 79 else "") for i, w in enumerate(words))
+
+
+def legacy_frames(full_text: str, speaker: str, round_num: int):
+    """The previous app.py stream_html_generator, without its per-word sleep."""
+    streamed_text = ""
+    words = full_text.replace("<", "&lt;").replace(">", "&gt;").split(' ')
+    meta_html = f"<div class='msg-meta'>Coach • Round {round_num}</div>"
+    for word in words:
+        streamed_text += word + " "
+        body = streamed_text.replace("\n", "<br>")
+        yield f"""
+            <div class='message-row message-row-left'>
+                <div class='avatar avatar-coach'>C</div>
+                <div class='message-content'>
+                    {meta_html}
+                    <div class='bubble-left'>
+                        <div>{body}</div>
+                    </div>
+                </div>
+            </div>
+            """
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+def measure(frames) -> dict:
+    started = time.process_time()
+    n_frames = n_bytes = 0
+    for html in frames:
+        n_frames += 1
+        n_bytes += len(html.encode("utf-8"))
+    return {"frames": n_frames, "bytes": n_bytes, "cpu_ms": (time.process_time() - started) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Arena chat streaming renderers.")
+    parser.add_argument("--words", type=int, default=1000)
+    parser.add_argument("--fps", type=float, default=20)
+    parser.add_argument("--words-per-sec", type=float, default=33)
+    parser.add_argument("--max-seconds", type=float, default=8)
+    args = parser.parse_args()
+
+    text = make_argument(args.words)
+
+    legacy = measure(legacy_frames(text, "coach", 1))
+    legacy["seconds"] = args.words * 0.03  # old fixed 30 ms per word
+
+    clock = SimulatedClock()
+    capped = measure(stream_frames(text, "coach", 1, words_per_sec=args.words_per_sec, fps=args.fps,
+                                   max_seconds=args.max_seconds, clock=clock, sleep=clock.sleep))
+    capped["seconds"] = clock.now
+
+    uncapped_clock = SimulatedClock()
+    no_limit = measure(stream_frames(text, "coach", 1, words_per_sec=args.words_per_sec, fps=args.fps,
+                                     max_seconds=0, clock=uncapped_clock, sleep=uncapped_clock.sleep))
+    no_limit["seconds"] = uncapped_clock.now
+
+    print(f"{args.words}-word argument\n")
+    print(f"{'renderer':<34}{'frames':>8}{'bytes sent':>14}{'CPU ms':>9}{'animation s':>13}")
+    for name, r in (("per-word (old)", legacy),
+                    (f"{args.fps:g} fps, no duration cap", no_limit),
+                    (f"{args.fps:g} fps, max {args.max_seconds:g}s", capped)):
+        print(f"{name:<34}{r['frames']:>8}{r['bytes']:>14,}{r['cpu_ms']:>9.1f}{r['seconds']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_judge_parser.py
+"""
+Throughput benchmark for judge output parsing.
+
+Runs the lenient parse_judge_json and the strict validate_judge_output over the
+corpus in judge_outputs.jsonl and reports parses/sec and how each parser
+classified every sample. Each sample's "origin" says where it came from:
+"recorded" is a raw judge completion as returned, "reconstructed" re-serializes
+the scores stored in a judge.csv in the shapes the judge returns (its raw text
+was not kept), "synthetic" are hand-written failure shapes.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_judge_parser --repeat 2000
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+
+from backend.utils import parse_judge_json, validate_judge_output, JudgeOutputError
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "judge_outputs.jsonl")
+
+
+def load_corpus(path: str = CORPUS_PATH) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def strict_ok(raw: str) -> bool:
+    try:
+        validate_judge_output(raw)
+        return True
+    except JudgeOutputError:
+        return False
+
+
+def lenient_ok(raw: str) -> bool:
+    # parse_judge_json never raises; a fallback verdict means it failed
+    return not parse_judge_json(raw)["notes_coached"].startswith("Fallback:")
+
+
+def bench(fn, samples: list, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for raw in samples:
+            fn(raw)
+    elapsed = time.perf_counter() - started
+    return repeat * len(samples) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark judge output parsers.")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    samples = [c["raw"] for c in corpus]
+
+    print(f"{'origin':<15}{'sample':<72}{'expected':>9}{'strict':>8}{'lenient':>9}")
+    for c in corpus:
+        print(f"{c['origin']:<15}{c['source'][:70]:<72}{str(c['valid']):>9}"
+              f"{str(strict_ok(c['raw'])):>8}{str(lenient_ok(c['raw'])):>9}")
+    origins = Counter(c["origin"] for c in corpus)
+    print("\ncorpus: " + ", ".join(f"{n} {origin}" for origin, n in sorted(origins.items())))
+
+    # Silence the lenient parser's prints on failure samples while timing
+    import builtins
+    real_print = builtins.print
+    builtins.print = lambda *a, **k: None
+    try:
+        strict_rate = bench(strict_ok, samples, args.repeat)
+        lenient_rate = bench(parse_judge_json, samples, args.repeat)
+    finally:
+        builtins.print = real_print
+
+    print(f"\nvalidate_judge_output: {strict_rate:,.0f} outputs/sec")
+    print(f"parse_judge_json:      {lenient_rate:,.0f} outputs/sec")
+
+
+if __name__ == "__main__":
+    main()
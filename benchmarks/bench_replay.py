@@ -0,0 +1,95 @@
+# benchmarks/bench_replay.py
+"""
+Full debate runs against recorded LLM responses (backend/llm_cassette.py).
+
+Record once against the real API, then replay the same run offline as often as
+needed: auto-play (run_remaining_rounds) drives the storage, RL and judge
+paths with real model outputs while the network is replaced by the cassette.
+--latency-scale 1 reproduces the recorded latencies, 0 removes them so only
+local work is timed (profiling and regression runs). The RL agent is seeded,
+so a replay picks the same templates and sends the same prompts as the
+recording. Each run uses a scratch data directory; data/ is left untouched.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_replay --record --rounds 5      # needs OPENROUTER_API_KEY and network
+    python -m benchmarks.bench_replay --rounds 5 --latency-scale 0 --repeat 3
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from backend.config import LLM_CASSETTE_PATH
+from backend.llm_cassette import CassetteTransport
+from backend.llm_log import llm_log
+from backend.memory_manager import create_new_debate, read_debate
+from backend.rl_agent import RLAgent
+from backend.round_runner import run_remaining_rounds
+from backend.utils import use_http_transport
+from backend.write_behind import writer
+
+
+def run_debate(topic: str, rounds: int, seed: int) -> dict:
+    """One auto-played debate in a fresh data directory under the current one."""
+    os.makedirs("data", exist_ok=True)
+    random.seed(seed)
+    rl = RLAgent()
+    debate_id = create_new_debate(topic)
+    summary = run_remaining_rounds(debate_id, topic, 0, rounds, rl)
+    stages = {}
+    for r in summary["rounds"]:
+        for stage, seconds in r["timings"].items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+    return {
+        "rounds": len(summary["rounds"]),
+        "stored": len(read_debate(debate_id)),
+        "wall_sec": summary["wall_sec"],
+        "stages": stages,
+        "templates": [r["template_idx"] for r in summary["rounds"]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay full debate runs through the LLM cassette.")
+    parser.add_argument("--cassette", default=LLM_CASSETTE_PATH)
+    parser.add_argument("--record", action="store_true", help="call the real API and append to the cassette")
+    parser.add_argument("--topic", default="Remote work should be the default for office jobs")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-scale", type=float, default=0.0)
+    parser.add_argument("--miss", choices=["sequence", "error"], default="sequence")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cassette = os.path.abspath(args.cassette)
+    transport = CassetteTransport("record" if args.record else "replay", path=cassette,
+                                  latency_scale=args.latency_scale, miss=args.miss)
+    use_http_transport(transport)
+
+    repo_dir = os.getcwd()
+    for i in range(1 if args.record else args.repeat):
+        if i:
+            transport.rewind()
+        with tempfile.TemporaryDirectory(prefix="debatemind-replay-") as scratch:
+            os.chdir(scratch)
+            try:
+                result = run_debate(args.topic, args.rounds, args.seed)
+            finally:
+                # queued CSV rows and log records use relative paths: write them before leaving
+                writer.flush()
+                llm_log.close()
+                os.chdir(repo_dir)
+        stages = "  ".join(f"{k} {v:.2f}s" for k, v in sorted(result["stages"].items()))
+        print(f"run {i + 1}: {result['rounds']} rounds ({result['stored']} stored) in {result['wall_sec']:.2f}s  "
+              f"templates {result['templates']}\n    {stages}")
+
+    s = transport.stats
+    if args.record:
+        print(f"\nrecorded {s['recorded']} responses to {cassette}")
+    else:
+        print(f"\ncassette: {s['hits']} exact hits, {s['sequence']} served in sequence, {s['misses']} misses "
+              f"(latency scale {args.latency_scale:g})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/mock_upstream.py
+"""
+Stand-in for the OpenRouter chat completions endpoint, for load tests.
+
+Answers every POST after a configurable latency (plus uniform jitter) with an
+OpenAI-shaped completion: a judge verdict in JSON when the system prompt is the
+judge's, a short argument otherwise. --error-rate turns that share of requests
+into 503s. It is a bare ASGI app on a single event loop, so thousands of
+concurrent requests cost it next to nothing and the measured limits are the
+API's, not the mock's.
+
+Usage (from the repo root):
+    python -m benchmarks.mock_upstream --port 9100 --latency-ms 800 --jitter-ms 200
+Then start the API with OPENROUTER_API_URL=http://127.0.0.1:9100/v1/chat/completions.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+
+SETTINGS = {"latency_ms": 800.0, "jitter_ms": 200.0, "error_rate": 0.0}
+
+VERDICT = {
+    "logic_coached": 7, "relevance_coached": 8, "clarity_coached": 7, "persuasiveness_coached": 6,
+    "total_coached": 7.0, "notes_coached": "Clear structure, thin evidence.",
+    "logic_opponent": 6, "relevance_opponent": 7, "clarity_opponent": 7, "persuasiveness_opponent": 6,
+    "total_opponent": 6.5, "notes_opponent": "Direct rebuttal, some repetition.",
+}
+
+ARGUMENT = (
+    "Remote work widens the hiring pool and removes commuting time, which several productivity studies link "
+    "to higher output. The collaboration costs are real but shrink with deliberate rituals and shared tooling. "
+    "On balance the evidence favours flexible remote-first policies."
+)
+
+
+def completion(payload: dict) -> dict:
+    messages = payload.get("messages") or [{}]
+    is_judge = "judge" in str(messages[0].get("content", "")).lower()
+    content = json.dumps(VERDICT) if is_judge else ARGUMENT
+    return {
+        "id": "mock-completion",
+        "model": payload.get("model"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 400, "completion_tokens": 80, "total_tokens": 480},
+    }
+
+
+async def _send(send, status: int, body: dict):
+    data = json.dumps(body).encode("utf-8")
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]})
+    await send({"type": "http.response.body", "body": data})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    if scope["method"] != "POST":
+        await _send(send, 200, {"status": "ok", **SETTINGS})
+        return
+
+    delay = SETTINGS["latency_ms"] + random.uniform(-SETTINGS["jitter_ms"], SETTINGS["jitter_ms"])
+    await asyncio.sleep(max(delay, 0.0) / 1000)
+    if random.random() < SETTINGS["error_rate"]:
+        await _send(send, 503, {"error": {"message": "mock upstream overloaded"}})
+        return
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        await _send(send, 400, {"error": {"message": "invalid JSON"}})
+        return
+    await _send(send, 200, completion(payload))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenRouter upstream for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=SETTINGS["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=SETTINGS["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=SETTINGS["error_rate"])
+    args = parser.parse_args()
+
+    SETTINGS.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", backlog=4096)
+
+
+if __name__ == "__main__":
+    main()
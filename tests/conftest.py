@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+import sys
+
+# backend/config.py refuses to import without a key; tests never call the API
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
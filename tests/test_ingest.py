@@ -0,0 +1,122 @@
+# tests/test_ingest.py
+"""
+Normalization of sample PDFs (backend/ingest.py). The PDFs are built in
+memory: one Helvetica text line per entry, so PyPDF2 extracts them as lines.
+"""
+import io
+
+from backend.ingest import clean_page, ingest_pdf
+
+
+def make_pdf(pages) -> bytes:
+    """A minimal PDF with one page per list of text lines."""
+    n = len(pages)
+    font_id = 3 + 2 * n
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n))
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode()]
+    for i, lines in enumerate(pages):
+        ops = ["BT", "/F1 11 Tf", "14 TL", "72 760 Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                    f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode())
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for k, body in enumerate(objs, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % k + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref))
+    return out.getvalue()
+
+
+TOPICS = ["hiring", "commuting", "meetings", "onboarding", "tooling", "wellbeing"]
+
+
+def report_pages(n=5):
+    """A report with a running header, a running footer and a page number on every page."""
+    pages = []
+    for p in range(1, n + 1):
+        topic = TOPICS[p - 1]
+        body = [
+            f"This section covers {topic} under remote work.",
+            f"Studies on {topic} measured output per em-",
+            "ployee over   two    years.",
+            f"Results for {topic} differ by sector and team size.",
+            f"Managers saw {topic} change within a quarter.",
+            f"The {topic} findings close this section.",
+        ]
+        if p == 3:
+            body[3:3] = ["Revenue by year", "2019", "1200", "2020", "1350"]
+        pages.append(["ACME Corp Annual Report 2023", "Confidential - internal use only", *body,
+                      "acme.example.com", f"Page {p} of {n}"])
+    return pages
+
+
+def ingest(tmp_path, pages):
+    output = tmp_path / "extracted_text.txt"
+    stats = ingest_pdf(io.BytesIO(make_pdf(pages)), str(output))
+    return output.read_text(encoding="utf-8"), stats
+
+
+def test_repeated_headers_footers_and_page_numbers_are_removed(tmp_path):
+    text, stats = ingest(tmp_path, report_pages())
+
+    assert "ACME Corp Annual Report" not in text
+    assert "Confidential" not in text
+    assert "acme.example.com" not in text
+    assert "Page 1 of 5" not in text and "of 5" not in text
+    assert stats["pages"] == 5
+    assert stats["boilerplate_lines"] >= 3
+    assert stats["reduction"] > 0
+    assert stats["clean_chars"] < stats["raw_chars"]
+
+
+def test_body_text_and_numeric_table_are_kept(tmp_path):
+    text, _ = ingest(tmp_path, report_pages())
+
+    for p, topic in enumerate(TOPICS[:5], start=1):
+        assert f"--- Page {p} ---" in text
+        assert f"This section covers {topic} under remote work." in text
+        assert f"The {topic} findings close this section." in text
+    page3 = text.split("--- Page 3 ---")[1].split("--- Page 4 ---")[0]
+    assert "Revenue by year\n2019\n1200\n2020\n1350\n" in page3
+
+
+def test_hyphenated_breaks_are_joined_and_whitespace_collapsed(tmp_path):
+    text, _ = ingest(tmp_path, report_pages())
+
+    assert "output per employee over two years." in text
+    assert "em-" not in text
+    assert "  " not in text
+
+
+def test_lines_repeated_on_too_few_pages_are_kept(tmp_path):
+    # boilerplate needs at least three pages; a two-page memo keeps its header
+    pages = [["Memo to the board", "The budget is final.", "2"],
+             ["Memo to the board", "Hiring resumes in May.", "3"]]
+    text, stats = ingest(tmp_path, pages)
+
+    assert text.count("Memo to the board") == 2
+    assert stats["boilerplate_lines"] == 0
+    # bare numbers at a page edge are still page numbers
+    assert "2" not in text.splitlines() and "3" not in text.splitlines()
+
+
+def test_clean_page_drops_numbers_only_at_edges():
+    page = "12\nIntro line one.\nIntro line two.\nIntro line three.\n2019\n1200\nBody line.\nMore body.\nLast line.\n13"
+    clean, removed = clean_page(page, boilerplate=set(), edge=2)
+
+    assert removed == 2
+    assert clean.splitlines() == ["Intro line one.", "Intro line two.", "Intro line three.", "2019", "1200",
+                                  "Body line.", "More body.", "Last line."]
@@ -0,0 +1,71 @@
+# tests/test_judge_output.py
+"""Strict judge verdict validation (backend/utils.validate_judge_output)."""
+import json
+
+import pytest
+
+from backend.utils import SCORE_KEYS, JudgeOutputError, validate_judge_batch, validate_judge_output
+
+
+def verdict(**overrides) -> str:
+    side = {key: 7 for key in SCORE_KEYS}
+    side["notes"] = "Clear structure."
+    coached = {**side, **overrides}
+    return json.dumps({"coached": coached, "opponent": side})
+
+
+def test_valid_verdict_is_flattened():
+    flat = validate_judge_output(verdict())
+
+    assert flat["total_coached"] == 7
+    assert flat["notes_opponent"] == "Clear structure."
+
+
+@pytest.mark.parametrize("literal", ["NaN", "Infinity", "-Infinity"])
+def test_non_finite_scores_raise_judge_output_error(literal):
+    raw = verdict().replace(f'"{SCORE_KEYS[0]}": 7', f'"{SCORE_KEYS[0]}": {literal}', 1)
+
+    with pytest.raises(JudgeOutputError):
+        validate_judge_output(raw)
+
+
+@pytest.mark.parametrize("score", [0, 11, 7.5, "7", True])
+def test_out_of_range_or_non_integer_scores_are_rejected(score):
+    with pytest.raises(JudgeOutputError):
+        validate_judge_output(verdict(**{SCORE_KEYS[0]: score}))
+
+
+def batch(*items) -> str:
+    return json.dumps([{"pair": i + 1, **json.loads(item)} for i, item in enumerate(items)])
+
+
+def test_batch_marks_only_invalid_verdicts():
+    raw = batch(verdict(), verdict(**{SCORE_KEYS[1]: None}), verdict())
+
+    verdicts = validate_judge_batch(raw, expected=3)
+
+    assert verdicts[0]["total_coached"] == 7 and verdicts[2]["total_coached"] == 7
+    assert verdicts[1] is None
+
+
+def test_batch_with_wrong_count_is_rejected():
+    assert validate_judge_batch(batch(verdict(), verdict()), expected=3) is None
+
+
+def test_evaluate_batch_rejudges_invalid_pairs_alone(monkeypatch):
+    from backend import judge
+
+    batch_raw = batch(verdict(), verdict(**{SCORE_KEYS[0]: "high"}))
+    single_raw = verdict(**{SCORE_KEYS[0]: 3})
+    calls = []
+
+    def fake_call(messages, model, role=None, **kwargs):
+        calls.append(role)
+        return batch_raw if role == "judge_batch" else single_raw
+
+    monkeypatch.setattr(judge, "call_openrouter", fake_call)
+    first, second = judge.evaluate_batch([("a1", "o1"), ("a2", "o2")], "topic", batch_size=2)
+
+    assert calls == ["judge_batch", "judge"]
+    assert first[f"{SCORE_KEYS[0]}_coached"] == 7
+    assert second[f"{SCORE_KEYS[0]}_coached"] == 3
@@ -0,0 +1,85 @@
+# tests/test_memory_manager.py
+"""Debate storage reads (backend/memory_manager.py)."""
+import pytest
+
+from backend import memory_manager
+from backend.memory_manager import create_new_debate, append_round, read_debate, read_last_rounds
+from backend.write_behind import writer
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_manager, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def add_rounds(debate_id: str, n: int):
+    for r in range(n):
+        # quoted line breaks, commas and quotes make raw line ends unreliable row boundaries
+        coached = f"Round {r} opens.\n{r + 1},coached,\"not a row\"\nStill round {r}, with \"quotes\"."
+        append_round(debate_id, {"round": r, "speaker": "coached", "coached_argument": coached,
+                                 "opponent_argument": f"Rebuttal {r}\n\n- point one\n- point two",
+                                 "action": str(r % 4), "reward": r / 10})
+    writer.flush()
+
+
+@pytest.mark.parametrize("block", [16, 200, 64 * 1024])
+@pytest.mark.parametrize("n_rounds", [1, 3, 50])
+def test_last_rounds_match_a_full_read(data_dir, monkeypatch, block, n_rounds):
+    monkeypatch.setattr(memory_manager, "TAIL_READ_BLOCK", block)
+    debate_id = create_new_debate("tail reads")
+    add_rounds(debate_id, 30)
+
+    expected = read_debate(debate_id)
+    expected = expected[expected["round"] > expected["round"].max() - n_rounds].reset_index(drop=True)
+    assert read_last_rounds(debate_id, n_rounds).equals(expected)
+
+
+def test_last_rounds_of_an_empty_debate(data_dir):
+    debate_id = create_new_debate("no rounds yet")
+
+    assert read_last_rounds(debate_id, 5).empty
+
+
+def test_import_merges_rl_memory_into_existing_stats(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    archive = str(tmp_path / "corpus.tar.gz")
+
+    monkeypatch.setattr(memory_manager, "DATA_DIR", str(source))
+    create_new_debate("exported debate")
+    memory_manager.write_rl_memory({"epsilon": 0.3, "template_stats": {
+        "0": {"count": 4, "sum_reward": 2.0}, "1": {"count": 1, "sum_reward": -1.0}}})
+    memory_manager.export_archive(archive)
+
+    monkeypatch.setattr(memory_manager, "DATA_DIR", str(target))
+    memory_manager.write_rl_memory({"epsilon": 0.1, "template_stats": {
+        "0": {"count": 2, "sum_reward": 1.5}, "2": {"count": 3, "sum_reward": 0.5}}})
+    stats = memory_manager.import_archive(archive)
+
+    mem = memory_manager.read_rl_memory()
+    assert stats["files_merged"] == 1 and stats["debates_imported"] == 1
+    assert mem["epsilon"] == 0.1  # local settings are kept
+    assert mem["template_stats"] == {
+        "0": {"count": 6, "sum_reward": 3.5},
+        "1": {"count": 1, "sum_reward": -1.0},
+        "2": {"count": 3, "sum_reward": 0.5},
+    }
+
+
+def test_import_without_local_rl_memory_takes_the_archive_copy(tmp_path, monkeypatch):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    archive = str(tmp_path / "corpus.tar.gz")
+
+    monkeypatch.setattr(memory_manager, "DATA_DIR", str(source))
+    memory_manager.write_rl_memory({"epsilon": 0.3, "template_stats": {"0": {"count": 4, "sum_reward": 2.0}}})
+    memory_manager.export_archive(archive)
+
+    monkeypatch.setattr(memory_manager, "DATA_DIR", str(target))
+    stats = memory_manager.import_archive(archive)
+
+    assert stats["files_imported"] == 1
+    assert memory_manager.read_rl_memory()["template_stats"] == {"0": {"count": 4, "sum_reward": 2.0}}
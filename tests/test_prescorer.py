@@ -0,0 +1,55 @@
+# tests/test_prescorer.py
+from backend import prescorer
+
+COACHED = "Renewable energy subsidies lower long-term costs and cut emissions across the grid."
+FAILED = "Opponent generation failed: timeout"
+
+
+def _llm_verdict(total_coached, total_opponent):
+    def judge_fn(coached, opponent, topic):
+        return {"total_coached": total_coached, "total_opponent": total_opponent, "notes": "llm"}
+    return judge_fn
+
+
+def test_audited_round_returns_llm_verdict(tmp_path, monkeypatch):
+    monkeypatch.setattr(prescorer, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(prescorer, "PRESCORE_AUDIT_RATE", 1.0)
+    verdict = prescorer.evaluate_tiered(COACHED, FAILED, "energy", _llm_verdict(8.0, 3.0), judge_label="model-a")
+    assert verdict["notes"] == "llm"
+    assert verdict["total_coached"] == 8.0
+
+
+def test_failed_audit_falls_back_to_local_verdict(tmp_path, monkeypatch):
+    monkeypatch.setattr(prescorer, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(prescorer, "PRESCORE_AUDIT_RATE", 1.0)
+
+    def broken(coached, opponent, topic):
+        raise RuntimeError("down")
+
+    verdict = prescorer.evaluate_tiered(COACHED, FAILED, "energy", broken, judge_label="model-a")
+    assert verdict.get("notes") != "llm"
+    assert prescorer.prescore_report()["audited"] == 0
+
+
+def test_agreement_is_kept_per_judge(tmp_path, monkeypatch):
+    monkeypatch.setattr(prescorer, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(prescorer, "PRESCORE_AUDIT_RATE", 1.0)
+    prescorer.evaluate_tiered(COACHED, FAILED, "energy", _llm_verdict(8.0, 3.0), judge_label="model-a")
+    prescorer.evaluate_tiered(COACHED, FAILED, "energy", _llm_verdict(2.0, 7.0), judge_label="model-b")
+
+    report = prescorer.prescore_report()
+    assert report["audited"] == 2
+    assert report["audit_agreement"] == 0.5
+    assert report["by_judge"]["model-a"]["audit_agreement"] == 1.0
+    assert report["by_judge"]["model-b"]["audit_agreement"] == 0.0
+
+
+def test_deferred_records_keep_judge_label(tmp_path, monkeypatch):
+    monkeypatch.setattr(prescorer, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(prescorer, "PRESCORE_AUDIT_RATE", 1.0)
+    with prescorer.deferred_prescore_stats() as records:
+        prescorer.evaluate_tiered(COACHED, FAILED, "energy", _llm_verdict(8.0, 3.0), judge_label="model-a")
+    assert prescorer.prescore_report()["rounds"] == 0
+
+    prescorer.apply_prescore_stats(records)
+    assert prescorer.prescore_report()["by_judge"]["model-a"]["audited"] == 1
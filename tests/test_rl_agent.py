@@ -0,0 +1,50 @@
+# tests/test_rl_agent.py
+"""RL memory updates from concurrent round commits (backend/rl_agent.py)."""
+import os
+import threading
+
+import pytest
+
+from backend import memory_manager
+from backend.config import TEMPLATES
+from backend.memory_manager import read_rl_memory
+from backend.rl_agent import RLAgent
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_manager, "DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_concurrent_updates_lose_no_counts(data_dir):
+    rl = RLAgent()
+    threads, per_thread = 8, 25
+    start = threading.Barrier(threads)
+
+    def commit_rounds(worker: int):
+        start.wait()
+        for _ in range(per_thread):
+            rl.update(worker % len(TEMPLATES), 1.0)
+
+    workers = [threading.Thread(target=commit_rounds, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    stats = read_rl_memory()["template_stats"]
+    assert sum(s["count"] for s in stats.values()) == threads * per_thread
+    assert sum(s["sum_reward"] for s in stats.values()) == pytest.approx(threads * per_thread)
+
+
+def test_init_only_writes_when_templates_are_missing(data_dir):
+    RLAgent()
+    path = os.path.join(str(data_dir), memory_manager.RL_MEMORY_FILE)
+    before = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(before - 10**9, before - 10**9))
+
+    RLAgent()
+
+    assert os.stat(path).st_mtime_ns == before - 10**9
+    assert set(read_rl_memory()["template_stats"]) == {str(i) for i in range(len(TEMPLATES))}